@@ -41,6 +41,7 @@ setup(
         ],
     },
     package_data={
+        "fl2cu.schemas": ["*.xsd"],  # DAWproject schemas used by --validate
         "flstudio_cubase_migration": [
             "schemas/*.xsd",  # XML schemas
             "templates/*.xml",  # XML templates
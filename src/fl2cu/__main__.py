@@ -1,12 +1,20 @@
 # src/fl2cu/main.py
 from pathlib import Path
+from typing import List, Optional
 import argparse
 import logging
 import sys
 
 from .parser.project_parser import FLProjectParser 
 from .generator.dawproject_generator import DAWProjectGenerator
+from .generator.xml_utils import DEFAULT_PRECISION
+from .catalog import DEFAULT_CATALOG_PATH, SampleCatalog, write_rows
+from .models.automation import DEFAULT_TOLERANCE
+from .render import EffectRenderer
+from .inventory import collect_flp_files, inspect_projects, write_csv, write_json
+from .manifest import verify_archive
 from .utils.logger import setup_logger, get_logger
+from .utils.prefetch import DEFAULT_PREFETCH_BUDGET, DEFAULT_PREFETCH_FILES, DEFAULT_READ_TIMEOUT
 
 def setup_logging(debug: bool) -> None:
     level = logging.DEBUG if debug else logging.INFO
@@ -14,46 +22,249 @@ def setup_logging(debug: bool) -> None:
     log_dir.mkdir(exist_ok=True)
     setup_logger()
 
-def process_project(input_file: Path, output_dir: Path) -> bool:
+def process_project(
+    input_file: Path,
+    output_dir: Path,
+    precision: int = DEFAULT_PRECISION,
+    jobs: int = 1,
+    validate: bool = False,
+    automation_tolerance: float = DEFAULT_TOLERANCE,
+    render_effects: bool = False,
+    target_sample_rate: Optional[int] = None,
+    target_bit_depth: Optional[int] = None,
+    flac: bool = False,
+    prefetch_files: int = DEFAULT_PREFETCH_FILES,
+    prefetch_budget: int = DEFAULT_PREFETCH_BUDGET,
+    read_timeout: Optional[float] = DEFAULT_READ_TIMEOUT,
+    catalog_path: Optional[Path] = None
+) -> bool:
     logger = get_logger()
     
-    parser = FLProjectParser(str(input_file))
-    projects = parser.parse_project()  # Returns list of projects
-    
-    if not projects:
-        logger.error("No arrangements found in project")
-        return False
+    # Content hashes of samples already hashed by `fl2cu catalog update --hash`
+    catalog = SampleCatalog(catalog_path) if catalog_path else None
+    hash_lookup = catalog.get_hash if catalog else None
 
+    # Sampler effects render in the background while the project is parsed
+    renderer = (
+        EffectRenderer(jobs if jobs > 1 else None, hash_lookup=hash_lookup)
+        if render_effects else None
+    )
     output_dir.mkdir(parents=True, exist_ok=True)
     
-    # Process each project (one per arrangement)
-    for project in projects:
-        if not project.arrangements:
-            continue
-            
-        # Fixed: Store clip paths in a list instead of using clips as keys
-        clip_paths = []
-        for arrangement in project.arrangements:
-            for track in arrangement.get_tracks():
-                for clip in track.clips:
-                    clip_paths.append((clip.source_path, clip))
-        
-        generator = DAWProjectGenerator(
-            arrangements=project.arrangements,
-            clip_paths=dict(clip_paths)  # Convert to dictionary using source_path as key
-        )
+    # Process each project (one per arrangement) as soon as it is parsed; the
+    # parser releases the pyflp event tree before handing out the last one
+    generated = 0
+    incomplete = 0
+    try:
+        parser = FLProjectParser(str(input_file), automation_tolerance, renderer)
+        for project in parser.iter_projects():
+            if not project.arrangements:
+                continue
+
+            if renderer is not None:
+                failed = renderer.wait()
+                if failed:
+                    logger.error(
+                        f"{failed} sampler renders failed; their clips will be missing audio"
+                    )
 
-        output_file = output_dir / f"{project.name}.dawproject"
-        generator.generate_dawproject(str(output_file))
-        logger.info(f"Generated: {output_file}")
+            # Clip paths are collected while project.xml is streamed
+            generator = DAWProjectGenerator(
+                arrangements=project.arrangements,
+                precision=precision,
+                jobs=jobs,
+                validate=validate,
+                target_sample_rate=target_sample_rate,
+                target_bit_depth=target_bit_depth,
+                flac=flac,
+                prefetch_files=prefetch_files,
+                prefetch_budget=prefetch_budget,
+                read_timeout=read_timeout,
+                hash_lookup=hash_lookup
+            )
+
+            output_file = output_dir / f"{project.name}.dawproject"
+            # Arrangements that failed validation or lost audio are reported, not fatal
+            if not generator.generate_dawproject(str(output_file)):
+                incomplete += 1
+                continue
+            logger.info(f"Generated: {output_file}")
+            generated += 1
+    finally:
+        if renderer is not None:
+            renderer.close()
+        if catalog is not None:
+            catalog.close()
     
+    if incomplete:
+        logger.error(
+            f"{incomplete} arrangements failed schema validation or could not read audio "
+            f"files and were not written"
+        )
+        return False
+    if not generated:
+        logger.error("No arrangements found in project")
+        return False
+
     return True
     
+def inspect_main(argv: List[str]) -> int:
+    """Scan projects without converting them and report their inventory."""
+    parser = argparse.ArgumentParser(prog="fl2cu inspect")
+    parser.add_argument("paths", type=str, nargs="+",
+                        help=".flp files or directories to scan recursively")
+    parser.add_argument("--format", choices=["json", "csv"], default="json")
+    parser.add_argument("--output", type=str, help="Write report to file instead of stdout")
+    parser.add_argument("--jobs", type=int, default=None,
+                        help="Worker processes (default: CPU count)")
+    parser.add_argument("--debug", action="store_true")
+    args = parser.parse_args(argv)
+
+    setup_logging(args.debug)
+    logger = get_logger()
+    logger.setLevel(logging.DEBUG if args.debug else logging.INFO)
+    # Keep stdout clean for the report
+    for handler in logger.handlers:
+        if isinstance(handler, logging.StreamHandler) and handler.stream is sys.stdout:
+            handler.setStream(sys.stderr)
+
+    files = collect_flp_files(Path(path).resolve() for path in args.paths)
+    if not files:
+        logger.error("No .flp files found")
+        return 1
+
+    inventories = list(inspect_projects(files, args.jobs))
+    write = write_csv if args.format == "csv" else write_json
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8', newline='') as f:
+            write(inventories, f)
+    else:
+        write(inventories, sys.stdout)
+
+    failed = sum(1 for inventory in inventories if inventory.error)
+    if failed:
+        logger.error(f"Failed to inspect {failed} of {len(inventories)} projects")
+    return 1 if failed else 0
+
+def catalog_main(argv: List[str]) -> int:
+    """Update or query the cross-project sample catalog."""
+    parser = argparse.ArgumentParser(prog="fl2cu catalog")
+    parser.add_argument("--db", type=str, default=str(DEFAULT_CATALOG_PATH),
+                        help="Catalog database file")
+    parser.add_argument("--debug", action="store_true")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    update = commands.add_parser("update", help="Scan new or changed projects")
+    update.add_argument("paths", type=str, nargs="+",
+                        help=".flp files or directories to scan recursively")
+    update.add_argument("--hash", action="store_true",
+                        help="Pre-warm content hashes of resolved samples")
+    update.add_argument("--jobs", type=int, default=None)
+
+    query = commands.add_parser("query", help="List sample usages")
+    query.add_argument("--project", type=str, help="Filter by project path substring")
+    query.add_argument("--sample", type=str, help="Filter by sample path substring")
+    query.add_argument("--missing", action="store_true", help="Only missing samples")
+    query.add_argument("--shared", type=int, nargs="?", const=2, default=None, metavar="N",
+                       help="List samples used by at least N projects instead")
+    query.add_argument("--format", choices=["json", "csv"], default="json")
+    args = parser.parse_args(argv)
+
+    setup_logging(args.debug)
+    logger = get_logger()
+    logger.setLevel(logging.DEBUG if args.debug else logging.INFO)
+    for handler in logger.handlers:
+        if isinstance(handler, logging.StreamHandler) and handler.stream is sys.stdout:
+            handler.setStream(sys.stderr)
+
+    with SampleCatalog(args.db) as catalog:
+        if args.command == "update":
+            files = collect_flp_files(Path(path).resolve() for path in args.paths)
+            scanned, unchanged, removed = catalog.update(files, args.jobs)
+            logger.info(
+                f"Catalog updated: {scanned} projects scanned, {unchanged} unchanged, "
+                f"{removed} removed"
+            )
+            if args.hash:
+                logger.info(f"Hashed {catalog.hash_samples(args.jobs)} samples")
+            return 0
+
+        if args.shared is not None:
+            rows = catalog.shared_samples(args.shared)
+        else:
+            rows = catalog.usages(args.project, args.sample, args.missing)
+        write_rows(rows, sys.stdout, args.format)
+    return 0
+
+def verify_main(argv: List[str]) -> int:
+    """Check .dawproject archives against their checksum manifests."""
+    parser = argparse.ArgumentParser(prog="fl2cu verify")
+    parser.add_argument("paths", type=str, nargs="+", help=".dawproject files to check")
+    parser.add_argument("--jobs", type=int, default=None,
+                        help="Members read in parallel per archive (default: CPU count)")
+    parser.add_argument("--debug", action="store_true")
+    args = parser.parse_args(argv)
+
+    setup_logging(args.debug)
+    logger = get_logger()
+    logger.setLevel(logging.DEBUG if args.debug else logging.INFO)
+
+    failed = 0
+    for path in args.paths:
+        errors = verify_archive(Path(path), args.jobs)
+        for error in errors:
+            logger.error(f"{path}: {error}")
+        if errors:
+            failed += 1
+        else:
+            logger.info(f"{path}: OK")
+    return 1 if failed else 0
+
 def main() -> int:
+    if len(sys.argv) > 1 and sys.argv[1] == "inspect":
+        return inspect_main(sys.argv[2:])
+    if len(sys.argv) > 1 and sys.argv[1] == "catalog":
+        return catalog_main(sys.argv[2:])
+    if len(sys.argv) > 1 and sys.argv[1] == "verify":
+        return verify_main(sys.argv[2:])
+
     parser = argparse.ArgumentParser()
     parser.add_argument("input_file", type=str)
     parser.add_argument("output_dir", type=str)
     parser.add_argument("--debug", action="store_true")
+    parser.add_argument("--precision", type=int, default=DEFAULT_PRECISION,
+                        help="Maximum decimal places for beat values in project.xml")
+    parser.add_argument("--jobs", type=int, default=1,
+                        help="Worker processes for rendering track XML (default: 1)")
+    parser.add_argument("--validate", action="store_true",
+                        help="Validate generated XML against the DAWproject schemas")
+    parser.add_argument("--automation-tolerance", type=float, default=DEFAULT_TOLERANCE,
+                        help="Max deviation of decimated automation in normalized units "
+                             "(0 keeps every point)")
+    parser.add_argument("--render-effects", action="store_true",
+                        help="Render sampler reverse, fades, pitch shift and declicking "
+                             "into new audio files (needs soundfile)")
+    parser.add_argument("--target-sample-rate", type=int, default=None,
+                        help="Convert audio at other sample rates to this rate while "
+                             "packaging (needs soundfile)")
+    parser.add_argument("--target-bit-depth", type=int, choices=[16, 24, 32], default=None,
+                        help="Convert audio at other bit depths to this depth while "
+                             "packaging (needs soundfile)")
+    parser.add_argument("--flac", action="store_true",
+                        help="Convert uncompressed 16 and 24-bit audio to FLAC while "
+                             "packaging (needs soundfile)")
+    parser.add_argument("--prefetch", type=int, default=DEFAULT_PREFETCH_FILES,
+                        help="Audio files read ahead in parallel while packaging "
+                             f"(default: {DEFAULT_PREFETCH_FILES})")
+    parser.add_argument("--prefetch-mb", type=int, default=DEFAULT_PREFETCH_BUDGET // 2**20,
+                        help="Memory for read-ahead audio in MB "
+                             f"(default: {DEFAULT_PREFETCH_BUDGET // 2**20})")
+    parser.add_argument("--read-timeout", type=float, default=DEFAULT_READ_TIMEOUT,
+                        help="Seconds to wait for one audio file before retrying it "
+                             f"(default: {DEFAULT_READ_TIMEOUT:g})")
+    parser.add_argument("--catalog", type=str, default=None, metavar="DB",
+                        help="Sample catalog to look up source content hashes in "
+                             "instead of rehashing them")
     args = parser.parse_args()
 
     setup_logging(args.debug)
@@ -72,7 +283,13 @@ def main() -> int:
             return 1
             
         logger.debug(f"Processing {input_file} -> {output_dir}")
-        return 0 if process_project(input_file, output_dir) else 1
+        return 0 if process_project(
+            input_file, output_dir, args.precision, args.jobs, args.validate,
+            args.automation_tolerance, args.render_effects,
+            args.target_sample_rate, args.target_bit_depth, args.flac,
+            args.prefetch, args.prefetch_mb * 2**20, args.read_timeout,
+            Path(args.catalog) if args.catalog else None
+        ) else 1
 
     except KeyboardInterrupt:
         logger.info("\nCancelled")
@@ -0,0 +1,278 @@
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import IO, Any, Dict, Iterable, List, Optional, Tuple, Union
+import csv
+import json
+import logging
+import os
+import sqlite3
+import time
+
+from .inventory import inspect_projects
+from .models.inventory import ProjectInventory
+from .utils.hashing import hash_file
+
+DEFAULT_CATALOG_PATH = Path("fl2cu_catalog.sqlite")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS projects (
+    id INTEGER PRIMARY KEY,
+    path TEXT NOT NULL UNIQUE,
+    mtime_ns INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    version TEXT,
+    error TEXT,
+    scanned_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS samples (
+    id INTEGER PRIMARY KEY,
+    path TEXT NOT NULL UNIQUE,
+    exists_on_disk INTEGER NOT NULL DEFAULT 0,
+    size INTEGER NOT NULL DEFAULT 0,
+    mtime_ns INTEGER,
+    content_hash TEXT
+);
+CREATE TABLE IF NOT EXISTS usages (
+    project_id INTEGER NOT NULL REFERENCES projects(id) ON DELETE CASCADE,
+    arrangement TEXT NOT NULL,
+    sample_id INTEGER NOT NULL REFERENCES samples(id),
+    use_count INTEGER NOT NULL,
+    PRIMARY KEY (project_id, arrangement, sample_id)
+);
+CREATE INDEX IF NOT EXISTS usages_sample ON usages(sample_id);
+CREATE INDEX IF NOT EXISTS samples_hash ON samples(content_hash);
+"""
+
+USAGE_QUERY = """
+SELECT p.path AS project, u.arrangement, s.path AS sample,
+       CASE s.exists_on_disk WHEN 1 THEN 'resolved' ELSE 'missing' END AS status,
+       s.size, s.content_hash, u.use_count
+FROM usages u
+JOIN projects p ON p.id = u.project_id
+JOIN samples s ON s.id = u.sample_id
+"""
+
+# Samples are grouped by content when hashed, so copies at different paths count as one
+SHARED_QUERY = """
+SELECT COALESCE(s.content_hash, s.path) AS sample_key,
+       MIN(s.path) AS sample, MAX(s.size) AS size,
+       COUNT(DISTINCT u.project_id) AS project_count, SUM(u.use_count) AS use_count
+FROM usages u
+JOIN samples s ON s.id = u.sample_id
+GROUP BY sample_key
+HAVING project_count >= ?
+ORDER BY project_count DESC, size DESC
+"""
+
+
+class SampleCatalog:
+    """Persistent SQLite catalog of sample usage across projects.
+
+    Projects are rescanned only when their size or mtime changed, and
+    projects deleted from disk are dropped with their usages. Content
+    hashes are kept per sample and invalidated when the file changes;
+    conversions look them up through get_hash instead of rehashing.
+    """
+
+    def __init__(self, db_path: Union[str, Path] = DEFAULT_CATALOG_PATH):
+        self.db_path = Path(db_path)
+        self.logger = logging.getLogger(__name__)
+        self.connection = sqlite3.connect(str(self.db_path))
+        self.connection.row_factory = sqlite3.Row
+        self.connection.execute("PRAGMA foreign_keys = ON")
+        self.connection.execute("PRAGMA journal_mode = WAL")
+        self.connection.executescript(SCHEMA)
+
+    def close(self) -> None:
+        self.connection.close()
+
+    def __enter__(self) -> 'SampleCatalog':
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def update(self, files: Iterable[Path], jobs: Optional[int] = None) -> Tuple[int, int, int]:
+        """Scan new or changed projects into the catalog.
+
+        Returns:
+            Tuple of (scanned, unchanged, removed) project counts.
+        """
+        changed: List[Tuple[Path, os.stat_result]] = []
+        unchanged = 0
+        for file_path in files:
+            try:
+                stat = file_path.stat()
+            except OSError as e:
+                self.logger.warning(f"Skipping {file_path}: {e}")
+                continue
+            row = self.connection.execute(
+                "SELECT mtime_ns, size FROM projects WHERE path = ?", (str(file_path),)
+            ).fetchone()
+            if row and row['mtime_ns'] == stat.st_mtime_ns and row['size'] == stat.st_size:
+                unchanged += 1
+            else:
+                changed.append((file_path, stat))
+
+        inventories = inspect_projects([file_path for file_path, _ in changed], jobs)
+        for (file_path, stat), inventory in zip(changed, inventories):
+            with self.connection:
+                self.record(inventory, stat)
+
+        removed = self.prune()
+        self.logger.debug(
+            f"Catalog update: {len(changed)} scanned, {unchanged} unchanged, {removed} removed"
+        )
+        return len(changed), unchanged, removed
+
+    def prune(self) -> int:
+        """Drop projects whose file no longer exists, with their usages."""
+        missing = [
+            (row['id'],) for row in self.connection.execute("SELECT id, path FROM projects")
+            if not os.path.exists(row['path'])
+        ]
+        with self.connection:
+            self.connection.executemany("DELETE FROM projects WHERE id = ?", missing)
+        return len(missing)
+
+    def record(self, inventory: ProjectInventory, stat: os.stat_result) -> None:
+        """Replace catalog rows of a project with its inventory."""
+        self.connection.execute(
+            "INSERT INTO projects (path, mtime_ns, size, version, error, scanned_at) "
+            "VALUES (?, ?, ?, ?, ?, ?) "
+            "ON CONFLICT(path) DO UPDATE SET mtime_ns = excluded.mtime_ns, size = excluded.size, "
+            "version = excluded.version, error = excluded.error, scanned_at = excluded.scanned_at",
+            (str(inventory.source_path), stat.st_mtime_ns, stat.st_size,
+             inventory.version, inventory.error, time.time())
+        )
+        project_id = self._get_id("projects", str(inventory.source_path))
+        self.connection.execute("DELETE FROM usages WHERE project_id = ?", (project_id,))
+
+        sample_ids = {
+            sample.path: self._record_sample(
+                str(sample.resolved_path) if sample.resolved_path else sample.path,
+                sample.exists,
+                sample.size
+            )
+            for sample in inventory.samples
+        }
+        self.connection.executemany(
+            "INSERT INTO usages (project_id, arrangement, sample_id, use_count) "
+            "VALUES (?, ?, ?, ?) "
+            "ON CONFLICT(project_id, arrangement, sample_id) "
+            "DO UPDATE SET use_count = use_count + excluded.use_count",
+            [
+                (project_id, arrangement.name, sample_ids[path], count)
+                for arrangement in inventory.arrangements
+                for path, count in arrangement.sample_uses.items()
+            ]
+        )
+
+    def _record_sample(self, path: str, exists: bool, size: int) -> int:
+        """Upsert a sample, dropping its hash if the file changed since it was hashed."""
+        mtime_ns = None
+        if exists:
+            try:
+                mtime_ns = os.stat(path).st_mtime_ns
+            except OSError:
+                exists = False
+        self.connection.execute(
+            "INSERT INTO samples (path, exists_on_disk, size, mtime_ns) VALUES (?, ?, ?, ?) "
+            "ON CONFLICT(path) DO UPDATE SET "
+            "content_hash = CASE WHEN size = excluded.size AND mtime_ns IS excluded.mtime_ns "
+            "THEN content_hash END, "
+            "exists_on_disk = excluded.exists_on_disk, size = excluded.size, "
+            "mtime_ns = excluded.mtime_ns",
+            (path, int(exists), size, mtime_ns)
+        )
+        return self._get_id("samples", path)
+
+    def _get_id(self, table: str, path: str) -> int:
+        row = self.connection.execute(f"SELECT id FROM {table} WHERE path = ?", (path,)).fetchone()
+        return int(row[0])
+
+    def hash_samples(self, jobs: Optional[int] = None) -> int:
+        """Pre-warm content hashes of resolved samples that have none yet."""
+        paths = [
+            row['path'] for row in self.connection.execute(
+                "SELECT path FROM samples WHERE exists_on_disk = 1 AND content_hash IS NULL"
+            )
+        ]
+        if not paths:
+            return 0
+
+        # Hashing is I/O bound and hashlib releases the GIL on large buffers
+        with ThreadPoolExecutor(max_workers=jobs or min(8, os.cpu_count() or 1)) as executor:
+            results = list(executor.map(self._hash_sample, paths))
+
+        with self.connection:
+            self.connection.executemany(
+                "UPDATE samples SET content_hash = ?, size = ?, mtime_ns = ? WHERE path = ?",
+                [result for result in results if result is not None]
+            )
+        hashed = sum(1 for result in results if result is not None)
+        self.logger.debug(f"Hashed {hashed}/{len(paths)} samples")
+        return hashed
+
+    def _hash_sample(self, path: str) -> Optional[Tuple[str, int, int, str]]:
+        try:
+            stat = os.stat(path)
+            return hash_file(path), stat.st_size, stat.st_mtime_ns, path
+        except OSError as e:
+            self.logger.warning(f"Could not hash sample {path}: {e}")
+            return None
+
+    def get_hash(self, path: Union[str, Path]) -> Optional[str]:
+        """Get cached content hash of a sample if the file is unchanged since hashing."""
+        row = self.connection.execute(
+            "SELECT content_hash, size, mtime_ns FROM samples WHERE path = ?", (str(path),)
+        ).fetchone()
+        if row is None or row['content_hash'] is None:
+            return None
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        if stat.st_size != row['size'] or stat.st_mtime_ns != row['mtime_ns']:
+            return None
+        return str(row['content_hash'])
+
+    def usages(
+        self,
+        project: Optional[str] = None,
+        sample: Optional[str] = None,
+        missing_only: bool = False
+    ) -> List[Dict[str, Any]]:
+        """List sample usages, optionally filtered by project or sample path substring."""
+        conditions = []
+        params: List[Any] = []
+        if project:
+            conditions.append("p.path LIKE ?")
+            params.append(f"%{project}%")
+        if sample:
+            conditions.append("s.path LIKE ?")
+            params.append(f"%{sample}%")
+        if missing_only:
+            conditions.append("s.exists_on_disk = 0")
+
+        query = USAGE_QUERY
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        query += " ORDER BY p.path, u.arrangement, s.path"
+        return [dict(row) for row in self.connection.execute(query, params)]
+
+    def shared_samples(self, min_projects: int = 2) -> List[Dict[str, Any]]:
+        """List samples used by at least min_projects projects."""
+        return [dict(row) for row in self.connection.execute(SHARED_QUERY, (min_projects,))]
+
+
+def write_rows(rows: List[Dict[str, Any]], stream: IO[str], format: str = "json") -> None:
+    """Write catalog query results as JSON or CSV."""
+    if format == "csv":
+        if rows:
+            writer = csv.DictWriter(stream, fieldnames=list(rows[0]))
+            writer.writeheader()
+            writer.writerows(rows)
+        return
+    json.dump(rows, stream, indent=2)
+    stream.write('\n')
@@ -0,0 +1,121 @@
+from pathlib import Path
+from typing import Any, Dict, IO, List, NamedTuple, Optional, Sequence, Tuple
+import json
+import logging
+import os
+import zipfile
+
+from ..manifest import ManifestEntry
+
+# ZipInfo fields needed to write a committed member into the central directory again
+ZIPINFO_FIELDS = (
+    'header_offset', 'compress_type', 'CRC', 'compress_size', 'file_size',
+    'external_attr', 'flag_bits', 'create_system', 'create_version', 'extract_version'
+)
+
+
+class JournalEntry(NamedTuple):
+    """Archive member that was completely written and synced to disk."""
+    name: str
+    digest: str
+    size: int
+    end: int  # Archive offset right after the member's data
+    info: Dict[str, Any]
+    source_stamp: Optional[Tuple[int, int]] = None  # Source size and mtime_ns
+
+    @property
+    def manifest_entry(self) -> ManifestEntry:
+        return ManifestEntry(self.name, self.digest, self.size)
+
+    @classmethod
+    def from_member(
+        cls,
+        entry: ManifestEntry,
+        info: zipfile.ZipInfo,
+        end: int,
+        source_stat: Optional[os.stat_result] = None
+    ) -> 'JournalEntry':
+        info_fields = {field: getattr(info, field) for field in ZIPINFO_FIELDS}
+        info_fields['date_time'] = list(info.date_time)
+        stamp = (source_stat.st_size, source_stat.st_mtime_ns) if source_stat else None
+        return cls(entry.name, entry.digest, entry.size, end, info_fields, stamp)
+
+    def to_zipinfo(self) -> zipfile.ZipInfo:
+        info = zipfile.ZipInfo(self.name, tuple(self.info['date_time']))
+        for field in ZIPINFO_FIELDS:
+            setattr(info, field, self.info[field])
+        return info
+
+
+class ArchiveJournal:
+    """Append-only record of the members committed to a partial archive.
+
+    The first line holds the plan, a hash of everything the archive is
+    built from; a journal for another plan is ignored. Every following line
+    is a JournalEntry, written only after the member's data is synced, so a
+    rerun can truncate the partial archive to the last entry and go on.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.logger = logging.getLogger(__name__)
+        self._file: Optional[IO[str]] = None
+
+    def load(self, plan: str) -> List[JournalEntry]:
+        """Get committed members of a previous run with the same plan."""
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                lines = f.read().splitlines()
+        except OSError:
+            return []
+        try:
+            if not lines or json.loads(lines[0]).get('plan') != plan:
+                return []
+        except ValueError:
+            return []
+
+        entries = []
+        for line in lines[1:]:
+            try:
+                fields = json.loads(line)
+            except ValueError:
+                # Torn last line from a crash mid-write
+                break
+            stamp = fields.get('source_stamp')
+            entries.append(JournalEntry(
+                fields['name'], fields['digest'], fields['size'], fields['end'],
+                fields['info'], tuple(stamp) if stamp else None
+            ))
+        return entries
+
+    def start(self, plan: str, entries: Sequence[JournalEntry]) -> None:
+        """Rewrite the journal with the members kept from a previous run."""
+        tmp_path = self.path.with_name(f"{self.path.name}.{os.getpid()}.tmp")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(json.dumps({'plan': plan}) + "\n")
+            for entry in entries:
+                f.write(json.dumps(entry._asdict()) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+        self._file = open(self.path, 'a', encoding='utf-8')
+
+    def commit(self, entry: JournalEntry) -> None:
+        """Record a member whose data has already been synced."""
+        if self._file is None:
+            raise RuntimeError("Archive journal was not started")
+        self._file.write(json.dumps(entry._asdict()) + "\n")
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def remove(self) -> None:
+        self.close()
+        try:
+            self.path.unlink()
+        except FileNotFoundError:
+            pass
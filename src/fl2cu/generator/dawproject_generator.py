@@ -1,72 +1,147 @@
+from concurrent.futures import Future
 from pathlib import Path
+import os
 import shutil
+import tempfile
+import time
 import zipfile
 import logging
 from xml.etree import ElementTree as ET
-from typing import Dict, List
+from typing import Dict, List, Mapping, Optional, Sequence, Tuple, Union
 
 from ..models.arrangement import Arrangement
+from ..manifest import MANIFEST_NAME, ManifestEntry, format_manifest
 from ..models.clip import Clip
+from ..models.clip_table import ClipRow
+from ..transcode import AudioTranscoder, TranscodeTarget
+from ..utils.hashing import HashLookup, hash_file, hash_stream, new_content_hash
+from ..utils.prefetch import (
+    DEFAULT_PREFETCH_BUDGET, DEFAULT_PREFETCH_FILES, DEFAULT_READ_TIMEOUT,
+    PrefetchedFile, SourcePrefetcher
+)
+from .archive_journal import ArchiveJournal, JournalEntry
 from .xml.generator import DAWProjectXMLGenerator
-from .xml_utils import XMLWriter
+from .xml_utils import XMLWriter, DEFAULT_PRECISION
+
+# Audio members that are already compressed and are stored without deflate
+STORED_SUFFIXES = frozenset(('.flac',))
+ZIP_EPOCH = (1980, 1, 1, 0, 0, 0)  # Earliest timestamp a zip entry can hold
+PARTIAL_SUFFIX = ".partial"   # Archive being written, renamed over the output when done
+JOURNAL_SUFFIX = ".journal"   # Members committed to the partial archive
+XML_MEMBERS = ("project.xml", "metadata.xml")
 
 
 class DAWProjectGenerator:
     """Handles generation of complete DAWproject files."""
     
-    def __init__(self, arrangements: List[Arrangement], clip_paths: Dict[Path, Clip]):
+    def __init__(
+        self,
+        arrangements: Sequence[Arrangement],
+        clip_paths: Optional[Mapping[Path, Union[Clip, ClipRow]]] = None,
+        precision: int = DEFAULT_PRECISION,
+        jobs: int = 1,
+        validate: bool = False,
+        target_sample_rate: Optional[int] = None,
+        target_bit_depth: Optional[int] = None,
+        flac: bool = False,
+        prefetch_files: int = DEFAULT_PREFETCH_FILES,
+        prefetch_budget: int = DEFAULT_PREFETCH_BUDGET,
+        read_timeout: Optional[float] = DEFAULT_READ_TIMEOUT,
+        hash_lookup: Optional[HashLookup] = None
+    ):
         """Initialize generator with arrangements and clip paths.
         
         Args:
-            arrangements: List of arrangements to process
-            clip_paths: Dictionary mapping source paths to clips
+            arrangements: Arrangements to process
+            clip_paths: Dictionary mapping source paths to clips, collected
+                while project.xml is written when not given
+            precision: Maximum decimal places for beat values in project.xml
+            jobs: Worker processes used to render track XML fragments
+            validate: Check project.xml and metadata.xml against the DAWproject
+                schemas while audio files are packaged
+            target_sample_rate: Sample rate to convert mismatched audio to
+            target_bit_depth: Bit depth (16, 24 or 32) to convert mismatched audio to
+            flac: Convert uncompressed 16 and 24-bit audio to FLAC
+            prefetch_files: Audio files read ahead of the archive writer
+            prefetch_budget: Bytes of read-ahead audio held in memory at once
+            read_timeout: Seconds to wait for one audio file before retrying it
+            hash_lookup: Known content hashes of sources, e.g. SampleCatalog.get_hash
         """
         self.arrangements = arrangements
         self.clip_paths = clip_paths
+        self.validate = validate
+        self.prefetch_files = prefetch_files
+        self.prefetch_budget = prefetch_budget
+        self.read_timeout = read_timeout
         self.logger = logging.getLogger(__name__)
         
+        self.transcoder = None
+        if target_sample_rate or target_bit_depth or flac:
+            self.transcoder = AudioTranscoder(
+                target_sample_rate, target_bit_depth, flac, jobs=jobs if jobs > 1 else None,
+                hash_lookup=hash_lookup
+            )
+        # Archive name -> source or converted file, streamed into the archive
+        self.archive_members: Dict[str, Path] = {}
+        
         # Initialize XML generator
-        self.xml_generator = DAWProjectXMLGenerator(arrangements, clip_paths)
+        self.xml_generator = DAWProjectXMLGenerator(
+            arrangements, clip_paths, precision, jobs, self.transcoder
+        )
 
-    def generate_dawproject(self, output_path: str) -> None:
+    def generate_dawproject(self, output_path: Union[str, Path]) -> bool:
         """Generate DAWproject file at the specified path.
         
         Args:
             output_path: Path where the .dawproject file should be created
+            
+        Returns:
+            False if the project failed schema validation or audio files
+            could not be read; it is not written in either case
         """
         output_path = Path(output_path)
         
-        # Create unique temp directory for this dawproject
-        temp_dir = output_path.parent / f"temp_{output_path.stem}"
-        temp_dir.mkdir(parents=True, exist_ok=True)
+        # project.xml and metadata.xml are written to a private directory next
+        # to the output, removed once they are archived
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        temp_dir = Path(tempfile.mkdtemp(prefix=f".{output_path.stem}-", dir=output_path.parent))
         
         try:
-            # Generate and write project.xml
-            project_xml = self.xml_generator.generate_xml(output_path.stem)
+            # Stream project.xml to disk
             project_path = temp_dir / "project.xml"
-            XMLWriter.write_xml(project_xml, project_path)
+            with open(project_path, 'w', encoding='UTF-8') as f:
+                self.xml_generator.write_xml(f)
+            if self.clip_paths is None:
+                self.clip_paths = self.xml_generator.referenced_clips
             
             # Generate and write metadata.xml
             metadata_xml = self._create_metadata_xml()
             metadata_path = temp_dir / "metadata.xml"
             XMLWriter.write_xml(metadata_xml, metadata_path)
             
+            # Validation runs in the background while audio is packaged
+            validation = None
+            if self.validate:
+                from .schema_validator import SchemaValidator
+                validation = SchemaValidator().validate_async(project_path, metadata_path)
+            
             # Process audio files
-            self._process_audio_files(temp_dir)
+            self._process_audio_files()
             
-            # Create final archive
-            self._create_archive(temp_dir, output_path)
+            # Create final archive, published only if it passed validation
+            if not self._create_archive(temp_dir, output_path, validation):
+                return False
             
             self.logger.info(f"Successfully generated DAWproject at {output_path}")
+            return True
             
         except Exception as e:
             self.logger.error(f"Failed to generate DAWproject: {e}")
             raise
         finally:
-            # Keep temp files for debugging
-            pass
-            # if temp_dir.exists():
-            #     shutil.rmtree(temp_dir)
+            if self.transcoder is not None:
+                self.transcoder.close()
+            shutil.rmtree(temp_dir, ignore_errors=True)
 
     def _create_metadata_xml(self) -> ET.Element:
         """Create metadata XML element.
@@ -92,65 +167,207 @@ class DAWProjectGenerator:
         
         return root
 
-    def _process_audio_files(self, temp_dir: Path) -> None:
-        """Process and copy audio files to the temp directory."""
-        audio_dir = temp_dir / "audio"
-        audio_dir.mkdir(exist_ok=True)
+    def _process_audio_files(self) -> None:
+        """Collect the audio files to package under their archive names.
         
-        # Keep track of processed files to avoid duplicates 
-        processed_files = set()
-        
-        for source_path, clip in self.clip_paths.items():
+        Sources that need converting are scheduled on the transcoder and
+        the rest are added as they are; nothing is copied until the archive
+        is written.
+        """
+        transcoder = self.transcoder
+        transcoded: Dict[str, Tuple[Path, TranscodeTarget]] = {}
+        for source_path, clip in (self.clip_paths or {}).items():
             if not source_path or not source_path.exists():
                 self.logger.warning(f"Audio file not found: {source_path}")
                 continue
-                
-            # Use clip's output filename with original format
-            dest_filename = clip.output_filename
-            dest_path = audio_dir / dest_filename
             
-            # Skip if file already exists
-            if dest_path.exists() or dest_filename in processed_files:
-                self.logger.debug(f"Audio file already exists, skipping: {dest_filename}")
+            # Use clip's output filename with original format
+            target = transcoder.get_format(source_path) if transcoder is not None else None
+            if transcoder is not None and target is not None:
+                name = f"audio/{clip.name}.{target.extension}"
+                if name not in self.archive_members:
+                    # Keeps the member's place until the converted file is known
+                    self.archive_members[name] = source_path
+                    transcoded[name] = (source_path, target)
+                    transcoder.submit(source_path, target)
                 continue
-            
-            # Simple file copy
-            dest_path.parent.mkdir(parents=True, exist_ok=True)
-            shutil.copy2(source_path, dest_path)
-            processed_files.add(dest_filename)
-            
-            
-    def _copy_audio_file(self, source_path: Path, dest_path: Path) -> None:
-        """Copy audio file with validation.
-        
-        Args:
-            source_path: Source audio file path
-            dest_path: Destination path in DAWproject
-        """
-        if not source_path.exists():
-            raise FileNotFoundError(f"Source audio file not found: {source_path}")
-            
-        dest_path.parent.mkdir(parents=True, exist_ok=True)
-        shutil.copy2(source_path, dest_path)
+            name = f"audio/{clip.output_filename}"
+            if name in self.archive_members:
+                self.logger.debug(f"Audio file already added, skipping: {name}")
+                continue
+            self.archive_members[name] = source_path
         
-        if not dest_path.exists():
-            raise RuntimeError(f"Failed to copy audio file to {dest_path}")
+        if transcoder is not None:
+            transcoder.wait()
+            failed = 0
+            for name, (source_path, target) in transcoded.items():
+                dest = transcoder.get_path(source_path, target)
+                if dest is None:
+                    failed += 1
+                else:
+                    self.archive_members[name] = dest
+            if failed:
+                raise RuntimeError(f"Failed to transcode {failed} audio files")
 
-    def _create_archive(self, temp_dir: Path, output_path: Path) -> None:
+    def _create_archive(
+        self,
+        temp_dir: Path,
+        output_path: Path,
+        validation: Optional['Future[List[str]]'] = None
+    ) -> bool:
         """Create final ZIP archive.
         
+        The archive is written to a .partial file next to the output and
+        renamed over it once complete, so the output is never left half
+        written. Each member is synced and then recorded in a journal; a
+        rerun after a crash, a cancellation or failed audio reads truncates
+        the partial file to the last recorded member and carries on from
+        there.
+        
         Args:
             temp_dir: Directory containing DAWproject contents
             output_path: Path for final .dawproject file
-        """
-        with zipfile.ZipFile(output_path, 'w', zipfile.ZIP_DEFLATED) as zf:
-            # Add project.xml
-            zf.write(temp_dir / "project.xml", "project.xml")
-            
-            # Add metadata.xml
-            zf.write(temp_dir / "metadata.xml", "metadata.xml")
+            validation: Schema validation running alongside; the archive is
+                discarded instead of published if it reports errors
             
-            # Add audio files
-            audio_dir = temp_dir / "audio"
-            for audio_file in audio_dir.glob("*.wav"):
-                zf.write(audio_file, f"audio/{audio_file.name}")
\ No newline at end of file
+        Returns:
+            False if the archive failed validation or audio files could not
+            be read, in which case it was not published
+        """
+        members = [(name, temp_dir / name) for name in XML_MEMBERS]
+        members.extend(self.archive_members.items())
+        partial_path = output_path.with_name(output_path.name + PARTIAL_SUFFIX)
+        journal = ArchiveJournal(partial_path.with_name(partial_path.name + JOURNAL_SUFFIX))
+        plan = self._get_archive_plan(members)
+        
+        committed = self._get_resumable_members(journal.load(plan), partial_path, members)
+        if committed:
+            self.logger.info(
+                f"Resuming {output_path.name} after {len(committed)} committed members"
+            )
+        done = {entry.name for entry in committed}
+        pending = [(name, path) for name, path in members if name not in done]
+        entries = [entry.manifest_entry for entry in committed]
+        
+        journal.start(plan, committed)
+        try:
+            with open(partial_path, 'r+b' if committed else 'wb') as f:
+                f.seek(committed[-1].end if committed else 0)
+                f.truncate()
+                with zipfile.ZipFile(f, 'w', zipfile.ZIP_DEFLATED) as zf:
+                    # Committed members only need to be listed in the central directory
+                    for kept in committed:
+                        info = kept.to_zipinfo()
+                        zf.filelist.append(info)
+                        zf.NameToInfo[info.filename] = info
+                    
+                    # Audio from its source or the transcode cache is read ahead in
+                    # parallel while members are written one at a time, in order
+                    with SourcePrefetcher(
+                        self.prefetch_files, self.prefetch_budget, self.read_timeout
+                    ) as prefetcher:
+                        files = prefetcher.iter_files([path for _, path in pending])
+                        for (name, path), (_, source) in zip(pending, files):
+                            if source is None:
+                                continue
+                            member = self._add_member(zf, path, name, source)
+                            entries.append(member)
+                            # Sync data before the journal claims it
+                            f.flush()
+                            os.fsync(f.fileno())
+                            journal.commit(JournalEntry.from_member(
+                                member, zf.getinfo(name), f.tell(),
+                                None if name in XML_MEMBERS else source.stat
+                            ))
+                    
+                    zf.writestr(MANIFEST_NAME, format_manifest(entries))
+                f.flush()
+                os.fsync(f.fileno())
+        finally:
+            journal.close()
+        
+        if validation is not None:
+            errors = validation.result()
+            for error in errors:
+                self.logger.error(f"Schema: {error}")
+            if errors:
+                self.logger.error(
+                    f"{output_path.name} does not match the DAWproject schema "
+                    f"({len(errors)} errors) and was not written"
+                )
+                journal.remove()
+                partial_path.unlink()
+                return False
+            self.logger.info("DAWproject passed schema validation")
+        
+        if prefetcher.failed:
+            # Unpublished, with its journal, so a rerun only adds the missing members
+            self.logger.error(
+                f"{len(prefetcher.failed)} audio files could not be read, {output_path.name} "
+                f"was left as {partial_path.name}: "
+                f"{', '.join(str(path) for path in prefetcher.failed)}"
+            )
+            return False
+        
+        os.replace(partial_path, output_path)
+        journal.remove()
+        self.logger.debug(f"Archived {len(entries)} members with checksums")
+        return True
+
+    @staticmethod
+    def _get_archive_plan(members: Sequence[Tuple[str, Path]]) -> str:
+        """Hash what the archive is built from: member names, sources and the XML."""
+        plan = new_content_hash()
+        for name, path in members:
+            # The XML lives in a new temp directory each run, so only its content counts
+            if name in XML_MEMBERS:
+                plan.update(f"{name}\0{hash_file(path)}\0".encode())
+            else:
+                plan.update(f"{name}\0{path}\0".encode())
+        return plan.hexdigest()
+
+    def _get_resumable_members(
+        self,
+        committed: List[JournalEntry],
+        partial_path: Path,
+        members: Sequence[Tuple[str, Path]]
+    ) -> List[JournalEntry]:
+        """Keep committed members up to the first whose data or source is gone or changed."""
+        if not committed:
+            return []
+        try:
+            partial_size = partial_path.stat().st_size
+        except OSError:
+            return []
+        
+        sources = dict(members)
+        kept: List[JournalEntry] = []
+        for entry in committed:
+            if entry.end > partial_size or entry.name not in sources:
+                break
+            if entry.source_stamp is not None:
+                try:
+                    stat = sources[entry.name].stat()
+                except OSError:
+                    break
+                if (stat.st_size, stat.st_mtime_ns) != entry.source_stamp:
+                    self.logger.debug(f"Source of {entry.name} changed, rewriting from there")
+                    break
+            kept.append(entry)
+        return kept
+
+    @staticmethod
+    def _add_member(
+        zf: zipfile.ZipFile, path: Path, name: str, source: Optional[PrefetchedFile] = None
+    ) -> ManifestEntry:
+        """Copy a file into the archive, hashing it in the same pass."""
+        stat = source.stat if source is not None else os.stat(path)
+        info = zipfile.ZipInfo(name, max(time.localtime(stat.st_mtime)[:6], ZIP_EPOCH))
+        info.external_attr = (stat.st_mode & 0xFFFF) << 16
+        info.file_size = stat.st_size
+        stored = path.suffix in STORED_SUFFIXES
+        info.compress_type = zipfile.ZIP_STORED if stored else zf.compression
+        with (source.open() if source is not None else open(path, 'rb')) as stream, \
+                zf.open(info, 'w') as dest:
+            digest, size = hash_stream(stream, dest)
+        return ManifestEntry(name, digest, size)
@@ -0,0 +1,148 @@
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional, Union
+import hashlib
+import importlib.resources
+import io
+import json
+import logging
+import os
+import pickle
+
+import xmlschema
+from xmlschema import XMLResource
+
+# DAWproject schemas shipped as package data
+SCHEMA_PACKAGE = "fl2cu.schemas"
+CACHE_DIR = Path(os.getenv("XDG_CACHE_HOME", Path.home() / ".cache")) / "fl2cu" / "schemas"
+MAX_REPORTED_ERRORS = 100
+
+# Compiled schemas shared by all validators in the process, keyed by XSD hash
+_compiled: Dict[str, xmlschema.XMLSchema] = {}
+
+
+def _read_packaged_schema(name: str) -> bytes:
+    if hasattr(importlib.resources, 'files'):
+        return importlib.resources.files(SCHEMA_PACKAGE).joinpath(name).read_bytes()
+    return importlib.resources.read_binary(SCHEMA_PACKAGE, name)
+
+
+class SchemaValidator:
+    """Validates generated project.xml and metadata.xml against the DAWproject XSDs.
+
+    Schemas are compiled once per process and pickled to a disk cache, so
+    later runs skip the compile. A cached schema is only unpickled when
+    the cache file belongs to the current user, is not writable by others
+    and its header matches the hash of the XSD it was compiled from and
+    of its own payload. Documents are validated lazily, subtree by
+    subtree, so memory stays bounded for large projects.
+    """
+
+    def __init__(
+        self,
+        schema_dir: Optional[Union[str, Path]] = None,
+        cache_dir: Optional[Union[str, Path]] = None
+    ):
+        schema_dir = schema_dir or os.getenv("FL2CU_SCHEMA_DIR")
+        self.schema_dir = Path(schema_dir) if schema_dir else None
+        self.cache_dir = Path(cache_dir) if cache_dir else CACHE_DIR
+        self.logger = logging.getLogger(__name__)
+
+    def get_schema(self, name: str) -> xmlschema.XMLSchema:
+        """Get compiled schema, from memory, the disk cache or by compiling it."""
+        source = self._read_schema(name)
+        source_hash = hashlib.sha256(source).hexdigest()
+        schema = _compiled.get(source_hash)
+        if schema is None:
+            schema = _compiled[source_hash] = self._load_schema(name, source, source_hash)
+        return schema
+
+    def _read_schema(self, name: str) -> bytes:
+        if self.schema_dir is None:
+            return _read_packaged_schema(name)
+        xsd_path = self.schema_dir / name
+        if not xsd_path.exists():
+            raise FileNotFoundError(f"Schema not found: {xsd_path}")
+        return xsd_path.read_bytes()
+
+    def _load_schema(self, name: str, source: bytes, source_hash: str) -> xmlschema.XMLSchema:
+        header = {'xsd': source_hash, 'xmlschema': xmlschema.__version__}
+        cache_path = self.cache_dir / f"{Path(name).stem}-{source_hash[:16]}.pickle"
+        schema = self._read_cache(cache_path, header)
+        if schema is not None:
+            return schema
+
+        schema = xmlschema.XMLSchema(io.BytesIO(source))
+        try:
+            self.cache_dir.mkdir(mode=0o700, parents=True, exist_ok=True)
+            payload = pickle.dumps(schema, protocol=pickle.HIGHEST_PROTOCOL)
+            header['payload'] = hashlib.sha256(payload).hexdigest()
+            tmp_path = cache_path.with_suffix(f".{os.getpid()}.tmp")
+            with open(tmp_path, 'wb') as f:
+                f.write(json.dumps(header).encode() + b"\n")
+                f.write(payload)
+            os.replace(tmp_path, cache_path)
+        except OSError as e:
+            self.logger.debug(f"Could not cache compiled schema: {e}")
+        return schema
+
+    def _read_cache(
+        self, cache_path: Path, header: Dict[str, str]
+    ) -> Optional[xmlschema.XMLSchema]:
+        """Unpickle a cached schema only if it can be trusted and matches the XSD."""
+        try:
+            with open(cache_path, 'rb') as f:
+                stat = os.fstat(f.fileno())
+                if hasattr(os, 'getuid') and (stat.st_uid != os.getuid() or stat.st_mode & 0o022):
+                    self.logger.warning(
+                        f"Ignoring schema cache not private to this user: {cache_path}"
+                    )
+                    return None
+                cached_header = json.loads(f.readline())
+                payload = f.read()
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            self.logger.debug(f"Ignoring unreadable schema cache {cache_path}: {e}")
+            return None
+
+        expected = dict(header, payload=hashlib.sha256(payload).hexdigest())
+        if cached_header != expected:
+            self.logger.debug(f"Ignoring stale schema cache {cache_path}")
+            return None
+        try:
+            schema: xmlschema.XMLSchema = pickle.loads(payload)
+        except Exception as e:
+            self.logger.debug(f"Ignoring unreadable schema cache {cache_path}: {e}")
+            return None
+        self.logger.debug(f"Loaded compiled schema from {cache_path}")
+        return schema
+
+    def validate(self, xml_path: Path, schema_name: str) -> List[str]:
+        """Validate a document and return readable errors (empty when valid)."""
+        schema = self.get_schema(schema_name)
+        errors = []
+        for error in schema.iter_errors(XMLResource(str(xml_path), lazy=True)):
+            errors.append(f"{xml_path.name}: {error.path or '/'}: {error.reason}")
+            if len(errors) >= MAX_REPORTED_ERRORS:
+                errors.append(f"{xml_path.name}: stopped after {MAX_REPORTED_ERRORS} errors")
+                break
+        return errors
+
+    def validate_project(
+        self, project_path: Path, metadata_path: Optional[Path] = None
+    ) -> List[str]:
+        """Validate project.xml and, if given, metadata.xml."""
+        errors = self.validate(project_path, "Project.xsd")
+        if metadata_path is not None:
+            errors.extend(self.validate(metadata_path, "MetaData.xsd"))
+        return errors
+
+    def validate_async(
+        self, project_path: Path, metadata_path: Optional[Path] = None
+    ) -> 'Future[List[str]]':
+        """Validate in a background thread, e.g. while audio files are packaged."""
+        executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="fl2cu-validate")
+        future = executor.submit(self.validate_project, project_path, metadata_path)
+        executor.shutdown(wait=False)
+        return future
@@ -0,0 +1,26 @@
+from xml.etree import ElementTree as ET
+from typing import Optional
+
+from ...models.automation import AutomationLane
+from ..xml_utils import BeatFormatter
+
+class AutomationGenerator:
+    """Handles creation of Points elements for automation lanes."""
+    
+    def __init__(self, formatter: Optional[BeatFormatter] = None):
+        self.formatter = formatter or BeatFormatter()
+    
+    def create_points(self, lane: AutomationLane, parameter_id: str) -> ET.Element:
+        """Create Points element targeting a parameter, with normalized values."""
+        fmt = self.formatter
+        points = ET.Element("Points", unit="normalized")
+        ET.SubElement(points, "Target", parameter=parameter_id)
+        
+        for time, value in zip(lane.times.tolist(), lane.values.tolist()):
+            ET.SubElement(points, "RealPoint",
+                time=fmt.beats(time),
+                value=fmt.beats(value),
+                interpolation="linear"
+            )
+        
+        return points
@@ -1,15 +1,124 @@
 from xml.etree import ElementTree as ET
-from ...models.clip import Clip
+from pathlib import Path
+from typing import Dict, IO, Optional, Tuple
+
+from ...models.clip_table import ClipRow
+from ...transcode import AudioTranscoder
+from ...utils.audio_probe import probe_audio
+from ..xml_utils import BeatFormatter, escape_attribute
+
+# Clip subtree as create_clip builds it, laid out like XMLWriter.format_xml
+# does; {i0}..{i5} are the newline + indentation runs for each nesting level
+CLIP_START = (
+    '<Clip time="{{time}}" duration="{{duration}}" playStart="{{play_start}}" '
+    'fadeTimeUnit="beats" name="{{name}}" enable="{{enable}}">{i1}'
+    '<Clips>{i2}'
+    '<Clip contentTimeUnit="beats" time="{{time}}" duration="{{duration}}">{i3}'
+)
+CLIP_END = (
+    '</Clip>{i2}'
+    '</Clips>{i1}'
+    '</Clip>{i0}'
+)
+CLIP_TEMPLATE = CLIP_START + (
+    '<Audio channels="{{channels}}" sampleRate="{{sample_rate}}" '
+    'duration="{{source_duration}}">{i4}'
+    '<File path="{{path}}" external="false" />{i4}'
+    '</Audio>{i3}'
+) + CLIP_END
+# Stretched clips map the source seconds onto the clip's beats with two warps
+WARPED_CLIP_TEMPLATE = CLIP_START + (
+    '<Warps contentTimeUnit="seconds" timeUnit="beats">{i4}'
+    '<Audio algorithm="{{algorithm}}" channels="{{channels}}" sampleRate="{{sample_rate}}" '
+    'duration="{{source_duration}}">{i5}'
+    '<File path="{{path}}" external="false" />{i5}'
+    '</Audio>{i4}'
+    '<Warp time="0" contentTime="0" />{i4}'
+    '<Warp time="{{warp_beats}}" contentTime="{{source_duration}}" />{i4}'
+    '</Warps>{i3}'
+) + CLIP_END
 
 class ClipGenerator:
     """Handles creation of Clip XML elements."""
     
-    def create_clip(self, clip: Clip) -> ET.Element:
-        """Create Clip element from Clip model."""
+    def __init__(
+        self,
+        formatter: Optional[BeatFormatter] = None,
+        indent: str = "  ",
+        transcoder: Optional[AudioTranscoder] = None
+    ):
+        self.formatter = formatter or BeatFormatter()
+        self.indent = indent
+        self.transcoder = transcoder
+        self._templates: Dict[Tuple[int, bool], str] = {}
+        # Channels, sample rate and path of each packaged source
+        self._audio: Dict[Tuple[Optional[Path], str], Tuple[str, str, str]] = {}
+
+    def get_audio_attributes(self, clip: ClipRow) -> Tuple[str, str, str]:
+        """Get channels, sample rate and archive path of a clip's audio.
+
+        Sources converted by the transcoder take its output format; others
+        use clip metadata, then the file header, then stereo 48 kHz.
+        """
+        key = (clip.source_path, clip.output_filename)
+        attributes = self._audio.get(key)
+        if attributes is not None:
+            return attributes
+
+        source = clip.source_path
+        target = self.transcoder.get_format(source) if self.transcoder else None
+        if target is not None:
+            channels, sample_rate = target.channels, target.sample_rate
+            filename = f"{clip.name}.{target.extension}"
+        else:
+            info = probe_audio(source) if source else None
+            metadata = clip.metadata
+            channels = metadata.get('channels', info.channels if info else 2)
+            sample_rate = metadata.get('sample_rate', info.sample_rate if info else 48000)
+            filename = clip.output_filename
+        attributes = self._audio[key] = (str(channels), str(sample_rate), f"audio/{filename}")
+        return attributes
+
+    def write_clip(self, clip: ClipRow, stream: IO[str], level: int) -> None:
+        """Write a clip subtree straight to a stream without building elements.
+
+        Produces the same text as serializing create_clip's element at the
+        given nesting level, tail included.
+        """
+        fmt = self.formatter
+        ppq = clip.ppq
+        channels, sample_rate, path = self.get_audio_attributes(clip)
+        warp_beats = clip.warp_beats
+        stream.write(self._get_template(level, warp_beats > 0).format(
+            time=fmt.ticks(clip.position_ticks, ppq),
+            duration=fmt.ticks(clip.duration_ticks, ppq),
+            play_start=fmt.beats(clip.start_offset),
+            name=escape_attribute(clip.name),
+            enable="false" if clip.muted else "true",
+            channels=escape_attribute(channels),
+            sample_rate=escape_attribute(sample_rate),
+            path=escape_attribute(path),
+            source_duration=fmt.beats(clip.source_duration),
+            warp_beats=fmt.beats(warp_beats),
+            algorithm=escape_attribute(clip.warp_algorithm)
+        ))
+
+    def _get_template(self, level: int, warped: bool = False) -> str:
+        template = self._templates.get((level, warped))
+        if template is None:
+            runs = {f"i{depth}": "\n" + self.indent * (level + depth) for depth in range(6)}
+            layout = WARPED_CLIP_TEMPLATE if warped else CLIP_TEMPLATE
+            template = self._templates[(level, warped)] = layout.format(**runs)
+        return template
+    
+    def create_clip(self, clip: ClipRow) -> ET.Element:
+        """Create Clip element from clip table row."""
+        fmt = self.formatter
+        ppq = clip.ppq
         clip_el = ET.Element("Clip",
-            time=str(clip.position),
-            duration=str(clip.duration),
-            playStart=str(clip.start_offset),
+            time=fmt.ticks(clip.position_ticks, ppq),
+            duration=fmt.ticks(clip.duration_ticks, ppq),
+            playStart=fmt.beats(clip.start_offset),
             fadeTimeUnit="beats",
             name=clip.name,
             enable=str(not clip.muted).lower()
@@ -21,25 +130,44 @@ class ClipGenerator:
         
         return clip_el
         
-    def create_audio_clip(self, clip: Clip) -> ET.Element:
+    def create_audio_clip(self, clip: ClipRow) -> ET.Element:
         """Create inner audio clip element with proper file reference."""
+        ppq = clip.ppq
         inner_clip = ET.Element("Clip",
             contentTimeUnit="beats",
-            time=str(clip.position),
-            duration=str(clip.duration),
+            time=self.formatter.ticks(clip.position_ticks, ppq),
+            duration=self.formatter.ticks(clip.duration_ticks, ppq),
         )
         
-        # Add audio element with channel/sample rate from metadata if available
-        audio = ET.SubElement(inner_clip, "Audio",
-            channels=str(clip.metadata.get('channels', 2)),
-            sampleRate=str(clip.metadata.get('sample_rate', 48000))
+        # Stretched sources are wrapped in Warps mapping seconds to beats
+        parent = inner_clip
+        audio_attrib = {}
+        if clip.warp_beats > 0:
+            parent = ET.SubElement(inner_clip, "Warps",
+                contentTimeUnit="seconds",
+                timeUnit="beats"
+            )
+            audio_attrib["algorithm"] = clip.warp_algorithm
+        
+        # Add audio element with channel/sample rate of the packaged file
+        channels, sample_rate, audio_path = self.get_audio_attributes(clip)
+        audio = ET.SubElement(parent, "Audio",
+            audio_attrib,
+            channels=channels,
+            sampleRate=sample_rate,
+            duration=self.formatter.beats(clip.source_duration)
         )
         
-        # Use the output filename that preserves original format
-        audio_path = f"audio/{clip.output_filename}"
         ET.SubElement(audio, "File",
             path=audio_path,
             external="false"
         )
         
+        if clip.warp_beats > 0:
+            ET.SubElement(parent, "Warp", time="0", contentTime="0")
+            ET.SubElement(parent, "Warp",
+                time=self.formatter.beats(clip.warp_beats),
+                contentTime=self.formatter.beats(clip.source_duration)
+            )
+        
         return inner_clip
\ No newline at end of file
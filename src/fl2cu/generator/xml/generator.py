@@ -1,60 +1,280 @@
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+import io
 import logging
+import tempfile
 from pathlib import Path
 from xml.etree import ElementTree as ET
-from typing import Dict, List
+from typing import (
+    AbstractSet, Callable, Dict, FrozenSet, IO, Iterable, Iterator, List, Mapping, Optional,
+    Sequence, Set, Tuple, Union
+)
 
 from .structure import BaseStructureGenerator
 from .track import TrackGenerator
 from .clip import ClipGenerator
+from .automation import AutomationGenerator
+from .notes import NotesGenerator
 from ...models.arrangement import Arrangement
 from ...models.clip import Clip
+from ...models.clip_table import ClipRow
+from ...models.pattern import PatternClip
+from ...models.track import Track
+from ...transcode import AudioTranscoder
+from ..xml_utils import BeatFormatter, XMLStreamWriter, DEFAULT_PRECISION
+
+LANES_SPOOL_SIZE = 8 * 1024 * 1024  # Buffered lanes XML kept in memory before spilling to disk
+
+# Structure fragment, lanes fragment and (source path, clip row index) of referenced clips
+TrackFragments = Tuple[str, str, List[Tuple[Path, int]]]
+
+_worker_generator: Optional['DAWProjectXMLGenerator'] = None
+
+
+def _init_worker(
+    precision: int, target_format: Optional[Tuple[Optional[int], Optional[int], bool]]
+) -> None:
+    global _worker_generator
+    # Workers only need the transcoder's format decisions, not its pool
+    transcoder = AudioTranscoder(*target_format) if target_format else None
+    _worker_generator = DAWProjectXMLGenerator([], {}, precision, transcoder=transcoder)
+
+
+def _render_track_in_worker(track: Track, owned_patterns: FrozenSet[int]) -> TrackFragments:
+    """Render fragments of a track in a worker process."""
+    generator = _worker_generator
+    if generator is None:
+        raise RuntimeError("Track rendering worker was not initialized")
+    generator.referenced_clips = {}
+    structure, lanes = generator.render_track(track, owned_patterns)
+    referenced = [(path, clip.index) for path, clip in generator.referenced_clips.items()]
+    return structure, lanes, referenced
+
 
 class DAWProjectXMLGenerator:
     """Main XML generator coordinating all components."""
     
-    def __init__(self, arrangements: List[Arrangement], clip_paths: Dict[Clip, Path]):
+    def __init__(
+        self,
+        arrangements: Sequence[Arrangement],
+        clip_paths: Optional[Mapping[Path, Union[Clip, ClipRow]]],
+        precision: int = DEFAULT_PRECISION,
+        jobs: int = 1,
+        transcoder: Optional[AudioTranscoder] = None
+    ):
         self.arrangements = arrangements
         self.clip_paths = clip_paths
+        self.precision = precision
+        self.jobs = jobs
+        self.transcoder = transcoder
         self.logger = logging.getLogger(__name__)
         
+        # Source path -> first clip using it, filled while XML is written
+        self.referenced_clips: Dict[Path, ClipRow] = {}
+        
+        # Shared so tick and beat strings are cached across all clips
+        self.formatter = BeatFormatter(precision)
         self.structure_gen = BaseStructureGenerator()
         self.track_gen = TrackGenerator()
-        self.clip_gen = ClipGenerator()
+        self.clip_gen = ClipGenerator(self.formatter, transcoder=transcoder)
+        self.automation_gen = AutomationGenerator(self.formatter)
+        self.notes_gen = NotesGenerator(self.formatter)
+        
+        # Patterns whose Notes the track being rendered still has to write inline
+        self._pending_patterns: Set[int] = set()
 
     def generate_xml(self, project_name: str) -> ET.Element:
         """Generate complete DAWproject XML structure."""
+        buffer = io.StringIO()
+        self.write_xml(buffer)
+        return ET.fromstring(buffer.getvalue())
+
+    def write_xml(self, stream: IO[str]) -> None:
+        """Stream DAWproject XML to a text stream in a single pass over the tracks.
+
+        Track elements are written to the Structure section as they are
+        generated, while their Lanes fragments are buffered in a spool file
+        that only moves to disk for large arrangements. Referenced clips
+        are collected on the way in referenced_clips. With jobs > 1 the
+        track fragments are rendered in worker processes and written in
+        track order, producing the same document.
+        """
+        writer = XMLStreamWriter(stream)
+        writer.write_declaration()
+        
         root = self.structure_gen.create_root()
-        root.append(self.structure_gen.create_application_info())
+        writer.start(root.tag, root.attrib, level=0)
+        writer.element(self.structure_gen.create_application_info(), level=1)
         
-        if not self.arrangements:
-            return root
+        if self.arrangements:
+            arrangement = self.arrangements[0]
+            if arrangement.project is None:
+                raise ValueError(f"Arrangement {arrangement.name} is not part of a project")
+            timing = arrangement.project.timing
             
-        arrangement = self.arrangements[0]
-        timing = arrangement.project.timing
-        
-        # Add transport
-        root.append(self.structure_gen.create_transport(timing))
+            # Add transport
+            writer.element(self.structure_gen.create_transport(timing), level=1)
+            
+            with tempfile.SpooledTemporaryFile(
+                max_size=LANES_SPOOL_SIZE, mode='w+', encoding='utf-8'
+            ) as lanes_spool:
+                # Create structure with tracks, buffering lanes for the arrangement section
+                writer.start("Structure", level=1)
+                writer.element(self.track_gen.create_master_track(), level=2)
+                for structure, lanes in self._iter_track_fragments(arrangement):
+                    writer.write(structure)
+                    lanes_spool.write(lanes)
+                writer.end("Structure", level=1)
+                
+                # Create arrangement section
+                writer.start("Arrangement", level=1)
+                writer.start("Lanes", {"timeUnit": "beats"}, level=2)
+                writer.copy_from(lanes_spool)
+                writer.end("Lanes", level=2)
+            
+            # Tempo automation follows the lanes in the arrangement
+            if timing.tempo_map and not timing.tempo_map.is_constant:
+                writer.element(
+                    self.structure_gen.create_tempo_automation(timing.tempo_map, self.formatter),
+                    level=2
+                )
+            writer.end("Arrangement", level=1)
         
-        # Create structure with tracks
-        structure = ET.SubElement(root, "Structure")
+        writer.end(root.tag, level=0)
+
+    def render_track(
+        self, track: Track, owned_patterns: Optional[AbstractSet[int]] = None
+    ) -> Tuple[str, str]:
+        """Serialize the Structure and Lanes fragments of a track.
+
+        Args:
+            track: Track to render
+            owned_patterns: Ids of patterns whose Notes this track writes
+                inline; other pattern clips only reference them. Defaults to
+                all patterns of the track.
+        """
+        if owned_patterns is None:
+            owned_patterns = {clip.pattern_id for clip in track.pattern_clips}
+        self._pending_patterns = set(owned_patterns)
+        lanes = io.StringIO()
+        self._write_track_lanes(track, XMLStreamWriter(lanes), level=3)
+        return (
+            XMLStreamWriter.serialize(self.track_gen.create_track(track), level=2),
+            lanes.getvalue()
+        )
+
+    def _iter_track_fragments(self, arrangement: Arrangement) -> Iterator[Tuple[str, str]]:
+        """Yield track fragments in track order, rendered in parallel if enabled."""
         tracks = arrangement.get_tracks()
-        
+        owners = self._assign_pattern_owners(tracks)
+        if self.jobs <= 1 or len(tracks) < 2:
+            for track, owned_patterns in zip(tracks, owners):
+                yield self.render_track(track, owned_patterns)
+            return
+
+        workers = min(self.jobs, len(tracks))
+        self.logger.debug(f"Rendering {len(tracks)} tracks in {workers} processes")
+        target_format = None
+        if self.transcoder is not None:
+            transcoder = self.transcoder
+            target_format = (transcoder.sample_rate, transcoder.bit_depth, transcoder.flac)
+        with ProcessPoolExecutor(
+            max_workers=workers, initializer=_init_worker,
+            initargs=(self.precision, target_format)
+        ) as executor:
+            chunksize = max(1, len(tracks) // (workers * 4))
+            results = executor.map(_render_track_in_worker, tracks, owners, chunksize=chunksize)
+            for track, (structure, lanes, referenced) in zip(tracks, results):
+                for path, index in referenced:
+                    self.referenced_clips.setdefault(path, track.clips[index])
+                yield structure, lanes
+
+    @staticmethod
+    def _assign_pattern_owners(tracks: Sequence[Track]) -> List[FrozenSet[int]]:
+        """Give each pattern to the first track placing it, which writes its Notes."""
+        seen: Set[int] = set()
+        owners = []
         for track in tracks:
-            track_el = self.track_gen.create_track(track)
-            structure.append(track_el)
-        
-        # Create arrangement section
-        arr_el = ET.SubElement(root, "Arrangement")
-        lanes = ET.SubElement(arr_el, "Lanes", timeUnit="beats")
+            owned = {clip.pattern_id for clip in track.pattern_clips} - seen
+            seen.update(owned)
+            owners.append(frozenset(owned))
+        return owners
+
+    def _write_track_lanes(self, track: Track, writer: XMLStreamWriter, level: int) -> None:
+        """Write Lanes element with the clips and automation of a track.
+
+        Overlapping clips are split into nested sub-lanes, one Clips list
+        each, so no lane holds clips that play over each other. Pattern
+        clips get sub-lanes of their own after the audio ones. Automation
+        lanes follow as Points.
+        """
+        attrib = {"track": track.id}
+        if not track.clips and not track.pattern_clips and not track.automation:
+            writer.element(ET.Element("Lanes", attrib), level)
+            return
         
-        # Add clips for each track
-        for track in tracks:
-            track_lanes = ET.SubElement(lanes, "Lanes", track=track.id)
-            
-            if track.clips:
-                clips_el = ET.SubElement(track_lanes, "Clips")
-                for clip in track.clips:
-                    clip_el = self.clip_gen.create_clip(clip)
-                    clips_el.append(clip_el)
+        writer.start("Lanes", attrib, level)
+        clip_lanes = self._get_clip_lanes(track)
+        if len(clip_lanes) == 1:
+            clip_lanes[0](writer, level + 1)
+        elif len(clip_lanes) > 1:
+            self.logger.debug(
+                f"Track {track.name} has overlapping clips, using {len(clip_lanes)} lanes"
+            )
+            for lane, write_lane in enumerate(clip_lanes):
+                writer.start("Lanes", {"id": f"{track.id}-lane-{lane}"}, level + 1)
+                write_lane(writer, level + 2)
+                writer.end("Lanes", level + 1)
         
-        return root
\ No newline at end of file
+        # Automation targets the track channel's own parameters
+        for automation_lane in track.automation:
+            parameter_id = f"{track.id}_ch_{automation_lane.target}"
+            points = self.automation_gen.create_points(automation_lane, parameter_id)
+            writer.element(points, level + 1)
+        writer.end("Lanes", level)
+
+    def _get_clip_lanes(self, track: Track) -> List[Callable[[XMLStreamWriter, int], None]]:
+        """Get a writer for each sub-lane of audio and pattern clips, in lane order."""
+        clip_lanes: List[Callable[[XMLStreamWriter, int], None]] = []
+
+        lane_ids, lane_count = track.lanes
+        if lane_count == 1:
+            clip_lanes.append(lambda writer, level: self._write_clips(track.clips, writer, level))
+        elif lane_count > 1:
+            ordered = track.clips.order_by_position()
+            for lane in range(lane_count):
+                indices = ordered[lane_ids[ordered] == lane]
+                clip_lanes.append(
+                    partial(self._write_clips, [track.clips[int(i)] for i in indices])
+                )
+
+        pattern_clips = track.pattern_clips
+        if pattern_clips:
+            lane_ids, lane_count = track.pattern_lanes
+            pattern_order = sorted(
+                range(len(pattern_clips)),
+                key=lambda i: (pattern_clips[i].position_ticks, pattern_clips[i].duration_ticks)
+            )
+            for lane in range(lane_count):
+                clips = [pattern_clips[i] for i in pattern_order if lane_ids[i] == lane]
+                clip_lanes.append(partial(self._write_pattern_clips, clips))
+        return clip_lanes
+
+    def _write_clips(self, clips: Iterable[ClipRow], writer: XMLStreamWriter, level: int) -> None:
+        """Write a Clips list through the template-based clip emitter."""
+        writer.start("Clips", level=level)
+        for clip in clips:
+            self.clip_gen.write_clip(clip, writer.stream, level + 1)
+            self.referenced_clips.setdefault(clip.source_path, clip)
+        writer.end("Clips", level)
+
+    def _write_pattern_clips(
+        self, clips: Iterable[PatternClip], writer: XMLStreamWriter, level: int
+    ) -> None:
+        """Write a Clips list of pattern clips, inlining Notes the track owns."""
+        writer.start("Clips", level=level)
+        for clip in clips:
+            inline = clip.pattern_id in self._pending_patterns
+            self._pending_patterns.discard(clip.pattern_id)
+            self.notes_gen.write_clip(clip, writer.stream, level + 1, inline)
+        writer.end("Clips", level)
@@ -0,0 +1,91 @@
+from typing import Dict, IO, List, Optional
+
+from ...models.pattern import PatternClip, PatternNotes
+from ..xml_utils import BeatFormatter, escape_attribute
+
+NOTE_VALUE_RANGE = 128  # FL velocity and release run from 0 to 128
+
+# Pattern clip laid out like XMLWriter.format_xml does; {i0}..{i2} are the
+# newline + indentation runs for each nesting level
+PATTERN_CLIP_START = (
+    '<Clip time="{{time}}" duration="{{duration}}" playStart="{{play_start}}" '
+    'contentTimeUnit="beats" name="{{name}}" enable="{{enable}}"'
+)
+INLINE_NOTES_TEMPLATE = PATTERN_CLIP_START + '>{i1}<Notes id="{{notes_id}}"'
+REFERENCE_TEMPLATE = PATTERN_CLIP_START + ' reference="{{notes_id}}" />{i0}'
+
+
+class NotesGenerator:
+    """Writes pattern clips with their Notes straight to a stream.
+
+    A pattern's Notes are written once, inline in its first clip, and
+    every other placement of the pattern references them by id.
+    """
+
+    def __init__(self, formatter: Optional[BeatFormatter] = None, indent: str = "  "):
+        self.formatter = formatter or BeatFormatter()
+        self.indent = indent
+        self._templates: Dict[int, Dict[str, str]] = {}
+
+    @staticmethod
+    def get_notes_id(pattern_id: int) -> str:
+        return f"pattern-{pattern_id}"
+
+    def write_clip(self, clip: PatternClip, stream: IO[str], level: int, inline: bool) -> None:
+        """Write a pattern clip, with its notes inline or as a reference."""
+        fmt = self.formatter
+        ppq = clip.ppq
+        templates = self._get_templates(level)
+        values = dict(
+            time=fmt.ticks(clip.position_ticks, ppq),
+            duration=fmt.ticks(clip.duration_ticks, ppq),
+            play_start=fmt.ticks(clip.start_ticks, ppq),
+            name=escape_attribute(clip.name),
+            enable="false" if clip.muted else "true",
+            notes_id=self.get_notes_id(clip.pattern_id)
+        )
+        if not inline:
+            stream.write(templates['reference'].format(**values))
+            return
+
+        stream.write(templates['inline'].format(**values))
+        if len(clip.notes):
+            stream.write(">" + templates['i2'])
+            stream.write(self._encode_notes(clip.notes, templates['i2']))
+            stream.write("</Notes>")
+        else:
+            stream.write(" />")
+        stream.write(templates['i1'] + "</Clip>" + templates['i0'])
+
+    def _encode_notes(self, notes: PatternNotes, tail: str) -> str:
+        """Encode all Note elements of a pattern, each followed by its tail."""
+        ticks = self.formatter.ticks
+        ppq = notes.ppq
+        lines: List[str] = []
+        columns = zip(
+            notes.positions.tolist(),
+            notes.lengths.tolist(),
+            notes.channels.tolist(),
+            notes.keys.tolist(),
+            notes.velocities.tolist(),
+            notes.releases.tolist()
+        )
+        for position, length, channel, key, velocity, release in columns:
+            # Velocity and release are normalized through the tick cache since they repeat
+            lines.append(
+                f'<Note time="{ticks(position, ppq)}" duration="{ticks(length, ppq)}" '
+                f'channel="{channel}" key="{key}" vel="{ticks(velocity, NOTE_VALUE_RANGE)}" '
+                f'rel="{ticks(release, NOTE_VALUE_RANGE)}" />{tail}'
+            )
+        return "".join(lines)
+
+    def _get_templates(self, level: int) -> Dict[str, str]:
+        templates = self._templates.get(level)
+        if templates is None:
+            runs = {f"i{depth}": "\n" + self.indent * (level + depth) for depth in range(3)}
+            templates = self._templates[level] = dict(
+                runs,
+                inline=INLINE_NOTES_TEMPLATE.format(**runs),
+                reference=REFERENCE_TEMPLATE.format(**runs)
+            )
+        return templates
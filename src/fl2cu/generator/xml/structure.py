@@ -1,7 +1,13 @@
 # src/fl2cu/generator/xml/structure.py
 from xml.etree import ElementTree as ET
+from typing import Optional
+
 from ...models.project import Project
+from ...models.tempo_map import TempoMap
 from ...models.timing import ProjectTiming
+from ..xml_utils import BeatFormatter
+
+TEMPO_PARAMETER_ID = "transport-tempo"
 
 class BaseStructureGenerator:
     """Handles creation of basic DAWproject XML structure."""
@@ -21,7 +27,8 @@ class BaseStructureGenerator:
         
         ET.SubElement(transport, "Tempo",
             unit="bpm",
-            value=str(int(timing.tempo))
+            value=str(int(timing.tempo)),
+            id=TEMPO_PARAMETER_ID
         )
         
         ET.SubElement(transport, "TimeSignature",
@@ -29,4 +36,21 @@ class BaseStructureGenerator:
             denominator=str(timing.time_signature_denominator)
         )
         
-        return transport
\ No newline at end of file
+        return transport
+
+    def create_tempo_automation(
+        self, tempo_map: TempoMap, formatter: Optional[BeatFormatter] = None
+    ) -> ET.Element:
+        """Create TempoAutomation element from tempo map segments."""
+        formatter = formatter or BeatFormatter()
+        automation = ET.Element("TempoAutomation", unit="bpm")
+        ET.SubElement(automation, "Target", parameter=TEMPO_PARAMETER_ID)
+        
+        for beat, tempo in tempo_map:
+            ET.SubElement(automation, "RealPoint",
+                time=formatter.beats(beat),
+                value=formatter.beats(tempo),
+                interpolation="hold"
+            )
+            
+        return automation
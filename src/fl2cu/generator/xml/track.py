@@ -1,13 +1,16 @@
 from xml.etree import ElementTree as ET
 from ...models.track import Track
 
+MASTER_TRACK_ID = "master"
+MASTER_CHANNEL_ID = f"{MASTER_TRACK_ID}_ch"  # Destination of every track channel
+
 class TrackGenerator:
     """Handles creation of Track and Channel XML elements."""
     
     def create_track(self, track: Track) -> ET.Element:
         """Create Track element from Track model."""
         track_el = ET.Element("Track",
-            contentType="audio",
+            contentType=self._get_content_type(track),
             id=track.id,
             name=track.name,
             color=track.color if hasattr(track, 'color') else "#a2eabfff"
@@ -17,7 +20,30 @@ class TrackGenerator:
         track_el.append(self.create_channel(track))
         
         return track_el
+
+    def create_master_track(self) -> ET.Element:
+        """Create the master Track that track channels are routed to."""
+        track_el = ET.Element("Track",
+            contentType="audio",
+            id=MASTER_TRACK_ID,
+            name="Master",
+            color="#c04000"
+        )
+        ET.SubElement(track_el, "Channel",
+            role="master",
+            audioChannels="2",
+            id=MASTER_CHANNEL_ID,
+            name="Master"
+        )
+        return track_el
         
+    def _get_content_type(self, track: Track) -> str:
+        """Get space separated content types of a track's lanes."""
+        pattern_clips = getattr(track, 'pattern_clips', None)
+        if not pattern_clips:
+            return "audio"
+        return "audio notes" if len(track.clips) else "notes"
+
     def create_channel(self, track: Track) -> ET.Element:
         """Create Channel element from Track model."""
         channel = ET.Element("Channel",
@@ -25,7 +51,7 @@ class TrackGenerator:
             audioChannels="2",
             id=f"{track.id}_ch",
             name=track.name,
-            destination="id0"
+            destination=MASTER_CHANNEL_ID
         )
         
         self._add_channel_settings(channel, track)
@@ -39,6 +65,7 @@ class TrackGenerator:
         )
         
         ET.SubElement(channel_el, "Pan",
+            id=f"{channel_el.get('id')}_pan",
             value=str(track.pan) if hasattr(track, 'pan') else "0.5",
             unit="normalized",
             min="0",
@@ -47,6 +74,7 @@ class TrackGenerator:
         )
         
         ET.SubElement(channel_el, "Volume",
+            id=f"{channel_el.get('id')}_volume",
             value=str(track.volume) if hasattr(track, 'volume') else "1",
             unit="linear",
             min="0",
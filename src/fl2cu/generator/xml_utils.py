@@ -1,8 +1,41 @@
 from xml.etree import ElementTree as ET
-from typing import Optional
+from functools import lru_cache
+from typing import Any, Dict, IO, Optional
+from xml.sax.saxutils import escape
 import logging
+import shutil
 from pathlib import Path
 
+DEFAULT_PRECISION = 6  # Decimal places for beat values in project.xml
+
+
+class BeatFormatter:
+    """Formats timeline values for XML attributes with bounded precision.
+
+    Values are rendered with at most `precision` decimals and trailing zeros
+    stripped, so 16 ticks at PPQ 96 becomes "0.166667" and whole beats become
+    "4". Formatted tick values are cached since positions repeat a lot.
+    """
+
+    def __init__(self, precision: int = DEFAULT_PRECISION, cache_size: int = 65536):
+        if precision < 0:
+            raise ValueError("Precision cannot be negative")
+        self.precision = precision
+        self.ticks = lru_cache(maxsize=cache_size)(self._format_ticks)
+
+    def beats(self, value: float) -> str:
+        """Format a value in beats."""
+        text = f"{value:.{self.precision}f}"
+        if '.' in text:
+            text = text.rstrip('0').rstrip('.')
+        return "0" if text == "-0" else text
+
+    def _format_ticks(self, ticks: int, ppq: int) -> str:
+        """Format an integer tick position as beats."""
+        if ticks % ppq == 0:
+            return str(ticks // ppq)
+        return self.beats(ticks / ppq)
+
 class XMLWriter:
     """Handles XML file writing with proper formatting."""
     
@@ -51,4 +84,65 @@ class XMLWriter:
             
         except Exception as e:
             logger.error(f"Failed to write XML to {output_path}: {e}")
-            return False
\ No newline at end of file
+            return False
+
+
+_ATTRIB_ENTITIES = {'"': "&quot;", "\r": "&#13;", "\n": "&#10;", "\t": "&#09;"}
+
+
+@lru_cache(maxsize=65536)
+def _escape_text(text: str) -> str:
+    return escape(text, _ATTRIB_ENTITIES)
+
+
+def escape_attribute(value: Any) -> str:
+    """Escape a value for a double-quoted attribute, the way ElementTree does.
+
+    Names, paths and algorithms repeat across clips, so escaped text is cached.
+    """
+    return _escape_text(str(value))
+
+
+class XMLStreamWriter:
+    """Writes an XML document incrementally, one formatted subtree at a time.
+
+    Output matches XMLWriter.write_xml for the same tree, but only the
+    subtree currently being written has to be held in memory.
+    """
+
+    def __init__(self, stream: IO[str], indent: str = "  "):
+        self.stream = stream
+        self.indent = indent
+
+    def write_declaration(self, encoding: str = 'UTF-8') -> None:
+        self.stream.write(f'<?xml version="1.0" encoding="{encoding}"?>\n')
+
+    def start(self, tag: str, attrib: Optional[Dict[str, str]] = None, level: int = 0) -> None:
+        """Open an element that will have children written after it."""
+        attrs = "".join(
+            f' {key}="{escape_attribute(value)}"' for key, value in (attrib or {}).items()
+        )
+        self.stream.write(f"<{tag}{attrs}>\n{self.indent * (level + 1)}")
+
+    def end(self, tag: str, level: int = 0) -> None:
+        """Close an element opened with start()."""
+        self.stream.write(f"</{tag}>\n{self.indent * level}")
+
+    def element(self, elem: ET.Element, level: int = 0) -> None:
+        """Format and write a complete subtree."""
+        self.stream.write(self.serialize(elem, level, self.indent))
+
+    def write(self, fragment: str) -> None:
+        """Write a fragment already serialized for its nesting level."""
+        self.stream.write(fragment)
+
+    def copy_from(self, source: IO[str]) -> None:
+        """Copy pre-serialized fragments, e.g. from a spool file."""
+        source.seek(0)
+        shutil.copyfileobj(source, self.stream)
+
+    @staticmethod
+    def serialize(elem: ET.Element, level: int = 0, indent: str = "  ") -> str:
+        """Format a subtree for the given nesting level and serialize it."""
+        XMLWriter.format_xml(elem, level, indent)
+        return ET.tostring(elem, encoding='unicode')
@@ -0,0 +1,81 @@
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import IO, Iterable, Iterator, List, Optional
+import csv
+import json
+import logging
+import os
+
+from .models.inventory import ProjectInventory
+from .parser.inventory_parser import FLInventoryParser
+
+CSV_COLUMNS = [
+    'source_path', 'version', 'arrangement_count', 'track_count', 'clip_count',
+    'sample_count', 'missing_count', 'total_audio_bytes',
+    'sample_path', 'resolved_path', 'status', 'size', 'use_count', 'error'
+]
+
+
+def collect_flp_files(paths: Iterable[Path]) -> List[Path]:
+    """Expand directories into the .flp files they contain."""
+    files = []
+    for path in paths:
+        if path.is_dir():
+            files.extend(sorted(p for p in path.rglob('*') if p.suffix.lower() == '.flp'))
+        else:
+            files.append(path)
+    return files
+
+
+def inspect_project(file_path: Path) -> ProjectInventory:
+    """Scan a single project, recording failures on the inventory instead of raising."""
+    try:
+        return FLInventoryParser(file_path).parse_inventory()
+    except Exception as e:
+        logging.getLogger(__name__).debug(f"Failed to inspect {file_path}: {e}")
+        return ProjectInventory(source_path=file_path, error=str(e))
+
+
+def inspect_projects(files: List[Path], jobs: Optional[int] = None) -> Iterator[ProjectInventory]:
+    """Scan projects in parallel, yielding inventories in input order.
+
+    Args:
+        files: Project files to scan.
+        jobs: Worker processes; defaults to the CPU count, 1 scans in-process.
+    """
+    jobs = jobs or os.cpu_count() or 1
+    if jobs == 1 or len(files) < 2:
+        yield from map(inspect_project, files)
+        return
+
+    with ProcessPoolExecutor(max_workers=min(jobs, len(files))) as executor:
+        chunksize = max(1, len(files) // (jobs * 4))
+        yield from executor.map(inspect_project, files, chunksize=chunksize)
+
+
+def write_json(inventories: Iterable[ProjectInventory], stream: IO[str]) -> None:
+    json.dump([inventory.to_dict() for inventory in inventories], stream, indent=2)
+    stream.write('\n')
+
+
+def write_csv(inventories: Iterable[ProjectInventory], stream: IO[str]) -> None:
+    """Write one row per project sample, repeating the project counts on each row."""
+    writer = csv.DictWriter(stream, fieldnames=CSV_COLUMNS)
+    writer.writeheader()
+    for inventory in inventories:
+        project = inventory.to_dict()
+        summary = {column: project[column] for column in CSV_COLUMNS[:8]}
+        summary['error'] = inventory.error
+        if not inventory.samples:
+            writer.writerow(summary)
+            continue
+        for sample in inventory.samples:
+            sample_row = sample.to_dict()
+            writer.writerow({
+                **summary,
+                'sample_path': sample_row['path'],
+                'resolved_path': sample_row['resolved_path'],
+                'status': sample_row['status'],
+                'size': sample_row['size'],
+                'use_count': sample_row['use_count']
+            })
@@ -0,0 +1,85 @@
+from concurrent.futures import ThreadPoolExecutor
+from io import BufferedIOBase
+from pathlib import Path
+from typing import Dict, Iterable, List, NamedTuple, Optional, cast
+import logging
+import os
+import zipfile
+
+from .utils.hashing import HASH_NAME, hash_stream
+
+MANIFEST_NAME = "checksums.txt"
+MANIFEST_HEADER = f"# fl2cu checksums: {HASH_NAME}, size, member"
+
+
+class ManifestEntry(NamedTuple):
+    """Content hash and size of an archive member."""
+    name: str
+    digest: str
+    size: int
+
+
+def format_manifest(entries: Iterable[ManifestEntry]) -> str:
+    """Format manifest entries as text, one member per line."""
+    lines = [MANIFEST_HEADER]
+    lines.extend(f"{entry.digest}  {entry.size}  {entry.name}" for entry in entries)
+    return "\n".join(lines) + "\n"
+
+
+def parse_manifest(text: str) -> Dict[str, ManifestEntry]:
+    """Parse manifest text into entries keyed by member name."""
+    entries = {}
+    for line in text.splitlines():
+        if not line or line.startswith("#"):
+            continue
+        digest, size, name = line.split("  ", 2)
+        entries[name] = ManifestEntry(name, digest, int(size))
+    return entries
+
+
+def _check_member(archive_path: Path, entry: ManifestEntry) -> Optional[str]:
+    """Hash one member with its own archive handle; return an error or None."""
+    try:
+        with zipfile.ZipFile(archive_path) as zf, zf.open(entry.name) as member:
+            # ZipFile.open is typed as IO[bytes] but returns a buffered ZipExtFile
+            digest, size = hash_stream(cast(BufferedIOBase, member))
+    except KeyError:
+        return f"{entry.name}: missing"
+    except (OSError, zipfile.BadZipFile) as e:
+        return f"{entry.name}: {e}"
+    if size != entry.size:
+        return f"{entry.name}: size {size}, expected {entry.size}"
+    if digest != entry.digest:
+        return f"{entry.name}: checksum mismatch"
+    return None
+
+
+def verify_archive(archive_path: Path, jobs: Optional[int] = None) -> List[str]:
+    """Check archive members against its checksum manifest.
+
+    Members are read and hashed in parallel threads, each with its own
+    archive handle; zlib and BLAKE2 release the GIL on large buffers.
+
+    Returns:
+        Errors found, empty if the archive matches its manifest.
+    """
+    logger = logging.getLogger(__name__)
+    try:
+        with zipfile.ZipFile(archive_path) as zf:
+            names = set(zf.namelist())
+            if MANIFEST_NAME not in names:
+                return [f"{MANIFEST_NAME}: missing"]
+            entries = parse_manifest(zf.read(MANIFEST_NAME).decode('utf-8'))
+    except (OSError, zipfile.BadZipFile, ValueError) as e:
+        return [str(e)]
+
+    errors = [
+        f"{name}: not in manifest"
+        for name in sorted(names - set(entries) - {MANIFEST_NAME})
+    ]
+    workers = max(1, min(jobs or os.cpu_count() or 1, len(entries)))
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        results = executor.map(lambda entry: _check_member(archive_path, entry), entries.values())
+        errors.extend(error for error in results if error)
+    logger.debug(f"Verified {len(entries)} members of {archive_path.name} in {workers} threads")
+    return errors
@@ -1,28 +1,75 @@
-from dataclasses import dataclass, field
-from typing import List, Optional, TYPE_CHECKING
+from typing import Dict, Iterator, Optional, Tuple, TYPE_CHECKING
 from pathlib import Path
 
+from .tempo_map import TempoMap
 from .track import Track
 
 if TYPE_CHECKING:
     from .project import Project
 
 class Arrangement:
-    """Represents an arrangement containing tracks and clips."""
+    """Represents an arrangement containing tracks and clips.
+
+    Tracks are indexed by id, and clip count, source paths and end time
+    are accumulated as tracks are added.
+    """
     
     def __init__(self, name: str):
         self.name = name
-        self._tracks: List[Track] = []
+        self._tracks: Dict[str, Track] = {}
+        self._track_view: Optional[Tuple[Track, ...]] = None
         self.project: Optional['Project'] = None  # Use string type annotation
+        self.tempo_map: Optional[TempoMap] = None  # Set when the arrangement automates tempo
         
+        self._clip_count = 0
+        self._source_paths: Dict[Path, None] = {}  # Ordered set
+        self._end_time = 0.0
+
     def add_track(self, track: Track) -> None:
         """Add a track to the arrangement."""
-        self._tracks.append(track)
+        if track.id in self._tracks:
+            raise ValueError(f"Track {track.id} already exists")
+        self._tracks[track.id] = track
+        self._track_view = None
+
+        self._clip_count += track.clip_count
+        self._source_paths.update(dict.fromkeys(track.source_paths))
+        self._end_time = max(self._end_time, track.end_time)
         
-    def get_tracks(self) -> List[Track]:
-        """Get list of tracks."""
-        return self._tracks.copy()
+    def get_tracks(self) -> Tuple[Track, ...]:
+        """Get tracks as a tuple shared until the next track is added."""
+        if self._track_view is None:
+            self._track_view = tuple(self._tracks.values())
+        return self._track_view
+
+    def get_track(self, track_id: str) -> Optional[Track]:
+        """Find a track by its id."""
+        return self._tracks.get(track_id)
+
+    def iter_tracks(self) -> Iterator[Track]:
+        """Iterate tracks without copying the track list."""
+        return iter(self._tracks.values())
+
+    @property
+    def track_count(self) -> int:
+        return len(self._tracks)
+
+    @property
+    def clip_count(self) -> int:
+        return self._clip_count
+
+    @property
+    def source_paths(self) -> Tuple[Path, ...]:
+        """Unique clip source paths across all tracks, in first-use order."""
+        return tuple(self._source_paths)
+
+    @property
+    def end_time(self) -> float:
+        """End of the last clip in beats."""
+        return self._end_time
         
     def has_tracks(self) -> bool:
-        """Check if arrangement has any tracks with clips."""
-        return any(track.clips for track in self._tracks)
\ No newline at end of file
+        """Check if arrangement has any tracks with clips, pattern clips or automation."""
+        return self._clip_count > 0 or any(
+            track.pattern_clips or track.automation for track in self._tracks.values()
+        )
@@ -0,0 +1,70 @@
+from dataclasses import dataclass
+from typing import List, Tuple
+
+import numpy as np
+
+AUTOMATION_TARGETS = ("volume", "pan", "tempo")
+DEFAULT_TOLERANCE = 0.001  # Max deviation of decimated automation, in normalized units
+
+
+def decimate_points(times: np.ndarray, values: np.ndarray, tolerance: float) -> np.ndarray:
+    """Select points to keep so linear interpolation stays within tolerance.
+
+    Ramer-Douglas-Peucker on the vertical (value) distance, which keeps the
+    bound in parameter units regardless of the time scale. Each segment's
+    deviations are computed in one NumPy pass.
+
+    Returns:
+        Boolean mask of points to keep; first and last are always kept.
+    """
+    count = len(times)
+    keep = np.ones(count, dtype=bool)
+    if count <= 2 or tolerance <= 0:
+        return keep
+
+    keep[1:-1] = False
+    stack: List[Tuple[int, int]] = [(0, count - 1)]
+    while stack:
+        first, last = stack.pop()
+        if last - first < 2:
+            continue
+
+        inner_times = times[first + 1:last]
+        span = times[last] - times[first]
+        if span > 0:
+            slope = (values[last] - values[first]) / span
+            expected = values[first] + slope * (inner_times - times[first])
+        else:
+            # Vertical jump; compare against the value before it
+            expected = np.full(len(inner_times), values[first])
+        deviation = np.abs(values[first + 1:last] - expected)
+
+        worst = int(np.argmax(deviation))
+        if deviation[worst] > tolerance:
+            split = first + 1 + worst
+            keep[split] = True
+            stack.append((first, split))
+            stack.append((split, last))
+    return keep
+
+
+@dataclass
+class AutomationLane:
+    """Automation of one parameter on a track, as points in beats.
+
+    Values are normalized to 0..1 like FL stores them.
+    """
+    name: str
+    target: str
+    times: np.ndarray
+    values: np.ndarray
+    source_points: int = 0  # Point count before decimation
+
+    def __post_init__(self) -> None:
+        if self.target not in AUTOMATION_TARGETS:
+            raise ValueError(f"Unsupported automation target: {self.target}")
+        if len(self.times) != len(self.values):
+            raise ValueError("Automation times and values must have the same length")
+
+    def __len__(self) -> int:
+        return len(self.times)
@@ -1,4 +1,4 @@
-from typing import List, Optional, TYPE_CHECKING
+from typing import Dict, Optional, Tuple, TYPE_CHECKING
 from pathlib import Path
 from .timing import ProjectTiming
 
@@ -18,18 +18,30 @@ class BaseProject:
         self.timing = timing or ProjectTiming.default()
         self.source_path = Path(source_path) if source_path else None
         self.output_dir = Path(output_dir) if output_dir else None
-        self._arrangements: List['Arrangement'] = []
+        # Insertion-ordered, doubles as the name index
+        self._arrangements: Dict[str, 'Arrangement'] = {}
+        self._arrangement_view: Optional[Tuple['Arrangement', ...]] = None
 
     @property
-    def arrangements(self) -> List['Arrangement']:
-        """Get list of project arrangements."""
-        return self._arrangements.copy()
+    def arrangements(self) -> Tuple['Arrangement', ...]:
+        """Get project arrangements as a tuple shared until the next change."""
+        if self._arrangement_view is None:
+            self._arrangement_view = tuple(self._arrangements.values())
+        return self._arrangement_view
 
     def add_arrangement(self, arrangement: 'Arrangement') -> None:
         """Add an arrangement to the project."""
-        if arrangement.name in [arr.name for arr in self._arrangements]:
+        if arrangement.name in self._arrangements:
             raise ValueError(f"Arrangement {arrangement.name} already exists")
-        self._arrangements.append(arrangement)
+        self._arrangements[arrangement.name] = arrangement
+        self._arrangement_view = None
 
     def remove_arrangement(self, arrangement: 'Arrangement') -> None:
-        """Remove an arrangement from the project."""
\ No newline at end of file
+        """Remove an arrangement from the project."""
+        if self._arrangements.get(arrangement.name) is arrangement:
+            del self._arrangements[arrangement.name]
+            self._arrangement_view = None
+
+    def get_arrangement_by_name(self, name: str) -> Optional['Arrangement']:
+        """Find an arrangement by its name."""
+        return self._arrangements.get(name)
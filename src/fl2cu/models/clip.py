@@ -22,6 +22,9 @@ class Clip:
     muted: bool = False         # Mute state
     arrangement_name: Optional[str] = None  # Parent arrangement name
     metadata: Dict[str, Any] = field(default_factory=dict, hash=False)  # Additional metadata
+    source_duration: float = 0.0  # Source audio length in seconds, 0 if unknown
+    warp_beats: float = 0.0     # Beats the whole source spans when stretched, 0 if not
+    warp_algorithm: str = "stretch"  # Stretch algorithm of warped clips
 
     def __post_init__(self):
         """Validate and normalize clip attributes."""
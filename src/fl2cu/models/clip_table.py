@@ -0,0 +1,389 @@
+from array import array
+from pathlib import Path
+from types import MappingProxyType
+from typing import (
+    Any, Dict, Generic, Hashable, Iterable, Iterator, List, Mapping, Optional, Tuple, TypeVar,
+    Union, overload
+)
+
+import numpy as np
+
+from .clip import Clip
+
+T = TypeVar('T', bound=Hashable)
+
+_NO_METADATA: Mapping[str, Any] = MappingProxyType({})
+
+DEFAULT_PPQ = 96  # FL Studio default resolution
+
+
+class _InternPool(Generic[T]):
+    """Maps repeated values to small integer ids so columns can store ints."""
+
+    def __init__(self) -> None:
+        self.values: List[T] = []
+        self._ids: Dict[T, int] = {}
+
+    def intern(self, value: T) -> int:
+        """Get id of value, adding it to the pool if needed."""
+        value_id = self._ids.get(value)
+        if value_id is None:
+            value_id = len(self.values)
+            self._ids[value] = value_id
+            self.values.append(value)
+        return value_id
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+
+class ClipRow:
+    """Lightweight read-only view of a single clip stored in a ClipTable.
+
+    Exposes the same attributes as the Clip model, reading them from the
+    table columns on access instead of keeping a copy per clip.
+    """
+
+    __slots__ = ('_table', '_index')
+
+    def __init__(self, table: 'ClipTable', index: int):
+        self._table = table
+        self._index = index
+
+    @property
+    def index(self) -> int:
+        """Row index in the owning table."""
+        return self._index
+
+    @property
+    def name(self) -> str:
+        return self._table._names.values[self._table._name_ids[self._index]]
+
+    @property
+    def ppq(self) -> int:
+        """Tick resolution of the owning table."""
+        return self._table.ppq
+
+    @property
+    def position_ticks(self) -> int:
+        return self._table._position[self._index]
+
+    @property
+    def duration_ticks(self) -> int:
+        return self._table._duration[self._index]
+
+    @property
+    def end_ticks(self) -> int:
+        return self._table._position[self._index] + self._table._duration[self._index]
+
+    @property
+    def position(self) -> float:
+        """Position in beats."""
+        return self._table._position[self._index] / self._table.ppq
+
+    @property
+    def duration(self) -> float:
+        """Duration in beats."""
+        return self._table._duration[self._index] / self._table.ppq
+
+    @property
+    def source_path(self) -> Path:
+        return self._table._sources.values[self._table._source_ids[self._index]]
+
+    @property
+    def track_name(self) -> str:
+        return self._table._tracks.values[self._table._track_ids[self._index]][0]
+
+    @property
+    def track_id(self) -> Optional[str]:
+        return self._table._tracks.values[self._table._track_ids[self._index]][1]
+
+    @property
+    def arrangement_name(self) -> Optional[str]:
+        return self._table._tracks.values[self._table._track_ids[self._index]][2]
+
+    @property
+    def format(self) -> str:
+        return self._table._formats.values[self._table._format_ids[self._index]]
+
+    @property
+    def start_offset(self) -> float:
+        return self._table._start_offset[self._index]
+
+    @property
+    def end_offset(self) -> float:
+        return self._table._end_offset[self._index]
+
+    @property
+    def color(self) -> str:
+        return self._table._colors.values[self._table._color_ids[self._index]]
+
+    @property
+    def source_duration(self) -> float:
+        """Length of the source audio in seconds, 0 if unknown."""
+        return self._table._source_duration[self._index]
+
+    @property
+    def warp_beats(self) -> float:
+        """Beats the whole source spans on the clip timeline when stretched, else 0."""
+        return self._table._warp_beats[self._index]
+
+    @property
+    def warp_algorithm(self) -> str:
+        return self._table._algorithms.values[self._table._algorithm_ids[self._index]]
+
+    @property
+    def volume(self) -> float:
+        return self._table._volume[self._index]
+
+    @property
+    def muted(self) -> bool:
+        return bool(self._table._muted[self._index])
+
+    @property
+    def metadata(self) -> Mapping[str, Any]:
+        return self._table._metadata.get(self._index, _NO_METADATA)
+
+    @property
+    def output_filename(self) -> str:
+        """Get the filename to use in the DAWproject."""
+        return f"{self.name}.{self.format}"
+
+    def to_clip(self) -> Clip:
+        """Materialize the row as a standalone Clip model."""
+        return Clip(
+            name=self.name,
+            position=self.position,
+            duration=self.duration,
+            source_path=self.source_path,
+            track_name=self.track_name,
+            format=self.format,
+            start_offset=self.start_offset,
+            end_offset=self.end_offset,
+            track_id=self.track_id,
+            color=self.color,
+            volume=self.volume,
+            muted=self.muted,
+            arrangement_name=self.arrangement_name,
+            metadata=dict(self.metadata),
+            source_duration=self.source_duration,
+            warp_beats=self.warp_beats,
+            warp_algorithm=self.warp_algorithm,
+        )
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, ClipRow):
+            return NotImplemented
+        return self._table is other._table and self._index == other._index
+
+    def __hash__(self) -> int:
+        return hash((id(self._table), self._index))
+
+    def __repr__(self) -> str:
+        return f"ClipRow(index={self._index}, name={self.name!r}, position={self.position_ticks}t)"
+
+
+class ClipTable:
+    """Columnar storage for clips backed by typed arrays.
+
+    Numeric attributes live in one array per column and repeated values
+    (names, source paths, formats, colors, tracks) are interned, so a clip
+    costs a few dozen bytes instead of a full object with its own dict.
+    Positions and durations are integer PPQ ticks; offsets stay in beats
+    since FL stores them in milliseconds. Iterating the table yields
+    ClipRow views.
+
+    Stretched clips carry the beats their whole source spans (warp_beats).
+    Rows whose stretch follows the tempo are appended with a seconds
+    multiplier in the stretch column and resolved in bulk with set_warps.
+    """
+
+    def __init__(self, ppq: int = DEFAULT_PPQ) -> None:
+        if ppq <= 0:
+            raise ValueError("PPQ must be positive")
+        self.ppq = ppq
+        self._position = array('q')
+        self._duration = array('q')
+        self._start_offset = array('d')
+        self._end_offset = array('d')
+        self._volume = array('d')
+        self._muted = array('B')
+        self._source_duration = array('d')
+        self._warp_beats = array('d')
+        self._stretch = array('d')
+        self._name_ids = array('l')
+        self._source_ids = array('l')
+        self._track_ids = array('l')
+        self._format_ids = array('l')
+        self._color_ids = array('l')
+        self._algorithm_ids = array('l')
+
+        self._names: _InternPool[str] = _InternPool()
+        self._sources: _InternPool[Path] = _InternPool()
+        self._tracks: _InternPool[Tuple[str, Optional[str], Optional[str]]] = _InternPool()
+        self._formats: _InternPool[str] = _InternPool()
+        self._colors: _InternPool[str] = _InternPool()
+        self._algorithms: _InternPool[str] = _InternPool()
+        self._metadata: Dict[int, Dict[str, Any]] = {}
+
+    @classmethod
+    def from_clips(cls, clips: Iterable[Clip], ppq: int = DEFAULT_PPQ) -> 'ClipTable':
+        """Create table from Clip models, rounding beat values to ticks."""
+        table = cls(ppq)
+        table.extend(clips)
+        return table
+
+    def append(
+        self,
+        name: str,
+        position_ticks: int,
+        duration_ticks: int,
+        source_path: Union[str, Path],
+        track_name: str,
+        format: str,
+        start_offset: float = 0.0,
+        end_offset: float = 0.0,
+        track_id: Optional[str] = None,
+        color: str = "#a2eabf",
+        volume: float = 1.0,
+        muted: bool = False,
+        arrangement_name: Optional[str] = None,
+        metadata: Optional[Dict[str, Any]] = None,
+        source_duration: float = 0.0,
+        warp_beats: float = 0.0,
+        warp_algorithm: str = "stretch",
+        stretch: float = 0.0
+    ) -> int:
+        """Append a clip row and return its index.
+
+        Rows are not validated on insert; call validate() once the table
+        is filled.
+        """
+        index = len(self._position)
+        if not isinstance(source_path, Path):
+            source_path = Path(source_path)
+
+        self._position.append(position_ticks)
+        self._duration.append(duration_ticks)
+        self._start_offset.append(start_offset)
+        self._end_offset.append(end_offset)
+        self._volume.append(volume)
+        self._muted.append(1 if muted else 0)
+        self._source_duration.append(source_duration)
+        self._warp_beats.append(warp_beats)
+        self._stretch.append(stretch)
+        self._name_ids.append(self._names.intern(name))
+        self._source_ids.append(self._sources.intern(source_path))
+        self._track_ids.append(self._tracks.intern((track_name, track_id, arrangement_name)))
+        self._format_ids.append(self._formats.intern(format))
+        self._color_ids.append(self._colors.intern(color))
+        self._algorithm_ids.append(self._algorithms.intern(warp_algorithm))
+        if metadata:
+            self._metadata[index] = metadata
+        return index
+
+    def extend(self, clips: Iterable[Clip]) -> None:
+        """Append rows for each Clip model."""
+        for clip in clips:
+            self.append(
+                name=clip.name,
+                position_ticks=round(clip.position * self.ppq),
+                duration_ticks=round(clip.duration * self.ppq),
+                source_path=clip.source_path,
+                track_name=clip.track_name,
+                format=clip.format,
+                start_offset=clip.start_offset,
+                end_offset=clip.end_offset,
+                track_id=clip.track_id,
+                color=clip.color,
+                volume=clip.volume,
+                muted=clip.muted,
+                arrangement_name=clip.arrangement_name,
+                metadata=dict(clip.metadata) if clip.metadata else None,
+                source_duration=clip.source_duration,
+                warp_beats=clip.warp_beats,
+                warp_algorithm=clip.warp_algorithm,
+            )
+
+    def validate(self) -> None:
+        """Validate all rows at once.
+
+        Raises:
+            ValueError: On the first row that would be rejected by Clip.
+        """
+        if not self:
+            return
+
+        checks = (
+            (self._id_mask(self._name_ids, self._names.values, lambda v: not v),
+             "Clip name cannot be empty"),
+            (self.column('position') < 0, "Position cannot be negative"),
+            (self.column('duration') <= 0, "Duration must be positive"),
+            (self._id_mask(self._track_ids, self._tracks.values, lambda v: not v[0]),
+             "Track name cannot be empty"),
+        )
+        for mask, message in checks:
+            invalid = np.flatnonzero(mask)
+            if invalid.size:
+                raise ValueError(f"{message} (row {int(invalid[0])}, {invalid.size} rows total)")
+
+    def column(self, name: str) -> np.ndarray:
+        """Get a read-only numpy view of a numeric column without copying."""
+        values = getattr(self, f"_{name}")
+        if not isinstance(values, array):
+            raise KeyError(f"Unknown clip column: {name}")
+        view = np.frombuffer(values, dtype=values.typecode) if len(values) else np.empty(0)
+        view.flags.writeable = False
+        return view
+
+    def set_warps(self, indices: np.ndarray, warp_beats: np.ndarray) -> None:
+        """Set warp lengths of rows at once, e.g. after resolving stretch multipliers."""
+        column = np.frombuffer(self._warp_beats, dtype=np.float64)
+        column[indices] = warp_beats
+        del column  # Release the buffer so the column can grow again
+
+    def end_ticks(self) -> np.ndarray:
+        """Get clip end positions in ticks."""
+        ends: np.ndarray = self.column('position') + self.column('duration')
+        return ends
+
+    def order_by_position(self) -> np.ndarray:
+        """Get row indices ordered by position, then duration."""
+        order: np.ndarray = np.lexsort((self.column('duration'), self.column('position')))
+        return order
+
+    @property
+    def source_paths(self) -> List[Path]:
+        """Unique source paths referenced by the table, in first-use order."""
+        return list(self._sources.values)
+
+    def _id_mask(self, ids: array, values: List[Any], predicate: Any) -> np.ndarray:
+        bad_ids = [value_id for value_id, value in enumerate(values) if predicate(value)]
+        if not bad_ids:
+            return np.zeros(len(ids), dtype=bool)
+        return np.isin(np.frombuffer(ids, dtype=ids.typecode), bad_ids)
+
+    def __len__(self) -> int:
+        return len(self._position)
+
+    def __iter__(self) -> Iterator[ClipRow]:
+        for index in range(len(self._position)):
+            yield ClipRow(self, index)
+
+    @overload
+    def __getitem__(self, index: int) -> ClipRow: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> List[ClipRow]: ...
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[ClipRow, List[ClipRow]]:
+        if isinstance(index, slice):
+            return [ClipRow(self, i) for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("clip index out of range")
+        return ClipRow(self, index)
+
+    def __repr__(self) -> str:
+        return f"ClipTable({len(self)} clips, {len(self._sources)} sources, ppq={self.ppq})"
@@ -0,0 +1,67 @@
+from typing import List, Tuple
+import heapq
+
+import numpy as np
+
+
+def pack_lanes(starts: np.ndarray, ends: np.ndarray) -> Tuple[np.ndarray, int]:
+    """Assign intervals to the minimum number of lanes without overlaps.
+
+    Intervals are swept in start order while a heap holds the end of the
+    last interval on each lane; a lane is reused as soon as its end is at
+    or before the next start. Touching intervals share a lane.
+
+    Returns:
+        Tuple of (lane index per interval, lane count).
+    """
+    lanes = np.zeros(len(starts), dtype=np.int32)
+    if not lanes.size:
+        return lanes, 0
+
+    # Lowest lane first for equal ends keeps the assignment deterministic
+    free: List[Tuple[int, int]] = []
+    lane_count = 0
+    start_list = starts.tolist()
+    end_list = ends.tolist()
+    for i in np.lexsort((ends, starts)).tolist():
+        if free and free[0][0] <= start_list[i]:
+            _, lane = heapq.heapreplace(free, (end_list[i], free[0][1]))
+        else:
+            lane = lane_count
+            lane_count += 1
+            heapq.heappush(free, (end_list[i], lane))
+        lanes[i] = lane
+    return lanes, lane_count
+
+
+class IntervalIndex:
+    """Static index answering which intervals cover a time or range.
+
+    Intervals are sorted by start alongside a running maximum of their
+    ends. Both arrays are monotonic, so two binary searches bound the
+    candidates and only that window is filtered. Intervals are half-open,
+    [start, end).
+    """
+
+    def __init__(self, starts: np.ndarray, ends: np.ndarray):
+        self._order = np.argsort(starts, kind='stable')
+        self._starts = np.asarray(starts)[self._order]
+        self._ends = np.asarray(ends)[self._order]
+        self._max_ends = np.maximum.accumulate(self._ends) if len(self._ends) else self._ends
+
+    def at(self, time: float) -> np.ndarray:
+        """Get indices of intervals active at time, in start order."""
+        lo = np.searchsorted(self._max_ends, time, side='right')
+        hi = np.searchsorted(self._starts, time, side='right')
+        window = slice(lo, hi)
+        return self._order[window][self._ends[window] > time]
+
+    def overlapping(self, start: float, end: float) -> np.ndarray:
+        """Get indices of intervals overlapping [start, end), in start order."""
+        lo = np.searchsorted(self._max_ends, start, side='right')
+        hi = np.searchsorted(self._starts, end, side='left')
+        window = slice(lo, hi)
+        return self._order[window][self._ends[window] > start]
+
+    def __len__(self) -> int:
+        return len(self._order)
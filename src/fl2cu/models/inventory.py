@@ -0,0 +1,92 @@
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+
+@dataclass
+class SampleInventory:
+    """A sample referenced by audio clips of a project."""
+    path: str  # Path as stored in the FLP
+    resolved_path: Optional[Path] = None
+    exists: bool = False
+    size: int = 0
+    use_count: int = 0
+
+    @property
+    def status(self) -> str:
+        return "resolved" if self.exists else "missing"
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'path': self.path,
+            'resolved_path': str(self.resolved_path) if self.resolved_path else None,
+            'status': self.status,
+            'size': self.size,
+            'use_count': self.use_count
+        }
+
+
+@dataclass
+class ArrangementInventory:
+    """Counts for a single arrangement."""
+    name: str
+    track_count: int = 0
+    clip_count: int = 0
+    sample_uses: Dict[str, int] = field(default_factory=dict)  # Sample path -> clip count
+
+    @property
+    def sample_count(self) -> int:
+        return len(self.sample_uses)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'name': self.name,
+            'track_count': self.track_count,
+            'clip_count': self.clip_count,
+            'sample_count': self.sample_count
+        }
+
+
+@dataclass
+class ProjectInventory:
+    """Inventory of an FL Studio project, gathered without a full conversion."""
+    source_path: Path
+    version: Optional[str] = None
+    ppq: Optional[int] = None
+    arrangements: List[ArrangementInventory] = field(default_factory=list)
+    samples: List[SampleInventory] = field(default_factory=list)
+    error: Optional[str] = None
+
+    @property
+    def track_count(self) -> int:
+        return sum(arr.track_count for arr in self.arrangements)
+
+    @property
+    def clip_count(self) -> int:
+        return sum(arr.clip_count for arr in self.arrangements)
+
+    @property
+    def missing_count(self) -> int:
+        return sum(1 for sample in self.samples if not sample.exists)
+
+    @property
+    def total_audio_bytes(self) -> int:
+        """Size of all resolved samples on disk."""
+        return sum(sample.size for sample in self.samples)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert inventory to dictionary format for JSON output."""
+        return {
+            'source_path': str(self.source_path),
+            'version': self.version,
+            'ppq': self.ppq,
+            'arrangement_count': len(self.arrangements),
+            'track_count': self.track_count,
+            'clip_count': self.clip_count,
+            'sample_count': len(self.samples),
+            'missing_count': self.missing_count,
+            'total_audio_bytes': self.total_audio_bytes,
+            'arrangements': [arr.to_dict() for arr in self.arrangements],
+            'samples': [sample.to_dict() for sample in self.samples],
+            'error': self.error
+        }
@@ -0,0 +1,68 @@
+from dataclasses import dataclass
+from typing import Optional
+
+import numpy as np
+
+
+@dataclass
+class PatternNotes:
+    """Notes of an FL Studio pattern, one array per note attribute.
+
+    Positions and lengths are in PPQ ticks relative to the pattern start.
+    Velocity and release keep FL's 0..128 range.
+    """
+    pattern_id: int
+    name: str
+    ppq: int
+    keys: np.ndarray
+    positions: np.ndarray
+    lengths: np.ndarray
+    velocities: np.ndarray
+    releases: np.ndarray
+    channels: np.ndarray  # MIDI channel 0..15
+    length: Optional[int] = None  # Pattern length in ticks, None in auto length mode
+
+    def __post_init__(self) -> None:
+        count = len(self.keys)
+        columns = (self.positions, self.lengths, self.velocities, self.releases, self.channels)
+        if any(len(column) != count for column in columns):
+            raise ValueError("Pattern note columns must have the same length")
+
+    @property
+    def end_ticks(self) -> int:
+        """End of the pattern in ticks, from its length or its last note."""
+        if self.length:
+            return self.length
+        return int((self.positions + self.lengths).max()) if len(self) else 0
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+
+@dataclass(frozen=True)
+class PatternClip:
+    """Placement of a pattern on a playlist track."""
+    name: str
+    notes: PatternNotes
+    position_ticks: int
+    duration_ticks: int
+    start_ticks: int = 0  # Offset into the pattern where playback starts
+    muted: bool = False
+
+    def __post_init__(self) -> None:
+        if self.position_ticks < 0:
+            raise ValueError("Position cannot be negative")
+        if self.duration_ticks <= 0:
+            raise ValueError("Duration must be positive")
+
+    @property
+    def pattern_id(self) -> int:
+        return self.notes.pattern_id
+
+    @property
+    def ppq(self) -> int:
+        return self.notes.ppq
+
+    @property
+    def end_ticks(self) -> int:
+        return self.position_ticks + self.duration_ticks
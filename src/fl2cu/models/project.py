@@ -21,29 +21,10 @@ class Project(BaseProject):
                         source_path=source_path, 
                         output_dir=output_dir)
     
-    def add_arrangement(self, arrangement: 'Arrangement') -> None:
-        """Add an arrangement to the project."""
-        from .arrangement import Arrangement
-        if arrangement.name in [arr.name for arr in self._arrangements]:
-            raise ValueError(f"Arrangement {arrangement.name} already exists")
-        self._arrangements.append(arrangement)
-        
-    def remove_arrangement(self, arrangement: 'Arrangement') -> None:
-        """Remove an arrangement from the project."""
-        if arrangement in self._arrangements:
-            self._arrangements.remove(arrangement)
-            
-    def get_arrangement_by_name(self, name: str) -> Optional['Arrangement']:
-        """Find an arrangement by its name."""
-        for arrangement in self._arrangements:
-            if arrangement.name == name:
-                return arrangement
-        return None
-        
     def validate(self) -> None:
         """Validate project and all its arrangements."""
         # Validate each arrangement
-        for arrangement in self._arrangements:
+        for arrangement in self._arrangements.values():
             try:
                 arrangement.validate()
             except ValueError as e:
@@ -51,11 +32,9 @@ class Project(BaseProject):
             
     def get_all_clip_paths(self) -> Set[Path]:
         """Get set of all unique audio file paths used in project."""
-        paths = set()
-        for arrangement in self._arrangements:
-            for clip in arrangement.get_tracks():
-                if hasattr(clip, 'source_path') and clip.source_path:
-                    paths.add(clip.source_path)
+        paths: Set[Path] = set()
+        for arrangement in self._arrangements.values():
+            paths.update(arrangement.source_paths)
         return paths
         
     def validate_audio_files(self) -> bool:
@@ -74,7 +53,7 @@ class Project(BaseProject):
             'timing': self.timing.to_dict() if self.timing else None,
             'source_path': str(self.source_path) if self.source_path else None,
             'output_dir': str(self.output_dir) if self.output_dir else None,
-            'arrangements': [arr.to_dict() for arr in self._arrangements]
+            'arrangements': [arr.to_dict() for arr in self._arrangements.values()]
         }
     
     @classmethod
@@ -0,0 +1,113 @@
+from array import array
+from bisect import bisect_right
+from typing import Iterable, Iterator, Tuple
+
+import numpy as np
+
+
+class TempoMap:
+    """Piecewise-constant tempo curve over the timeline.
+
+    Segments are stored as sorted arrays of start beats and tempos together
+    with the cumulative seconds at each segment start, so converting between
+    beats and seconds is a bisection plus one multiply.
+    """
+
+    def __init__(self, changes: Iterable[Tuple[float, float]]):
+        """Build map from (beat, bpm) tempo changes.
+
+        Changes are sorted by beat; when several share a beat the last one
+        wins. The first tempo is extended back to beat 0.
+        """
+        merged = {}
+        for beat, tempo in sorted(changes, key=lambda change: change[0]):
+            if tempo <= 0:
+                raise ValueError(f"Tempo must be positive, got {tempo} at beat {beat}")
+            merged[max(0.0, float(beat))] = float(tempo)
+        if not merged:
+            raise ValueError("Tempo map needs at least one tempo")
+
+        self._beats = array('d')
+        self._tempos = array('d')
+        self._seconds = array('d')
+
+        for beat, tempo in sorted(merged.items()):
+            if self._tempos and self._tempos[-1] == tempo:
+                continue  # Not a change
+            if not self._beats:
+                beat = 0.0
+                seconds = 0.0
+            else:
+                seconds = self._seconds[-1] + (beat - self._beats[-1]) * 60.0 / self._tempos[-1]
+            self._beats.append(beat)
+            self._tempos.append(tempo)
+            self._seconds.append(seconds)
+
+    @classmethod
+    def constant(cls, tempo: float) -> 'TempoMap':
+        """Create map with a single tempo."""
+        return cls([(0.0, tempo)])
+
+    @property
+    def is_constant(self) -> bool:
+        return len(self._tempos) == 1
+
+    @property
+    def initial_tempo(self) -> float:
+        return self._tempos[0]
+
+    def tempo_at(self, beat: float) -> float:
+        """Get tempo in effect at the given beat."""
+        return self._tempos[self._segment_at_beat(beat)]
+
+    def beats_to_seconds(self, beat: float) -> float:
+        """Convert timeline position in beats to seconds."""
+        i = self._segment_at_beat(beat)
+        return self._seconds[i] + (beat - self._beats[i]) * 60.0 / self._tempos[i]
+
+    def seconds_to_beats(self, seconds: float) -> float:
+        """Convert timeline position in seconds to beats."""
+        i = max(0, bisect_right(self._seconds, seconds) - 1)
+        return self._beats[i] + (seconds - self._seconds[i]) * self._tempos[i] / 60.0
+
+    def seconds_to_beat_length(self, start_beat: float, seconds: float) -> float:
+        """Get number of beats covered by a duration in seconds starting at start_beat."""
+        if self.is_constant:
+            return seconds * self._tempos[0] / 60.0
+        return self.seconds_to_beats(self.beats_to_seconds(start_beat) + seconds) - start_beat
+
+    def beats_to_seconds_many(self, beats: np.ndarray) -> np.ndarray:
+        """Vectorized beats_to_seconds."""
+        beats = np.asarray(beats, dtype=np.float64)
+        starts, tempos, seconds = self._arrays()
+        i = np.maximum(np.searchsorted(starts, beats, side='right') - 1, 0)
+        result: np.ndarray = seconds[i] + (beats - starts[i]) * 60.0 / tempos[i]
+        return result
+
+    def seconds_to_beats_many(self, seconds: np.ndarray) -> np.ndarray:
+        """Vectorized seconds_to_beats."""
+        seconds = np.asarray(seconds, dtype=np.float64)
+        starts, tempos, offsets = self._arrays()
+        i = np.maximum(np.searchsorted(offsets, seconds, side='right') - 1, 0)
+        result: np.ndarray = starts[i] + (seconds - offsets[i]) * tempos[i] / 60.0
+        return result
+
+    def _segment_at_beat(self, beat: float) -> int:
+        return max(0, bisect_right(self._beats, beat) - 1)
+
+    def _arrays(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        return (
+            np.frombuffer(self._beats, dtype=np.float64),
+            np.frombuffer(self._tempos, dtype=np.float64),
+            np.frombuffer(self._seconds, dtype=np.float64),
+        )
+
+    def __iter__(self) -> Iterator[Tuple[float, float]]:
+        """Iterate (beat, bpm) segment starts."""
+        return zip(self._beats, self._tempos)
+
+    def __len__(self) -> int:
+        return len(self._tempos)
+
+    def __repr__(self) -> str:
+        return f"TempoMap({len(self)} segments, initial={self.initial_tempo}bpm)"
@@ -1,6 +1,8 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from typing import Optional
 
+from .tempo_map import TempoMap
+
 @dataclass(frozen=True)
 class ProjectTiming:
     """Represents project timing information."""
@@ -8,6 +10,7 @@ class ProjectTiming:
     time_signature_numerator: int
     time_signature_denominator: int
     ppq: Optional[int] = None  # Pulses Per Quarter note
+    tempo_map: Optional[TempoMap] = field(default=None, compare=False)  # Tempo automation
 
     @staticmethod
     def default() -> 'ProjectTiming':
@@ -1,13 +1,105 @@
-from dataclasses import dataclass
-from typing import List
+from pathlib import Path
+from typing import Iterable, List, Optional, Sequence, Tuple, Union
 
+import numpy as np
+
+from .automation import AutomationLane
 from .clip import Clip
+from .clip_table import ClipRow, ClipTable
+from .interval_index import IntervalIndex, pack_lanes
+from .pattern import PatternClip
 
 
 class Track:
-    """Represents a track containing clips."""
-    
-    def __init__(self, name: str, id: str, clips: List[Clip]):
+    """Represents a track containing audio clips, pattern clips and automation.
+
+    Clips and pattern clips are fixed at construction, so the end position
+    computed here and the aggregates arrangements keep stay valid.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        id: str,
+        clips: Union[ClipTable, Iterable[Clip]],
+        automation: Optional[List[AutomationLane]] = None,
+        pattern_clips: Optional[Sequence[PatternClip]] = None
+    ):
         self.name = name
         self.id = id
-        self.clips = clips
\ No newline at end of file
+        self.automation: List[AutomationLane] = automation or []
+        if not isinstance(clips, ClipTable):
+            clips = ClipTable.from_clips(clips)
+        clips.validate()
+        self._clips = clips
+        self._pattern_clips: Tuple[PatternClip, ...] = tuple(pattern_clips or ())
+        self._interval_index: Optional[IntervalIndex] = None
+        self._lanes: Optional[Tuple[np.ndarray, int]] = None
+        self._pattern_lanes: Optional[Tuple[np.ndarray, int]] = None
+
+        self._end_ticks = int(clips.end_ticks().max()) if len(clips) else 0
+        if self._pattern_clips:
+            pattern_end = max(clip.end_ticks for clip in self._pattern_clips)
+            self._end_ticks = max(self._end_ticks, pattern_end)
+
+    @property
+    def clips(self) -> ClipTable:
+        """Track clips; iterating yields lightweight ClipRow views."""
+        return self._clips
+
+    @property
+    def pattern_clips(self) -> Tuple[PatternClip, ...]:
+        return self._pattern_clips
+
+    @property
+    def clip_count(self) -> int:
+        """Number of audio and pattern clips."""
+        return len(self._clips) + len(self._pattern_clips)
+
+    @property
+    def source_paths(self) -> Tuple[Path, ...]:
+        """Unique clip source paths, in first-use order."""
+        return tuple(self._clips.source_paths)
+
+    @property
+    def end_ticks(self) -> int:
+        """End of the last audio or pattern clip in ticks."""
+        return self._end_ticks
+
+    @property
+    def end_time(self) -> float:
+        """End of the last audio or pattern clip in beats."""
+        return self._end_ticks / self._clips.ppq
+
+    @property
+    def interval_index(self) -> IntervalIndex:
+        """Interval index over clip ticks, built on first use."""
+        if self._interval_index is None:
+            self._interval_index = IntervalIndex(
+                self._clips.column('position'), self._clips.end_ticks()
+            )
+        return self._interval_index
+
+    def clips_at(self, ticks: int) -> List[ClipRow]:
+        """Get clips playing at a position in ticks."""
+        return [self._clips[int(i)] for i in self.interval_index.at(ticks)]
+
+    @property
+    def lanes(self) -> Tuple[np.ndarray, int]:
+        """Sub-lane of each clip so overlapping clips never share a lane, and lane count."""
+        if self._lanes is None:
+            self._lanes = pack_lanes(self._clips.column('position'), self._clips.end_ticks())
+        return self._lanes
+
+    @property
+    def lane_count(self) -> int:
+        return self.lanes[1]
+
+    @property
+    def pattern_lanes(self) -> Tuple[np.ndarray, int]:
+        """Sub-lane of each pattern clip, packed like the audio clips, and lane count."""
+        if self._pattern_lanes is None:
+            starts = np.fromiter((c.position_ticks for c in self.pattern_clips), np.int64)
+            ends = np.fromiter((c.end_ticks for c in self.pattern_clips), np.int64)
+            self._pattern_lanes = pack_lanes(starts, ends)
+        return self._pattern_lanes
@@ -1,84 +1,167 @@
-from typing import List, Optional
+from typing import Iterator, List, Optional
 import logging
 
 import pyflp
+from pyflp.arrangement import ChannelPLItem, PatternPLItem
+from pyflp.channel import Automation
 
 from ..models.track import Track
 from ..models.arrangement import Arrangement
+from ..models.automation import AutomationLane
+from ..models.clip_table import ClipTable
+from ..models.tempo_map import TempoMap
+from .automation_parser import FLAutomationParser
 from .clip_parser import FLClipParser
+from .pattern_parser import FLPatternParser
+from .playlist_index import PlaylistIndex
+from .timing_parser import FLTimingParser
 
 class FLArrangementParser:
     """Handles parsing of FL Studio arrangements and their tracks."""
     
-    def __init__(self, fl_project: 'pyflp.Project', clip_parser: FLClipParser):
-        self.fl_project = fl_project
+    def __init__(
+        self,
+        fl_project: 'pyflp.Project',
+        clip_parser: FLClipParser,
+        timing_parser: Optional[FLTimingParser] = None,
+        automation_parser: Optional[FLAutomationParser] = None,
+        pattern_parser: Optional[FLPatternParser] = None
+    ):
+        self.fl_project: Optional[pyflp.Project] = fl_project
         self.clip_parser = clip_parser
+        self.timing_parser = timing_parser or FLTimingParser(fl_project)
+        self.automation_parser = automation_parser or self.timing_parser.automation_parser
+        self.pattern_parser = pattern_parser or FLPatternParser(fl_project)
         self.logger = logging.getLogger(__name__)
 
+    def release(self) -> None:
+        """Drop the reference to the pyflp project once parsing is done."""
+        self.fl_project = None
+        self.pattern_parser.release()
+
     def parse_arrangements(self) -> List[Arrangement]:
         """Extract all arrangements with their tracks and clips."""
+        return list(self.iter_arrangements())
+
+    def iter_arrangements(self) -> Iterator[Arrangement]:
+        """Lazily yield arrangements with their tracks and clips, one at a time."""
+        if self.fl_project is None:
+            raise RuntimeError("FL Studio project was already released")
         if not hasattr(self.fl_project, 'arrangements'):
             raise ValueError("Could not access arrangements in FL Studio project")
                 
-        arrangements = []
-        fl_arrangements = list(self.fl_project.arrangements)
-        self.logger.debug(f"Found {len(fl_arrangements)} FL Studio arrangements")
+        fl_arrangements = self.fl_project.arrangements
+        max_tracks = getattr(fl_arrangements, 'max_tracks', 500)
         
+        parsed_count = 0
         for fl_arr in fl_arrangements:
-            # Create arrangement
-            arrangement_name = getattr(fl_arr, 'name', None) or "Unnamed Arrangement"
-            arrangement = Arrangement(name=arrangement_name)
-            self.logger.debug(f"\nProcessing arrangement: {arrangement_name}")
-            
-            # Get playlist data
-            playlist_data = None
-            if hasattr(fl_arr, 'tracks'):
-                fl_tracks = list(fl_arr.tracks)
-                self.logger.debug(f"Found {len(fl_tracks)} FL Studio tracks")
-                
-                # Process each track
-                for track_idx, fl_track in enumerate(fl_tracks):
-                    # Get track clips
-                    track_clips = []
-                    if hasattr(fl_track, '__iter__'):
-                        items = list(fl_track)
-                        if len(items) < 1:
-                            continue
-                        self.logger.debug(f"Track contains {len(items)} items")
-                        
-                        for item in items:
-                            if not hasattr(item, 'channel'):
-                                self.logger.warning(f"Item nas no channel, skipping {item}")
-                                continue
-                            # Try to create clip from item
-                            clip = self.clip_parser.create_clip(item, track_name=f"Track {track_idx}")
-                            
-                            if clip:
-                                track_clips.append(clip)
-                            else:
-                                raise Exception(f"Failed to parse clip for {item}.")
-                            
-                    
-                    # Only create track if it has clips
-                    if track_clips:
-                        track = Track(
-                            name=getattr(fl_track, 'name', None) or f"Track {track_idx}",
-                            id=f"track-{track_idx}",
-                            clips=track_clips
-                        )
-                        arrangement.add_track(track)
-                        self.logger.debug(f"Added track with {len(track_clips)} clips")
-            
+            arrangement = self._parse_arrangement(fl_arr, max_tracks)
             if arrangement.has_tracks():
-                arrangements.append(arrangement)
+                parsed_count += 1
                 self.logger.debug(
                     f"Successfully parsed arrangement '{arrangement.name}' with "
-                    f"{len(arrangement.get_tracks())} tracks"
+                    f"{arrangement.track_count} tracks"
                 )
+                yield arrangement
             else:
-                self.logger.debug("Skipping arrangement - no tracks with clips found")
+                self.logger.debug("Skipping arrangement - no tracks with clips or automation found")
+
+        self.logger.debug(f"Parsed {parsed_count} FL Studio arrangements")
+        self.clip_parser.log_template_stats()
+        self.pattern_parser.log_template_stats()
 
-        if not arrangements:
+        if not parsed_count:
             raise ValueError("No valid arrangements found in FL Studio project")
-                
-        return arrangements
\ No newline at end of file
+
+    def _parse_arrangement(
+        self, fl_arr: 'pyflp.arrangement.Arrangement', max_tracks: int
+    ) -> Arrangement:
+        """Parse a single FL Studio arrangement."""
+        # Create arrangement
+        arrangement_name = getattr(fl_arr, 'name', None) or "Unnamed Arrangement"
+        arrangement = Arrangement(name=arrangement_name)
+        self.logger.debug(f"\nProcessing arrangement: {arrangement_name}")
+
+        # One pass over the playlist tells which tracks hold items
+        playlist = PlaylistIndex(fl_arr, max_tracks)
+        self.logger.debug(
+            f"Playlist index: {playlist.item_count} items on "
+            f"{playlist.occupied_count}/{max_tracks} tracks"
+        )
+
+        # Offsets are converted with the tempo map of the arrangement being parsed
+        arrangement.tempo_map = self.timing_parser.parse_tempo_map(
+            playlist.iter_items(), self.clip_parser.tempo
+        )
+        self.clip_parser.tempo_map = (
+            arrangement.tempo_map or TempoMap.constant(self.clip_parser.tempo)
+        )
+
+        # Only occupied tracks are materialized
+        materialized = 0
+        for track_idx, fl_track in playlist.iter_tracks():
+            materialized += 1
+            track = self._parse_track(track_idx, fl_track)
+            if track is not None:
+                arrangement.add_track(track)
+                self.logger.debug(f"Added track with {track.clip_count} clips")
+
+        self.logger.debug(
+            f"Materialized {materialized} tracks, skipped {max_tracks - materialized} empty tracks"
+        )
+        return arrangement
+
+    def _parse_track(self, track_idx: int, fl_track: 'pyflp.arrangement.Track') -> Optional[Track]:
+        """Parse clips of a single FL Studio track, returning None for empty tracks."""
+        if not hasattr(fl_track, '__iter__'):
+            return None
+
+        # Get track clips
+        track_clips = ClipTable(ppq=self.clip_parser.ppq)
+        automation: List[AutomationLane] = []
+        pattern_items: List[PatternPLItem] = []
+        item_count = 0
+        for item in fl_track:
+            item_count += 1
+            if isinstance(item, PatternPLItem):
+                pattern_items.append(item)
+                continue
+            if not isinstance(item, ChannelPLItem):
+                self.logger.warning(f"Item nas no channel, skipping {item}")
+                continue
+            if self.timing_parser.is_tempo_automation(item.channel):
+                self.logger.debug("Tempo automation item consumed by tempo map")
+                continue
+            if isinstance(item.channel, Automation):
+                lane = self.automation_parser.parse_lane(item)
+                if lane is not None:
+                    automation.append(lane)
+                continue
+            # Try to create clip from item
+            added = self.clip_parser.add_clip(
+                track_clips, item, track_name=f"Track {track_idx}"
+            )
+            if not added:
+                raise Exception(f"Failed to parse clip for {item}.")
+
+        if item_count:
+            self.logger.debug(f"Track contains {item_count} items")
+
+        # Tempo-relative stretches need clip positions, so they are resolved per table
+        warped = self.clip_parser.resolve_warps(track_clips)
+        if warped:
+            self.logger.debug(f"Resolved warps of {warped} stretched clips")
+
+        # Placements share their pattern's notes and are converted together
+        pattern_clips = self.pattern_parser.create_clips(pattern_items)
+
+        # Only create track if it has clips or automation
+        if not track_clips and not pattern_clips and not automation:
+            return None
+        return Track(
+            name=getattr(fl_track, 'name', None) or f"Track {track_idx}",
+            id=f"track-{track_idx}",
+            clips=track_clips,
+            automation=automation,
+            pattern_clips=pattern_clips
+        )
@@ -0,0 +1,121 @@
+from typing import Optional, Tuple
+import logging
+
+import numpy as np
+from pyflp.arrangement import ChannelPLItem
+from pyflp.channel import Automation, ChannelID
+
+from ..models.automation import DEFAULT_TOLERANCE, AutomationLane, decimate_points
+from .flp_reader import DeferredDataEvent
+
+# Layout of ChannelID.Automation: 21 byte header ending with the point count,
+# then 24 byte points whose first field is the offset from the previous point
+AUTOMATION_POINTS_OFFSET = 21
+AUTOMATION_POINT_DTYPE = np.dtype([
+    ('offset', '<f8'),
+    ('value', '<f8'),
+    ('tension', '<f4'),
+    ('_u1', 'V4'),
+])
+
+
+def decode_automation_points(channel: Automation) -> Tuple[np.ndarray, np.ndarray]:
+    """Get positions (ticks) and values of all points of an automation clip.
+
+    Raw point data is decoded in bulk; pyflp recomputes every position
+    from the start of the list, which is quadratic in the point count.
+    """
+    events = channel.events
+    if ChannelID.Automation not in events.ids:
+        return np.empty(0), np.empty(0)
+
+    event = events.first(ChannelID.Automation)
+    if not isinstance(event, DeferredDataEvent):
+        # Already decoded by pyflp
+        points = [(p.position, p.value) for p in channel]
+        if not points:
+            return np.empty(0), np.empty(0)
+        positions, values = zip(*points)
+        return np.asarray(positions, dtype=float), np.asarray(values, dtype=float)
+
+    data = event.value
+    count = int.from_bytes(data[AUTOMATION_POINTS_OFFSET - 4:AUTOMATION_POINTS_OFFSET], "little")
+    raw_points = np.frombuffer(
+        data, dtype=AUTOMATION_POINT_DTYPE, count=count, offset=AUTOMATION_POINTS_OFFSET
+    )
+    return np.cumsum(raw_points['offset']), raw_points['value'].astype(float)
+
+
+class FLAutomationParser:
+    """Converts FL Studio automation clips into decimated automation lanes."""
+
+    def __init__(self, ppq: int, tolerance: float = DEFAULT_TOLERANCE):
+        self.ppq = ppq
+        self.tolerance = tolerance
+        self.logger = logging.getLogger(__name__)
+
+    @staticmethod
+    def get_target(channel: object) -> Optional[str]:
+        """Get parameter an automation clip controls, judging by its name."""
+        if not isinstance(channel, Automation):
+            return None
+        name = (channel.display_name or "").lower()
+        for target, keywords in (("tempo", ("tempo",)), ("pan", ("pan",)), ("volume", ("vol",))):
+            if any(keyword in name for keyword in keywords):
+                return target
+        return None
+
+    def get_item_points(self, item: ChannelPLItem) -> Tuple[np.ndarray, np.ndarray]:
+        """Get points of a playlist item in arrangement ticks.
+
+        Only the part of the clip shown on the playlist is kept, from its
+        start offset for its length, with interpolated points on both edges
+        so the value at the cuts is preserved.
+        """
+        channel = item.channel
+        position, length = item.position, item.length
+        if not isinstance(channel, Automation):
+            return np.empty(0), np.empty(0)
+        if not isinstance(position, int) or not isinstance(length, int):
+            return np.empty(0), np.empty(0)
+        positions, values = decode_automation_points(channel)
+        if not len(positions):
+            return positions, values
+
+        # Automation item offsets are in ticks, -1 when the clip is not cut
+        start = max(float(item.offsets[0]), 0.0)
+        end = start + length
+        inside = (positions > start) & (positions < end)
+        edges = np.array([start, end])
+        edge_values = np.interp(edges, positions, values)
+        ticks = np.concatenate((edges[:1], positions[inside], edges[1:]))
+        values = np.concatenate((edge_values[:1], values[inside], edge_values[1:]))
+        return ticks - start + position, values
+
+    def parse_lane(self, item: ChannelPLItem) -> Optional[AutomationLane]:
+        """Create a decimated automation lane from a playlist item."""
+        channel = item.channel
+        target = self.get_target(channel)
+        if target is None:
+            self.logger.debug(
+                f"Skipping automation '{channel.display_name}' with unsupported target"
+            )
+            return None
+
+        ticks, values = self.get_item_points(item)
+        if not len(ticks):
+            return None
+
+        keep = decimate_points(ticks, values, self.tolerance)
+        lane = AutomationLane(
+            name=channel.display_name or target,
+            target=target,
+            times=ticks[keep] / self.ppq,
+            values=values[keep],
+            source_points=len(ticks)
+        )
+        self.logger.debug(
+            f"Automation '{lane.name}' ({target}): {lane.source_points} points "
+            f"decimated to {len(lane)}"
+        )
+        return lane
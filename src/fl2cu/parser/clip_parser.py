@@ -1,70 +1,283 @@
 from pathlib import Path
-from typing import Optional, Callable, Tuple
+from typing import Any, Callable, Dict, NamedTuple, Optional, Tuple
 import re
 import logging
 
+import numpy as np
 from pyflp.arrangement import ChannelPLItem
-from pyflp.channel import Sampler, Channel
+from pyflp.channel import Sampler, Channel, DeclickMode, StretchMode
 from pyflp.project import Project
+from pyflp.types import MusicalTime
 from ..models.clip import Clip
+from ..models.clip_table import ClipTable
+from ..models.tempo_map import TempoMap
+from ..render import FADE_RANGE, EffectRenderer, SamplerEffects
+from ..utils.audio_probe import probe_audio
+from ..utils.logger import log_cache_stats
+
+STRETCH_TIME_PER_BEAT = 192  # Sampler stretch time unit: 48 per step, 4 steps per beat
+
+# (in, out) ramp seconds of declick modes that go beyond the default out-only ramp
+DECLICK_RAMPS = {
+    DeclickMode.Generic: (0.002, 0.002),
+    DeclickMode.Smooth: (0.01, 0.01),
+    DeclickMode.Crossfade: (0.01, 0.01),
+}
+
+class _ClipTemplate(NamedTuple):
+    """Clip attributes derived from a channel, shared by all its playlist items."""
+    name: str
+    source_path: Path
+    format: str
+    color: str
+    volume: float
+    muted: bool
+    source_duration: float  # Seconds, 0 if the file could not be probed
+    warp_beats: float       # Fixed stretched length in beats, 0 if not set
+    warp_algorithm: str
+    stretch: float          # Seconds multiplier for tempo-relative stretching, 0 if none
+
 
 class FLClipParser:
     """Handles parsing of audio clips from FL Studio channels and playlist items."""
     
-    def __init__(self, fl_project: Project, path_resolver: Callable):
-        self.fl_project = fl_project
+    def __init__(
+        self,
+        fl_project: Optional[Project],
+        path_resolver: Callable,
+        renderer: Optional[EffectRenderer] = None
+    ):
+        self.fl_project: Optional[Project] = fl_project
+        self.renderer = renderer  # Renders FL-only sampler effects when set
         self.ppq = getattr(fl_project, 'ppq', 96)
         self.tempo = float(getattr(fl_project, 'tempo', 120.0))
+        self.tempo_map = TempoMap.constant(self.tempo)  # Replaced per arrangement
         self.path_resolver = path_resolver
         self.logger = logging.getLogger(__name__)
 
+        # Channel-derived clip attributes keyed by channel iid
+        self._templates: Dict[int, Optional[_ClipTemplate]] = {}
+        self.template_hits = 0
+        self.template_misses = 0
+
+    def release(self) -> None:
+        """Drop the reference to the pyflp project once parsing is done."""
+        self.fl_project = None
+
     def create_clip(self, item: ChannelPLItem, track_name: Optional[str] = None) -> Optional[Clip]:
         """Create clip model from FL Studio playlist item."""
+        fields = self._get_clip_fields(item, track_name)
+        if fields is None:
+            return None
+        try:
+            # Clip models carry beats; ticks are only kept in clip tables
+            fields['position'] = fields.pop('position_ticks') / self.ppq
+            fields['duration'] = fields.pop('duration_ticks') / self.ppq
+            stretch = fields.pop('stretch')
+            if stretch:
+                fields['warp_beats'] = self.tempo_map.seconds_to_beat_length(
+                    max(0.0, fields['position'] - fields['start_offset']),
+                    fields['source_duration'] * stretch
+                )
+            return Clip(**fields)
+        except Exception as e:
+            self.logger.error(f"Failed to create clip: {e}")
+            return None
+
+    def add_clip(
+        self, table: ClipTable, item: ChannelPLItem, track_name: Optional[str] = None
+    ) -> bool:
+        """Append clip row for FL Studio playlist item to a clip table."""
+        fields = self._get_clip_fields(item, track_name)
+        if fields is None:
+            return False
+        table.append(**fields)
+        return True
+
+    def resolve_warps(self, table: ClipTable) -> int:
+        """Convert tempo-relative stretches of a table's clips to beats in one pass.
+
+        The stretched source length in seconds is laid over the tempo map
+        from where the source starts on the timeline.
+
+        Returns:
+            Number of rows resolved.
+        """
+        stretch = table.column('stretch')
+        rows = np.flatnonzero(stretch > 0)
+        if not rows.size:
+            return 0
+
+        starts = table.column('position')[rows] / self.ppq - table.column('start_offset')[rows]
+        starts = np.maximum(starts, 0.0)
+        seconds = table.column('source_duration')[rows] * stretch[rows]
+        start_seconds = self.tempo_map.beats_to_seconds_many(starts)
+        warp_beats = self.tempo_map.seconds_to_beats_many(start_seconds + seconds) - starts
+        table.set_warps(rows, warp_beats)
+        return int(rows.size)
+
+    def _get_clip_fields(
+        self, item: ChannelPLItem, track_name: Optional[str] = None
+    ) -> Optional[Dict[str, Any]]:
+        """Extract clip attributes from FL Studio playlist item."""
         try:
             channel = item.channel
-            
-            # Get the source path and handle missing files
-            raw_path = str(channel.sample_path) if hasattr(channel, 'sample_path') else None
-            if not raw_path:
-                self.logger.warning(f"No sample path for channel in track {track_name}")
-                return None
-                
-            source_path = self.resolve_audio_path(raw_path)
-            if not source_path:
-                self.logger.warning(f"Could not resolve audio path: {raw_path}")
+            template = self._get_template(channel, track_name)
+            if template is None:
                 return None
 
-            # Get core timing values in beats
-            position_beats = item.position / self.ppq
-            duration = item.length / self.ppq 
+            # Core timing values stay in PPQ ticks
+            position, duration = item.position, item.length
+            if not isinstance(position, int) or not isinstance(duration, int):
+                self.logger.warning(f"Skipping clip {template.name} with no position or length")
+                return None
 
             # Convert FL Studio ms offsets to beats
-            start_offset, end_offset = self._get_normalized_offsets(item)
+            start_offset, end_offset = self._get_normalized_offsets(item, position / self.ppq)
 
-            clip = Clip(
-                name=self._sanitize_filename(source_path.stem),
-                position=position_beats,
-                duration=duration,
+            fields = template._asdict()
+            fields.update(
+                position_ticks=position,
+                duration_ticks=duration,
                 start_offset=start_offset,
                 end_offset=end_offset,
-                color=self._get_color(channel),
-                source_path=source_path,
-                format=source_path.suffix.lower().lstrip('.'),
                 track_name=track_name or "Default",
-                volume=self._get_normalized_volume(channel),
-                muted=not bool(getattr(channel, 'enabled', True))
             )
+            if not template.source_duration:
+                # Unknown source length; the clip's own length keeps Audio valid
+                start = position / self.ppq
+                fields['source_duration'] = (
+                    self.tempo_map.beats_to_seconds(start + duration / self.ppq)
+                    - self.tempo_map.beats_to_seconds(start)
+                )
             
             self.logger.debug(
-                f"Created clip {clip.name} at pos={position_beats}b, "
-                f"dur={duration}b, offsets=({start_offset}b, {end_offset}b)"
+                f"Created clip {template.name} at pos={position}t, "
+                f"dur={duration}t, offsets=({start_offset}b, {end_offset}b)"
             )
-            return clip
+            return fields
 
         except Exception as e:
             self.logger.error(f"Failed to create clip: {e}")
             return None
 
+    def _get_template(self, channel: Channel, track_name: Optional[str]) -> Optional[_ClipTemplate]:
+        """Get cached channel-derived clip attributes, building them on first use."""
+        key = getattr(channel, 'iid', None)
+        if key is None:
+            key = id(channel)
+
+        if key in self._templates:
+            self.template_hits += 1
+            return self._templates[key]
+
+        self.template_misses += 1
+        template = self._create_template(channel, track_name)
+        self._templates[key] = template
+        return template
+
+    def _create_template(
+        self, channel: Channel, track_name: Optional[str]
+    ) -> Optional[_ClipTemplate]:
+        """Compute clip attributes that only depend on the channel."""
+        # Get the source path and handle missing files
+        raw_path = str(channel.sample_path) if hasattr(channel, 'sample_path') else None
+        if not raw_path:
+            self.logger.warning(f"No sample path for channel in track {track_name}")
+            return None
+            
+        source_path = self.resolve_audio_path(raw_path)
+        if not source_path:
+            self.logger.warning(f"Could not resolve audio path: {raw_path}")
+            return None
+
+        info = probe_audio(source_path)
+        source_duration = info.duration if info else 0.0
+        name = self._sanitize_filename(source_path.stem)
+        if self.renderer is not None and info is not None:
+            effects = self._get_effects(channel)
+            if effects:
+                # The render replaces the source file; pitch shift resamples it to a new length
+                name = self._sanitize_filename(f"{source_path.stem} {effects.label}")
+                source_path = self.renderer.submit(source_path, effects)
+                source_duration /= effects.pitch_ratio
+        warp_beats, stretch, algorithm = self._get_stretch(channel)
+        if stretch and not source_duration:
+            self.logger.warning(f"Cannot stretch {source_path.name}: audio length unknown")
+            stretch = 0.0
+
+        return _ClipTemplate(
+            name=name,
+            source_path=source_path,
+            format=source_path.suffix.lower().lstrip('.'),
+            color=self._get_color(channel),
+            volume=self._get_normalized_volume(channel),
+            muted=not bool(getattr(channel, 'enabled', True)),
+            source_duration=source_duration,
+            warp_beats=warp_beats,
+            warp_algorithm=algorithm,
+            stretch=stretch
+        )
+
+    def _get_effects(self, channel: Channel) -> SamplerEffects:
+        """Get sampler effects that can only be kept by rendering them."""
+        if not isinstance(channel, Sampler):
+            return SamplerEffects()
+        try:
+            fx = channel.fx
+            mode = channel.content.declick_mode
+            declick = (0.0, 0.0)
+            if isinstance(mode, DeclickMode):
+                declick = DECLICK_RAMPS.get(mode, declick)
+            fade_in, fade_out = fx.fade_in, fx.fade_out
+            return SamplerEffects(
+                reverse=bool(fx.reverse),
+                fade_in=(fade_in if isinstance(fade_in, int) else 0) / FADE_RANGE,
+                fade_out=(fade_out if isinstance(fade_out, int) else 0) / FADE_RANGE,
+                pitch_cents=channel.pitch_shift or 0,
+                declick_in=declick[0],
+                declick_out=declick[1]
+            )
+        except Exception as e:
+            self.logger.debug(f"No effect settings for {getattr(channel, 'name', channel)}: {e}")
+            return SamplerEffects()
+
+    def _get_stretch(self, channel: Channel) -> Tuple[float, float, str]:
+        """Get sampler time stretch settings.
+
+        A stretch time fixes the sample length in beats; otherwise the
+        multiplier scales its length in seconds.
+
+        Returns:
+            Tuple of (fixed length in beats or 0, seconds multiplier or 0, algorithm).
+        """
+        try:
+            stretching = channel.stretching if isinstance(channel, Sampler) else None
+            time = stretching.time if stretching else None
+            multiplier = stretching.multiplier if stretching else None
+            mode = stretching.mode if stretching else None
+        except Exception as e:
+            self.logger.debug(f"No stretch settings for {getattr(channel, 'name', channel)}: {e}")
+            return 0.0, 0.0, "stretch"
+
+        if not isinstance(multiplier, (int, float)) or not multiplier:
+            multiplier = 1.0
+        algorithm = "repitch" if mode == StretchMode.Resample else "stretch"
+        if isinstance(time, MusicalTime):
+            raw = time.bars * 768 + time.beats * 48 + time.ticks // 5
+            if raw:
+                return raw / STRETCH_TIME_PER_BEAT * multiplier, 0.0, algorithm
+        if abs(multiplier - 1.0) > 1e-6:
+            return 0.0, multiplier, algorithm
+        return 0.0, 0.0, algorithm
+
+    def log_template_stats(self) -> None:
+        """Log clip template cache usage."""
+        log_cache_stats(
+            self.logger, "Clip template cache", f"{len(self._templates)} channels",
+            self.template_hits, self.template_misses
+        )
+
     def resolve_audio_path(self, raw_path: str) -> Optional[Path]:
         """Resolve audio file path, trying different extensions if needed."""
         try:
@@ -98,8 +311,10 @@ class FLClipParser:
             self.logger.error(f"Error resolving audio path {raw_path}: {e}")
             return None
 
-    def _get_normalized_offsets(self, item: ChannelPLItem) -> Tuple[float, float]:
-        """Convert FL Studio millisecond offsets to beats."""
+    def _get_normalized_offsets(
+        self, item: ChannelPLItem, position_beats: float = 0.0
+    ) -> Tuple[float, float]:
+        """Convert FL Studio millisecond offsets to beats at the clip position."""
         if not hasattr(item, 'offsets'):
             return (0.0, 0.0)
 
@@ -113,16 +328,21 @@ class FLClipParser:
         if end_ms == -1.0:  # Uncut sample end 
             end_ms = 0.0
 
-        # Convert milliseconds to beats using tempo
-        # beats = ms * (tempo/60000)
-        ms_to_beats = self.tempo / 60000.0
-
-        start_beats = start_ms * ms_to_beats if start_ms != 0 else 0
-        end_beats = end_ms * ms_to_beats if end_ms != 0 else 0
+        if self.tempo_map.is_constant:
+            # Convert milliseconds to beats using tempo
+            # beats = ms * (tempo/60000)
+            ms_to_beats = self.tempo_map.initial_tempo / 60000.0
+            start_beats = start_ms * ms_to_beats if start_ms != 0 else 0
+            end_beats = end_ms * ms_to_beats if end_ms != 0 else 0
+        else:
+            # Follow tempo changes from the clip position onwards
+            to_beats = self.tempo_map.seconds_to_beat_length
+            start_beats = to_beats(position_beats, start_ms / 1000.0) if start_ms != 0 else 0
+            end_beats = to_beats(position_beats, end_ms / 1000.0) if end_ms != 0 else 0
 
         self.logger.debug(
             f"Converting offsets: {start_ms}ms, {end_ms}ms -> "
-            f"{start_beats}b, {end_beats}b @ {self.tempo}bpm"
+            f"{start_beats}b, {end_beats}b @ {self.tempo_map.tempo_at(position_beats)}bpm"
         )
 
         return (max(0.0, start_beats), max(0.0, end_beats))
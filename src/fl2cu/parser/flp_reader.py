@@ -0,0 +1,246 @@
+from pathlib import Path
+from typing import AbstractSet, Any, Dict, Iterator, List, Optional, Tuple, Type, Union
+import logging
+import mmap
+import struct
+
+import pyflp
+from pyflp._events import (
+    DATA,
+    DWORD,
+    NEW_TEXT_IDS,
+    TEXT,
+    WORD,
+    AsciiEvent,
+    EventBase,
+    EventEnum,
+    EventTree,
+    IndexedEvent,
+    U8Event,
+    U16Event,
+    U32Event,
+    UnicodeEvent,
+    UnknownDataEvent,
+)
+from pyflp.exceptions import HeaderCorrupted, VersionNotDetected
+from pyflp.channel import ChannelID
+from pyflp.mixer import InsertID, MixerID
+from pyflp.pattern import PatternID
+from pyflp.project import VALID_PPQS, FileFormat, ProjectID
+
+FLP_HEADER = struct.Struct("<4sIh2H")
+EVENTS_OFFSET = 22  # Header chunk (14 bytes) + data chunk magic and size (8 bytes)
+
+# Events the converter never reads; kept undecoded on top of plugin and unknown data
+UNINSPECTED_EVENT_IDS = frozenset({MixerID.Params, InsertID.Routing})
+# Events decoded in bulk by the converter itself instead of by pyflp; only
+# deferred by callers that read them through the converter's own decoders
+BULK_DECODED_EVENT_IDS = frozenset({ChannelID.Automation, PatternID.Notes})
+
+
+class DeferredDataEvent(UnknownDataEvent):
+    """Data event whose payload stays an uncopied slice of the mapped file.
+
+    The payload is only copied out of the mapping if something reads
+    ``value``, which the converter never does for plugin state blobs.
+    """
+
+    def __init__(self, id: EventEnum, data: memoryview, reader: 'FLPReader'):
+        self.id = id
+        self._kwds: Dict[str, Any] = {}
+        self._view: Optional[memoryview] = data
+        self._reader = reader
+        self._value: Optional[bytes] = None
+
+    @property
+    def value(self) -> bytes:
+        if self._value is None and self._view is not None:
+            self._value = self._reader.copy(self._view)
+            self._view = None
+        return self._value or b""
+
+    @value.setter
+    def value(self, value: bytes) -> None:
+        self._value = value
+        self._view = None
+
+
+class FLPReader:
+    """Reads FLP files through mmap instead of loading them into memory.
+
+    Events are scanned straight from the mapping and their payloads are
+    handed out as memoryview slices. Payloads are only copied when an
+    event is decoded; plugin data and events of unknown structure stay
+    deferred. ``bytes_copied`` counts what actually left the mapping.
+    """
+
+    def __init__(self, file_path: Union[str, Path]):
+        self.file_path = Path(file_path)
+        self.logger = logging.getLogger(__name__)
+        self.bytes_copied = 0
+        self.event_count = 0
+        self.deferred_count = 0
+
+        with open(self.file_path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._view = memoryview(self._mmap)
+        self._read_header()
+
+        # Event ID -> pyflp event class, resolved once per ID
+        self._event_types: Dict[int, Optional[Type[Any]]] = {}
+
+    @property
+    def size(self) -> int:
+        return len(self._mmap)
+
+    def _read_header(self) -> None:
+        """Validate header and data chunk, as pyflp.parse does."""
+        try:
+            magic, header_size, fmt, channel_count, ppq = FLP_HEADER.unpack_from(self._mmap, 0)
+        except struct.error as exc:
+            raise HeaderCorrupted("Couldn't read the header entirely") from exc
+
+        if magic != b"FLhd":
+            raise HeaderCorrupted("Unexpected header chunk magic; expected 'FLhd'")
+        if header_size != 6:
+            raise HeaderCorrupted("Unexpected header chunk size; expected 6")
+        try:
+            self.file_format = FileFormat(fmt)
+        except ValueError as exc:
+            raise HeaderCorrupted("Unsupported project file format") from exc
+        if ppq not in VALID_PPQS:
+            raise HeaderCorrupted("Invalid PPQ")
+
+        if self._mmap[14:18] != b"FLdt":
+            raise HeaderCorrupted("Unexpected data chunk magic; expected 'FLdt'")
+        events_size = int.from_bytes(self._mmap[18:22], "little")
+        if not events_size:
+            raise HeaderCorrupted("Data chunk size couldn't be read")
+        if self.size != events_size + EVENTS_OFFSET:
+            raise HeaderCorrupted("Data chunk size corrupted")
+
+        self.channel_count = channel_count
+        self.ppq = ppq
+
+    def iter_events(self) -> Iterator[Tuple[int, memoryview]]:
+        """Yield (event id, payload) pairs without copying payloads."""
+        data = self._mmap
+        view = self._view
+        end = self.size
+        pos = EVENTS_OFFSET
+        while pos < end:
+            event_id = data[pos]
+            pos += 1
+            if event_id < WORD:
+                size = 1
+            elif event_id < DWORD:
+                size = 2
+            elif event_id < TEXT:
+                size = 4
+            else:
+                # Variable length payload prefixed with a 7-bit varint size
+                size = 0
+                shift = 0
+                while True:
+                    byte = data[pos]
+                    pos += 1
+                    size |= (byte & 0x7F) << shift
+                    if byte < 0x80:
+                        break
+                    shift += 7
+            yield event_id, view[pos:pos + size]
+            pos += size
+
+    def copy(self, payload: memoryview) -> bytes:
+        """Copy a payload out of the mapping, accounting for it."""
+        self.bytes_copied += len(payload)
+        return payload.tobytes()
+
+    def parse_project(
+        self, defer_ids: AbstractSet[int] = UNINSPECTED_EVENT_IDS
+    ) -> 'pyflp.project.Project':
+        """Build a pyflp Project from the mapped file.
+
+        Mirrors pyflp.parse, except that plugin data, unknown data and
+        events listed in defer_ids are kept as DeferredDataEvent slices
+        instead of being copied and decoded.
+
+        Args:
+            defer_ids: Event IDs to leave undecoded. Pass an empty set when
+                the mixer needs to be read through pyflp. Add
+                BULK_DECODED_EVENT_IDS only when automation points and
+                pattern notes are read with the converter's decoders, as
+                pyflp cannot read them from a deferred event.
+        """
+        events: List[EventBase[Any]] = []
+        str_type: Optional[Type[Any]] = None
+
+        for raw_id, payload in self.iter_events():
+            event_id = EventEnum(raw_id)
+            self.event_count += 1
+
+            if event_id == ProjectID.FLVersion:
+                parts = payload.tobytes().decode("ascii").rstrip("\0").split(".")
+                str_type = UnicodeEvent if [int(p) for p in parts][0:2] >= [11, 5] else AsciiEvent
+
+            deferred = raw_id in defer_ids
+            event_type = None if deferred else self._get_event_type(raw_id, event_id)
+            if event_type is None and not deferred:
+                if raw_id < WORD:
+                    event_type = U8Event
+                elif raw_id < DWORD:
+                    event_type = U16Event
+                elif raw_id < TEXT:
+                    event_type = U32Event
+                elif raw_id < DATA or raw_id in NEW_TEXT_IDS:
+                    if str_type is None:
+                        raise VersionNotDetected
+                    event_type = str_type
+                else:
+                    # Plugin state and other opaque blobs are not needed for conversion
+                    deferred = True
+
+            if deferred or event_type is None or event_type is UnknownDataEvent:
+                self.deferred_count += 1
+                events.append(DeferredDataEvent(event_id, payload, self))
+            else:
+                events.append(event_type(event_id, self.copy(payload)))
+
+        self.logger.debug(
+            f"Mapped {self.size} bytes of {self.file_path.name}: {self.event_count} events, "
+            f"{self.deferred_count} deferred, {self.bytes_copied} bytes copied"
+        )
+
+        return pyflp.project.Project(
+            EventTree(init=(IndexedEvent(r, e) for r, e in enumerate(events))),
+            channel_count=self.channel_count,
+            format=self.file_format,
+            ppq=self.ppq,
+        )
+
+    def _get_event_type(self, raw_id: int, event_id: EventEnum) -> Optional[Type[Any]]:
+        """Look up the pyflp event class registered for an event ID."""
+        if raw_id in self._event_types:
+            return self._event_types[raw_id]
+
+        event_type = None
+        for enum_ in EventEnum.__subclasses__():
+            if event_id in enum_:
+                event_type = getattr(enum_(event_id), "type")
+                break
+        self._event_types[raw_id] = event_type
+        return event_type
+
+    def close(self) -> None:
+        """Unmap the file; left to the garbage collector while payload views are alive."""
+        try:
+            self._view.release()
+            self._mmap.close()
+        except BufferError:
+            self.logger.debug("FLP mapping still referenced, leaving it open")
+
+    def __enter__(self) -> 'FLPReader':
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
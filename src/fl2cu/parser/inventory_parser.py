@@ -0,0 +1,131 @@
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple, Type, Union
+import logging
+
+from pyflp._events import AsciiEvent, UnicodeEvent
+from pyflp.arrangement import ArrangementID, PlaylistEvent
+from pyflp.channel import ChannelID
+from pyflp.project import ProjectID
+
+from ..models.inventory import ArrangementInventory, ProjectInventory, SampleInventory
+from .clip_parser import FLClipParser
+from .flp_reader import FLPReader
+from .project_parser import FLProjectParser
+
+
+class FLInventoryParser:
+    """Builds a project inventory from a header-plus-playlist scan.
+
+    Only the version, channel sample paths and arrangement playlists are
+    decoded from the mapped file; pyflp's event tree is never built, which
+    makes this much cheaper than a conversion.
+    """
+
+    def __init__(self, file_path: Union[str, Path]):
+        self.file_path = Path(file_path)
+        self.logger = logging.getLogger(__name__)
+        # Samples are resolved exactly like they are during conversion
+        self.clip_parser = FLClipParser(None, FLProjectParser.resolve_fl_studio_path)
+
+    def parse_inventory(self) -> ProjectInventory:
+        """Scan the project file and collect arrangement and sample inventory."""
+        inventory = ProjectInventory(source_path=self.file_path)
+        with FLPReader(self.file_path) as reader:
+            inventory.ppq = reader.ppq
+            inventory.version, sample_paths, playlists = self._scan_events(reader)
+
+        samples: Dict[str, SampleInventory] = {}
+        for name, playlist in playlists:
+            inventory.arrangements.append(
+                self._count_arrangement(name, playlist, sample_paths, samples)
+            )
+
+        for sample in samples.values():
+            self._resolve_sample(sample)
+        inventory.samples = list(samples.values())
+
+        self.logger.debug(
+            f"Inventory of {self.file_path.name}: {len(inventory.arrangements)} arrangements, "
+            f"{inventory.clip_count} clips, {len(inventory.samples)} samples "
+            f"({inventory.missing_count} missing)"
+        )
+        return inventory
+
+    def _scan_events(
+        self, reader: FLPReader
+    ) -> Tuple[Optional[str], Dict[int, str], List[Tuple[str, Optional[bytes]]]]:
+        """Collect version, sample path per channel and raw playlist per arrangement."""
+        version = None
+        str_type: Type[Union[AsciiEvent, UnicodeEvent]] = AsciiEvent
+        channel_iid: Optional[int] = None
+        sample_paths: Dict[int, str] = {}
+        # Projects older than FL 12.9 have a single playlist without ArrangementID.New
+        playlists: List[Tuple[str, Optional[bytes]]] = []
+
+        payload = None
+        for event_id, payload in reader.iter_events():
+            if event_id == ProjectID.FLVersion:
+                version = reader.copy(payload).decode("ascii").rstrip("\0")
+                major_minor = [int(part) for part in version.split(".")[:2]]
+                str_type = UnicodeEvent if major_minor >= [11, 5] else AsciiEvent
+            elif event_id == ChannelID.New:
+                channel_iid = int.from_bytes(payload, "little")
+            elif event_id == ChannelID.SamplePath and channel_iid is not None:
+                path = str_type(ChannelID.SamplePath, reader.copy(payload)).value
+                if path:
+                    sample_paths[channel_iid] = path
+            elif event_id == ArrangementID.New:
+                playlists.append(("Unnamed Arrangement", None))
+            elif event_id == ArrangementID.Name and playlists:
+                name = str_type(ArrangementID.Name, reader.copy(payload)).value
+                playlists[-1] = (name or "Unnamed Arrangement", playlists[-1][1])
+            elif event_id == ArrangementID.Playlist:
+                if not playlists:
+                    playlists.append(("Unnamed Arrangement", None))
+                playlists[-1] = (playlists[-1][0], reader.copy(payload))
+        payload = None  # Release the last view before the mapping is closed
+
+        return version, sample_paths, playlists
+
+    def _count_arrangement(
+        self,
+        name: str,
+        playlist: Optional[bytes],
+        sample_paths: Dict[int, str],
+        samples: Dict[str, SampleInventory]
+    ) -> ArrangementInventory:
+        """Count audio clips, their tracks and samples in an arrangement playlist."""
+        arrangement = ArrangementInventory(name=name)
+        if not playlist:
+            return arrangement
+
+        tracks: Set[int] = set()
+        for item in PlaylistEvent(ArrangementID.Playlist, playlist):
+            # Pattern items and channels without samples don't produce audio clips
+            if item["item_index"] > item["pattern_base"]:
+                continue
+            path = sample_paths.get(item["item_index"])
+            if path is None:
+                continue
+
+            arrangement.clip_count += 1
+            tracks.add(item["track_rvidx"])
+            arrangement.sample_uses[path] = arrangement.sample_uses.get(path, 0) + 1
+            sample = samples.get(path)
+            if sample is None:
+                sample = samples[path] = SampleInventory(path=path)
+            sample.use_count += 1
+
+        arrangement.track_count = len(tracks)
+        return arrangement
+
+    def _resolve_sample(self, sample: SampleInventory) -> None:
+        """Resolve sample path on disk and record its size."""
+        resolved = self.clip_parser.resolve_audio_path(sample.path)
+        sample.resolved_path = resolved
+        try:
+            if resolved and resolved.is_file():
+                sample.exists = True
+                sample.size = resolved.stat().st_size
+        except OSError as e:
+            self.logger.debug(f"Could not stat sample {resolved}: {e}")
@@ -1,43 +1,146 @@
-from typing import List, Optional
+from typing import Dict, List, Optional, Sequence
 import logging
-from ..models.clip import Clip
-from .clip_parser import FLClipParser
+
+import numpy as np
+import pyflp
+from pyflp.arrangement import PatternPLItem
+from pyflp.pattern import Pattern, PatternID
+
+from ..models.pattern import PatternClip, PatternNotes
+from ..utils.logger import log_cache_stats
+from .flp_reader import DeferredDataEvent
+
+# Layout of a single note in PatternID.Notes
+NOTE_DTYPE = np.dtype([
+    ('position', '<u4'),
+    ('flags', '<u2'),
+    ('rack_channel', '<u2'),
+    ('length', '<u4'),
+    ('key', '<u2'),
+    ('group', '<u2'),
+    ('fine_pitch', 'u1'),
+    ('_u1', 'u1'),
+    ('release', 'u1'),
+    ('midi_channel', 'u1'),
+    ('pan', 'u1'),
+    ('velocity', 'u1'),
+    ('mod_x', 'u1'),
+    ('mod_y', 'u1'),
+])
+NOTE_FIELDS = ('position', 'length', 'key', 'velocity', 'release', 'midi_channel')
+
+
+def decode_pattern_notes(pattern: Pattern) -> np.ndarray:
+    """Get all notes of a pattern as a structured NOTE_DTYPE array.
+
+    Raw note data is decoded in bulk; pyflp builds a construct container
+    and a Note model for every note.
+    """
+    events = pattern.events
+    if PatternID.Notes not in events.ids:
+        return np.empty(0, dtype=NOTE_DTYPE)
+
+    event = events.first(PatternID.Notes)
+    if not isinstance(event, DeferredDataEvent):
+        # Already decoded by pyflp
+        decoded = list(pattern.notes)
+        notes = np.zeros(len(decoded), dtype=NOTE_DTYPE)
+        for i, note in enumerate(decoded):
+            for field in NOTE_FIELDS:
+                notes[field][i] = note[field]
+        return notes
+
+    data = event.value
+    count = len(data) // NOTE_DTYPE.itemsize
+    return np.frombuffer(data, dtype=NOTE_DTYPE, count=count)
+
 
 class FLPatternParser:
     """Handles parsing of patterns from FL Studio projects."""
-    
-    def __init__(self, fl_project: 'pyflp.Project', clip_parser: FLClipParser):
-        self.fl_project = fl_project
-        self.clip_parser = clip_parser
+
+    def __init__(self, fl_project: 'pyflp.Project'):
+        self.fl_project: Optional[pyflp.Project] = fl_project
+        self.ppq = fl_project.ppq
         self.logger = logging.getLogger(__name__)
 
-    def create_clips_from_pattern(self, pattern, base_position: float = 0) -> List[Clip]:
-        """Create clips from an FL Studio pattern."""
+        # Position-relative notes keyed by pattern iid, shared by all arrangements
+        self._templates: Dict[int, PatternNotes] = {}
+        self.template_hits = 0
+        self.template_misses = 0
+
+    def release(self) -> None:
+        """Drop the reference to the pyflp project once parsing is done."""
+        self.fl_project = None
+
+    def parse_notes(self, pattern: Pattern) -> PatternNotes:
+        """Convert the notes of a pattern into note columns."""
+        notes = decode_pattern_notes(pattern)
+        lengths = notes['length'].astype(np.int64)
+        # Step sequencer notes have no length; give them one step
+        lengths[lengths == 0] = max(1, self.ppq // 4)
+        name, length = pattern.name, pattern.length
+
+        return PatternNotes(
+            pattern_id=pattern.iid,
+            name=name if isinstance(name, str) and name else f"Pattern {pattern.iid}",
+            ppq=self.ppq,
+            keys=notes['key'].astype(np.int32),
+            positions=notes['position'].astype(np.int64),
+            lengths=lengths,
+            velocities=notes['velocity'].astype(np.int32),
+            releases=notes['release'].astype(np.int32),
+            channels=(notes['midi_channel'] & 0x0F).astype(np.int32),
+            length=length if isinstance(length, int) and length else None
+        )
+
+    def get_notes(self, pattern: Pattern) -> PatternNotes:
+        """Get cached notes of a pattern, decoding them on first use."""
+        key = pattern.iid
+        notes = self._templates.get(key)
+        if notes is not None:
+            self.template_hits += 1
+            return notes
+
+        self.template_misses += 1
+        notes = self._templates[key] = self.parse_notes(pattern)
+        return notes
+
+    def create_clips(self, items: Sequence[PatternPLItem]) -> List[PatternClip]:
+        """Create notes clips for pattern placements of a track.
+
+        The notes themselves are decoded once per pattern and shared with
+        every other placement of it.
+        """
+        if not items:
+            return []
+
         clips = []
-        
-        try:
-            if not pattern.name:
-                return clips
-
-            self.logger.debug(f"Processing pattern: {pattern.name}")
-            
-            for channel_id, channel in enumerate(pattern.channels):
-                if not channel or not hasattr(channel, 'sample_path'):
-                    continue
-                    
-                position = base_position + (pattern.position if hasattr(pattern, 'position') else 0)
-                
-                clip = self.clip_parser.create_clip_from_channel(
-                    channel=channel,
-                    position=position,
-                    ppq=self.fl_project.ppq
+        for item in items:
+            pattern = item.pattern
+            position, length = item.position, item.length
+            if not isinstance(position, int) or not isinstance(length, int) or length <= 0:
+                self.logger.warning(
+                    f"Skipping pattern '{pattern.name or pattern.iid}' with no length"
                 )
-                
-                if clip:
-                    clips.append(clip)
-                    self.logger.debug(f"Added clip {clip.name} from pattern {pattern.name}")
-
-        except Exception as e:
-            self.logger.error(f"Failed to create clips from pattern: {e}")
-            
-        return clips
\ No newline at end of file
+                continue
+            notes = self.get_notes(pattern)
+            # Pattern item offsets are in ticks, -1 when the clip is not cut
+            start = max(round(item.offsets[0]), 0)
+            clips.append(PatternClip(
+                name=notes.name,
+                notes=notes,
+                position_ticks=position,
+                duration_ticks=length,
+                start_ticks=start,
+                muted=bool(item.muted)
+            ))
+
+        self.logger.debug(f"Created {len(clips)} pattern clips from {len(items)} placements")
+        return clips
+
+    def log_template_stats(self) -> None:
+        """Log pattern notes cache usage."""
+        log_cache_stats(
+            self.logger, "Pattern notes cache", f"{len(self._templates)} patterns",
+            self.template_hits, self.template_misses
+        )
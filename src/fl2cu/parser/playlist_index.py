@@ -0,0 +1,105 @@
+from typing import Dict, Iterator, List, Tuple
+import logging
+
+import pyflp
+from pyflp.arrangement import (
+    ArrangementID, ChannelPLItem, PatternPLItem, PlaylistEvent, PLItemBase, Track, TrackID
+)
+from pyflp.channel import Channel
+from pyflp.pattern import Pattern
+
+
+def get_item_sources(
+    fl_arrangement: 'pyflp.arrangement.Arrangement'
+) -> Tuple[Dict[int, Channel], Dict[int, Pattern]]:
+    """Get channels and patterns playlist items can refer to, keyed by iid.
+
+    pyflp hands these to each Arrangement as private keyword arguments and
+    has no public accessor for them, so this is the only place that reads
+    ``Arrangement._kw``.
+
+    Raises:
+        ValueError: If the installed pyflp no longer provides them.
+    """
+    kw = getattr(fl_arrangement, '_kw', None)
+    if not isinstance(kw, dict) or 'channels' not in kw or 'patterns' not in kw:
+        raise ValueError("Unsupported pyflp version: arrangement has no channels or patterns")
+    channels = {channel.iid: channel for channel in kw['channels']}
+    patterns = {pattern.iid: pattern for pattern in kw['patterns']}
+    return channels, patterns
+
+
+class PlaylistIndex:
+    """Occupancy index of an arrangement's playlist.
+
+    Built in one pass over the playlist event, grouping items by track and
+    recording occupied tracks in a bitmap. pyflp's ``Arrangement.tracks``
+    rescans the whole playlist for each of up to 500 tracks; this lets the
+    parser materialize only tracks that actually hold items.
+    """
+
+    def __init__(self, fl_arrangement: 'pyflp.arrangement.Arrangement', max_tracks: int):
+        self.fl_arrangement = fl_arrangement
+        self.max_tracks = max_tracks
+        self.occupancy = 0  # Bit n is set when track n has items
+        self._items: Dict[int, List[PLItemBase]] = {}
+        self.logger = logging.getLogger(__name__)
+        self._build()
+
+    def _build(self) -> None:
+        """Group playlist items by track index."""
+        events = self.fl_arrangement.events
+        if ArrangementID.Playlist not in events.ids:
+            return
+
+        channels, patterns = get_item_sources(self.fl_arrangement)
+        max_idx = self.max_tracks - 1
+
+        playlist = events.first(ArrangementID.Playlist)
+        if not isinstance(playlist, PlaylistEvent):
+            return
+        for i, item in enumerate(playlist):
+            track_idx = max_idx - item["track_rvidx"]
+            if item["item_index"] <= item["pattern_base"]:
+                pl_item: PLItemBase = ChannelPLItem(
+                    item, i, playlist, channel=channels[item["item_index"]]
+                )
+            else:
+                num = item["item_index"] - item["pattern_base"]
+                pl_item = PatternPLItem(item, i, playlist, pattern=patterns[num])
+
+            self._items.setdefault(track_idx, []).append(pl_item)
+            self.occupancy |= 1 << track_idx
+
+    def is_occupied(self, track_idx: int) -> bool:
+        return bool((self.occupancy >> track_idx) & 1)
+
+    @property
+    def occupied_count(self) -> int:
+        return bin(self.occupancy).count("1")
+
+    @property
+    def item_count(self) -> int:
+        return sum(len(items) for items in self._items.values())
+
+    def items(self, track_idx: int) -> List[PLItemBase]:
+        """Get playlist items placed on a track."""
+        return self._items.get(track_idx, [])
+
+    def iter_items(self) -> Iterator[PLItemBase]:
+        """Iterate all playlist items, grouped by track."""
+        for track_idx in sorted(self._items):
+            yield from self._items[track_idx]
+
+    def iter_tracks(self) -> Iterator[Tuple[int, Track]]:
+        """Yield (index, pyflp Track) for occupied tracks only."""
+        if not self.occupancy:
+            return
+
+        last_idx = self.occupancy.bit_length() - 1
+        track_events = self.fl_arrangement.events.divide(TrackID.Data, *TrackID)
+        for track_idx, event_tree in enumerate(track_events):
+            if track_idx > last_idx:
+                break
+            if self.is_occupied(track_idx):
+                yield track_idx, Track(event_tree, items=self._items[track_idx])
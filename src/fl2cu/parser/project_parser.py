@@ -1,19 +1,33 @@
+from dataclasses import replace
 from pathlib import Path
-from typing import List, Optional, Dict, Union
+from typing import Dict, Iterator, List, Optional, Union
+import gc
 import os
 import logging
 import pyflp
 
 
+from .automation_parser import FLAutomationParser
+from .flp_reader import BULK_DECODED_EVENT_IDS, UNINSPECTED_EVENT_IDS, FLPReader
 from .timing_parser import FLTimingParser
 from .clip_parser import FLClipParser
 from .arrangement_parser import FLArrangementParser
+from .pattern_parser import FLPatternParser
+from ..models.arrangement import Arrangement
+from ..models.automation import DEFAULT_TOLERANCE
 from ..models.project import Project
+from ..models.timing import ProjectTiming
+from ..render import EffectRenderer
 
 class FLProjectParser:
     """Main FL Studio project parser coordinating specialized parsers."""
     
-    def __init__(self, file_path: str):
+    def __init__(
+        self,
+        file_path: str,
+        automation_tolerance: float = DEFAULT_TOLERANCE,
+        renderer: Optional[EffectRenderer] = None
+    ):
         self.file_path = Path(file_path)
         if not self.file_path.exists():
             raise FileNotFoundError(f"Project file not found: {file_path}")
@@ -21,19 +35,36 @@ class FLProjectParser:
         self.logger = logging.getLogger(__name__)
         self.logger.debug(f"Loading FL Studio project: {file_path}")
         
-        # Parse FL Studio project
+        # Parse FL Studio project from a memory-mapped file
+        self.reader: Optional[FLPReader] = None
         try:
-            self.fl_project = pyflp.parse(file_path)
-            self.logger.debug(f"Project version: {self.fl_project.version}")
+            self.reader = FLPReader(self.file_path)
+            # Automation points and notes are decoded in bulk by the parsers below
+            fl_project = self.reader.parse_project(
+                UNINSPECTED_EVENT_IDS | BULK_DECODED_EVENT_IDS
+            )
+            self.logger.debug(f"Project version: {fl_project.version}")
         except Exception as e:
+            if self.reader is not None:
+                self.reader.close()
             raise RuntimeError(f"Failed to parse FL Studio project: {e}")
+        self.fl_project: Optional[pyflp.Project] = fl_project
 
         # Initialize specialized parsers
-        self.timing_parser = FLTimingParser(self.fl_project)
-        self.clip_parser = FLClipParser(self.fl_project, self.resolve_fl_studio_path)
-        self.arrangement_parser = FLArrangementParser(self.fl_project, self.clip_parser)
+        self.automation_parser = FLAutomationParser(fl_project.ppq, automation_tolerance)
+        self.timing_parser = FLTimingParser(fl_project, self.automation_parser)
+        self.clip_parser = FLClipParser(fl_project, self.resolve_fl_studio_path, renderer)
+        self.pattern_parser = FLPatternParser(fl_project)
+        self.arrangement_parser = FLArrangementParser(
+            fl_project,
+            self.clip_parser,
+            self.timing_parser,
+            self.automation_parser,
+            self.pattern_parser
+        )
 
-    def resolve_fl_studio_path(self, path: str) -> Optional[Path]:
+    @staticmethod
+    def resolve_fl_studio_path(path: str) -> Optional[Path]:
         """Resolve FL Studio environment variables in paths."""
         fl_variables = {
             "FLStudioUserData": "C:\\Users\\poznas\\Documents\\Image-Line\\Data\\FL Studio",
@@ -49,31 +80,72 @@ class FLProjectParser:
             resolved_path = Path(path)
             return resolved_path
         except Exception as e:
-            self.logger.error(f"Failed to resolve path {path}: {e}")
+            logging.getLogger(__name__).error(f"Failed to resolve path {path}: {e}")
             return None
 
     def parse_project(self) -> List[Project]:
+        """Parse all arrangements into self-contained projects.
+
+        The pyflp event tree is released before this returns.
+        """
+        return list(self.iter_projects())
+
+    def iter_projects(self) -> Iterator[Project]:
+        """Lazily yield one project per arrangement as it is parsed.
+
+        Parsing runs one arrangement ahead so the pyflp event tree can be
+        released before the last project is handed out.
+        """
+        if self.fl_project is None:
+            raise RuntimeError("FL Studio project was already released")
+
         # Parse timing info
         timing = self.timing_parser.parse_timing()
         
-        # Parse arrangements
-        arrangements = self.arrangement_parser.parse_arrangements()
+        # Parse arrangements one at a time
+        arrangements = self.arrangement_parser.iter_arrangements()
+        pending = next(arrangements, None)
+        while pending is not None:
+            following = next(arrangements, None)
+            if following is None:
+                self.release()
+            yield self._create_project(pending, timing)
+            pending = following
+
+    def _create_project(self, arrangement: Arrangement, timing: ProjectTiming) -> Project:
+        """Wrap a parsed arrangement in its own project."""
+        # Create project with timing info, including the arrangement's tempo automation
+        project = Project(
+            name=f"{self.file_path.stem}_{arrangement.name}",
+            timing=replace(timing, tempo_map=arrangement.tempo_map),
+            source_path=self.file_path
+        )
         
-        # Create projects
-        projects = []
-        for arrangement in arrangements:
-            # Create project with timing info
-            project = Project(
-                name=f"{self.file_path.stem}_{arrangement.name}",
-                timing=timing,
-                source_path=self.file_path
-            )
-            
-            # Set project reference on arrangement
-            arrangement.project = project  
-            
-            # Add arrangement to project
-            project.add_arrangement(arrangement)
-            projects.append(project)
+        # Set project reference on arrangement
+        arrangement.project = project  
+        
+        # Add arrangement to project
+        project.add_arrangement(arrangement)
+        return project
+
+    def release(self) -> None:
+        """Drop all references to the pyflp project so its event tree can be freed."""
+        if self.fl_project is None:
+            return
+        self.timing_parser.release()
+        self.clip_parser.release()
+        self.arrangement_parser.release()
+        self.fl_project = None
         
-        return projects
\ No newline at end of file
+        # pyflp event trees reference their parents, so freeing needs the cycle collector
+        gc.collect()
+        self.logger.debug("Released FL Studio event tree")
+
+        # Deferred events held views into the mapping, so unmap only after collection
+        if self.reader is not None:
+            self.logger.debug(
+                f"FLP input: {self.reader.size} bytes mapped, "
+                f"{self.reader.bytes_copied} bytes copied"
+            )
+            self.reader.close()
+            self.reader = None
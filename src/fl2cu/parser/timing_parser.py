@@ -1,29 +1,51 @@
 from pathlib import Path
 import logging
-from typing import Optional
+from typing import Iterable, List, Optional, Tuple
+
+from pyflp.arrangement import ChannelPLItem, PLItemBase
+from pyflp.channel import Automation
 from pyflp.project import Project as FLProject
+from ..models.tempo_map import TempoMap
 from ..models.timing import ProjectTiming
+from .automation_parser import FLAutomationParser
+
+# FL Studio maps normalized tempo automation values onto this BPM range
+FL_TEMPO_MIN = 10.0
+FL_TEMPO_MAX = 522.0
 
 class FLTimingParser:
     """Handles extraction of timing information from FL Studio projects."""
     
-    def __init__(self, fl_project: FLProject):
-        self.fl_project = fl_project
+    def __init__(
+        self, fl_project: FLProject, automation_parser: Optional[FLAutomationParser] = None
+    ):
+        self.fl_project: Optional[FLProject] = fl_project
+        self.automation_parser = automation_parser or FLAutomationParser(fl_project.ppq)
         self.logger = logging.getLogger(__name__)
 
+    def release(self) -> None:
+        """Drop the reference to the pyflp project once parsing is done."""
+        self.fl_project = None
+
     def parse_timing(self) -> ProjectTiming:
         """Extract timing information from FL Studio project."""
+        fl_project = self.fl_project
+        if fl_project is None:
+            raise RuntimeError("FL Studio project was already released")
         try:
             # Get tempo from project (FLPs store this directly)
-            tempo = float(self.fl_project.tempo)
+            project_tempo = fl_project.tempo
+            if project_tempo is None:
+                raise ValueError("Project has no tempo")
+            tempo = float(project_tempo)
             
             # Get time signature
             # FL Studio stores numerator and denominator separately
-            time_sig_num = getattr(self.fl_project, 'time_signature_numerator', 4)
-            time_sig_denom = getattr(self.fl_project, 'time_signature_denominator', 4)
+            time_sig_num = getattr(fl_project, 'time_signature_numerator', 4)
+            time_sig_denom = getattr(fl_project, 'time_signature_denominator', 4)
             
             # Get PPQ (Pulses Per Quarter note)
-            ppq = self.fl_project.ppq
+            ppq = fl_project.ppq
             
             timing = ProjectTiming(
                 tempo=tempo,
@@ -39,4 +61,50 @@ class FLTimingParser:
             
         except Exception as e:
             self.logger.error(f"Failed to parse timing info: {e}")
-            return ProjectTiming.default()
\ No newline at end of file
+            return ProjectTiming.default()
+
+    def parse_tempo_map(self, items: Iterable[PLItemBase], base_tempo: float) -> Optional[TempoMap]:
+        """Build tempo map from tempo automation clips among an arrangement's playlist items.
+
+        Every point is kept: the map holds each tempo until the next point,
+        so thinning a ramp down to its ends, as decimate_points would,
+        misplaces everything after it.
+
+        Returns None when the arrangement has no tempo automation.
+        """
+        ppq = self.automation_parser.ppq
+        changes: List[Tuple[float, float]] = []
+        try:
+            for item in items:
+                if not isinstance(item, ChannelPLItem):
+                    continue
+                if not self.is_tempo_automation(item.channel):
+                    continue
+
+                ticks, values = self.automation_parser.get_item_points(item)
+                tempos = FL_TEMPO_MIN + values * (FL_TEMPO_MAX - FL_TEMPO_MIN)
+                changes.extend(zip((ticks / ppq).tolist(), tempos.tolist()))
+        except Exception as e:
+            self.logger.error(f"Failed to parse tempo automation: {e}")
+            return None
+
+        if not changes:
+            return None
+
+        # Project tempo applies until the first automation point
+        if min(beat for beat, _ in changes) > 0:
+            changes.append((0.0, base_tempo))
+
+        tempo_map = TempoMap(changes)
+        self.logger.debug(
+            f"Parsed tempo map with {len(tempo_map)} segments from {len(changes)} points"
+        )
+        return tempo_map
+
+    @staticmethod
+    def is_tempo_automation(channel: object) -> bool:
+        """Check whether a channel is an automation clip targeting project tempo."""
+        if not isinstance(channel, Automation):
+            return False
+        name = channel.display_name or ""
+        return "tempo" in name.lower()
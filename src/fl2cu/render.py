@@ -0,0 +1,198 @@
+from concurrent.futures import Future, ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, NamedTuple, Optional, Tuple
+import logging
+import os
+
+import numpy as np
+
+from .utils.audio_probe import probe_audio
+from .utils.hashing import HashLookup, new_content_hash
+
+try:
+    import soundfile
+except ImportError:  # Rendering is unavailable without it
+    soundfile = None
+
+RENDER_CACHE_DIR = (
+    Path(os.getenv("XDG_CACHE_HOME", Path.home() / ".cache")) / "fl2cu" / "renders"
+)
+RENDER_VERSION = 2  # Bump when render output changes so cached renders are redone
+FADE_RANGE = 1024   # Sampler fade knobs run from 0 to 1024 of the sample length
+
+
+class SamplerEffects(NamedTuple):
+    """Sampler processing that DAWproject has no element for."""
+    reverse: bool = False
+    fade_in: float = 0.0   # Fraction of the sample length
+    fade_out: float = 0.0  # Fraction of the sample length
+    pitch_cents: int = 0
+    declick_in: float = 0.0   # Ramp length in seconds
+    declick_out: float = 0.0  # Ramp length in seconds
+
+    @property
+    def pitch_ratio(self) -> float:
+        """Playback speed factor of the pitch shift."""
+        return float(2.0 ** (self.pitch_cents / 1200.0))
+
+    @property
+    def label(self) -> str:
+        """Readable summary of the effects, telling renders of one source apart."""
+        parts = []
+        if self.reverse:
+            parts.append("reversed")
+        if self.pitch_cents:
+            parts.append(f"pitch{self.pitch_cents}")
+        if self.fade_in or self.fade_out:
+            parts.append(f"fade{self.fade_in:.3g}-{self.fade_out:.3g}")
+        if self.declick_in or self.declick_out:
+            parts.append(f"declick{self.declick_in:.3g}-{self.declick_out:.3g}")
+        return " ".join(parts)
+
+    def __bool__(self) -> bool:
+        return self != SamplerEffects()
+
+
+def _ramp(data: np.ndarray, length: int, fade_in: bool) -> None:
+    """Apply a linear gain ramp to the start or end of frames in place."""
+    length = min(length, len(data))
+    if length <= 0:
+        return
+    gain = np.linspace(0.0, 1.0, length, endpoint=False, dtype=data.dtype)[:, np.newaxis]
+    if fade_in:
+        data[:length] *= gain
+    else:
+        data[-length:] *= gain[::-1]
+
+
+def render_effects(
+    source: Path, dest: Path, effects: SamplerEffects, format: str = 'WAV', subtype: str = 'FLOAT'
+) -> Path:
+    """Render sampler effects of a source file into a new file of the given format.
+
+    Reverse, fades and declick ramps are applied to the whole frame array
+    at once; pitch shift resamples it, changing its length like FL's
+    resampling playback does.
+    """
+    data, sample_rate = soundfile.read(str(source), dtype='float32', always_2d=True)
+    if effects.reverse:
+        data = np.ascontiguousarray(data[::-1])
+
+    frames = len(data)
+    _ramp(data, round(frames * effects.fade_in), fade_in=True)
+    _ramp(data, round(frames * effects.fade_out), fade_in=False)
+    _ramp(data, round(sample_rate * effects.declick_in), fade_in=True)
+    _ramp(data, round(sample_rate * effects.declick_out), fade_in=False)
+
+    if effects.pitch_cents and frames:
+        positions = np.arange(0.0, frames - 1, effects.pitch_ratio)
+        data = np.stack(
+            [np.interp(positions, np.arange(frames), data[:, ch]) for ch in range(data.shape[1])],
+            axis=1
+        ).astype(np.float32)
+
+    dest.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = dest.with_suffix(f".{os.getpid()}.tmp")
+    soundfile.write(str(tmp_path), data, sample_rate, subtype=subtype, format=format)
+    os.replace(tmp_path, dest)
+    return dest
+
+
+class EffectRenderer:
+    """Renders sampler effects into new audio files in a process pool.
+
+    Renders keep the source's container and subtype when soundfile can
+    write them, so they are packaged under the source's format, and are
+    WAV otherwise. They are cached on disk by source and effect
+    parameters, so a source only gets rendered once per set of effects.
+    A source is identified by its content hash when hash_lookup knows it
+    and by its path, size and mtime otherwise; it is never read before
+    the render itself. submit() returns the final path right away while
+    the render runs in the background; call wait() before the files are
+    packaged.
+    """
+
+    def __init__(
+        self,
+        jobs: Optional[int] = None,
+        cache_dir: Optional[Path] = None,
+        hash_lookup: Optional[HashLookup] = None
+    ):
+        if soundfile is None:
+            raise RuntimeError("Rendering sampler effects requires the soundfile package")
+        self.jobs = jobs or os.cpu_count() or 1
+        self.cache_dir = Path(cache_dir) if cache_dir else RENDER_CACHE_DIR
+        self.hash_lookup = hash_lookup
+        self.logger = logging.getLogger(__name__)
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._pending: Dict[Path, Future] = {}
+        self.cache_hits = 0
+
+    @staticmethod
+    def get_render_format(source: Path) -> Tuple[str, str, str]:
+        """Get soundfile format, subtype and file suffix of a source's render."""
+        info = probe_audio(source)
+        if info is not None and info.format and info.subtype:
+            try:
+                if soundfile.check_format(info.format, info.subtype):
+                    return info.format, info.subtype, source.suffix.lower()
+            except ValueError:
+                pass
+        return 'WAV', 'FLOAT', '.wav'
+
+    def get_render_path(self, source: Path, effects: SamplerEffects, suffix: str = '.wav') -> Path:
+        """Get cache path of a render, keyed by source and effects."""
+        identity = self.hash_lookup(source) if self.hash_lookup else None
+        if identity is None:
+            stat = source.stat()
+            identity = f"{source.resolve()}\0{stat.st_size}\0{stat.st_mtime_ns}"
+        key = new_content_hash()
+        key.update(identity.encode())
+        key.update(repr((RENDER_VERSION, tuple(effects))).encode())
+        return self.cache_dir / f"{source.stem}-{key.hexdigest()[:16]}{suffix}"
+
+    def submit(self, source: Path, effects: SamplerEffects) -> Path:
+        """Schedule a render unless it is cached, returning its path."""
+        format, subtype, suffix = self.get_render_format(source)
+        dest = self.get_render_path(source, effects, suffix)
+        if dest in self._pending:
+            return dest
+        if dest.exists():
+            self.cache_hits += 1
+            self.logger.debug(f"Using cached render {dest.name}")
+            return dest
+
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.jobs)
+        self.logger.debug(f"Rendering {source.name} with {effects}")
+        self._pending[dest] = self._executor.submit(
+            render_effects, source, dest, effects, format, subtype
+        )
+        return dest
+
+    def wait(self) -> int:
+        """Wait for scheduled renders and return how many failed."""
+        failed = 0
+        for dest, future in self._pending.items():
+            try:
+                future.result()
+            except Exception as e:
+                failed += 1
+                self.logger.error(f"Failed to render {dest.name}: {e}")
+        self.logger.debug(
+            f"Rendered {len(self._pending) - failed}/{len(self._pending)} sources, "
+            f"{self.cache_hits} cached"
+        )
+        self._pending.clear()
+        return failed
+
+    def close(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+    def __enter__(self) -> 'EffectRenderer':
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
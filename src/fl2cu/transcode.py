@@ -0,0 +1,382 @@
+from concurrent.futures import Future, ProcessPoolExecutor
+from math import gcd
+from pathlib import Path
+from typing import Any, Dict, Iterator, NamedTuple, Optional, Tuple, Union
+import contextlib
+import logging
+import os
+import struct
+
+import numpy as np
+
+from .utils.audio_probe import probe_audio
+from .utils.hashing import HashLookup, SourceHasher, hash_file, new_content_hash
+
+try:
+    import soundfile
+except ImportError:  # Transcoding is unavailable without it
+    soundfile = None
+
+TRANSCODE_CACHE_DIR = (
+    Path(os.getenv("XDG_CACHE_HOME", Path.home() / ".cache")) / "fl2cu" / "transcodes"
+)
+TRANSCODE_VERSION = 2  # Bump when transcoder output changes so cached files are redone
+
+# WAV subtypes written for each target bit depth
+BIT_DEPTH_SUBTYPES: Dict[int, str] = {16: 'PCM_16', 24: 'PCM_24', 32: 'FLOAT'}
+# Source subtypes kept as they are when only the sample rate changes
+WAV_SUBTYPES = frozenset(('PCM_16', 'PCM_24', 'PCM_32', 'FLOAT', 'DOUBLE'))
+DEFAULT_SUBTYPE = 'PCM_24'
+# Subtypes FLAC stores losslessly, and the uncompressed containers converted to it
+FLAC_SUBTYPES = frozenset(('PCM_16', 'PCM_24'))
+FLAC_SOURCE_FORMATS = frozenset(('WAV', 'WAVEX', 'AIFF'))
+
+# Sample layouts of uncompressed WAV data that can be mapped, by (format tag, bits)
+WAV_DTYPES: Dict[Tuple[int, int], str] = {
+    (1, 16): '<i2', (1, 24): 'u1', (1, 32): '<i4', (3, 32): '<f4', (3, 64): '<f8'
+}
+WAVE_FORMAT_EXTENSIBLE = 0xFFFE
+
+FILTER_HALF_LENGTH = 10  # Filter taps on each side per polyphase branch
+KAISER_BETA = 5.0
+RESAMPLE_BLOCK = 65536   # Output frames converted and written per block
+
+
+class TranscodeTarget(NamedTuple):
+    """Format a source is converted to."""
+    sample_rate: int
+    channels: int
+    subtype: str
+    format: str  # soundfile container format, WAV or FLAC
+
+    @property
+    def extension(self) -> str:
+        return self.format.lower()
+
+
+def map_wav_frames(path: Path) -> Optional[Tuple[np.ndarray, float]]:
+    """Memory-map the sample frames of an uncompressed WAV file.
+
+    Returns:
+        Frames x channels array (frames x channels x 3 bytes for 24-bit
+        PCM) and the scale to full-range float, or None when the file has
+        no layout that can be mapped directly.
+    """
+    with open(path, 'rb') as f:
+        header = f.read(12)
+        if len(header) < 12 or header[:4] != b'RIFF' or header[8:12] != b'WAVE':
+            return None
+
+        layout = None
+        while True:
+            chunk = f.read(8)
+            if len(chunk) < 8:
+                return None
+            chunk_id, size = struct.unpack('<4sI', chunk)
+            if chunk_id == b'data':
+                break
+            if chunk_id == b'fmt ' and size >= 16:
+                fmt = f.read(size)
+                tag, channels, _, _, _, bits = struct.unpack('<HHIIHH', fmt[:16])
+                if tag == WAVE_FORMAT_EXTENSIBLE and size >= 26:
+                    tag = struct.unpack('<H', fmt[24:26])[0]
+                layout = (tag, channels, bits)
+                f.seek(size & 1, 1)
+            else:
+                f.seek(size + (size & 1), 1)
+        offset = f.tell()
+
+    if layout is None or not layout[1]:
+        return None
+    tag, channels, bits = layout
+    dtype = WAV_DTYPES.get((tag, bits))
+    if dtype is None:
+        return None
+
+    frame_size = channels * bits // 8
+    frames = min(size, os.path.getsize(path) - offset) // frame_size
+    if frames <= 0:
+        return None
+    shape = (frames, channels, 3) if bits == 24 else (frames, channels)
+    data = np.memmap(path, dtype=dtype, mode='r', offset=offset, shape=shape)
+    scale = 1.0 if tag == 3 else 1.0 / (1 << (bits - 1))
+    return data, scale
+
+
+def _to_float(block: np.ndarray, scale: float) -> np.ndarray:
+    """Convert a block of mapped frames to float32 in the -1..1 range."""
+    if block.ndim == 3:
+        # Packed 24-bit PCM, sign-extended through the top byte of an int32
+        block = block.astype(np.int32)
+        block = ((block[..., 0] | (block[..., 1] << 8) | (block[..., 2] << 16)) << 8) >> 8
+    data = block.astype(np.float32)
+    if scale != 1.0:
+        data *= np.float32(scale)
+    return data
+
+
+class SoundFileFrames:
+    """Frames of a file only soundfile can decode, read a slice at a time."""
+
+    def __init__(self, sound_file: Any):
+        self._file = sound_file
+        self.shape: Tuple[int, int] = (sound_file.frames, sound_file.channels)
+
+    def __len__(self) -> int:
+        return self.shape[0]
+
+    def __getitem__(self, index: slice) -> np.ndarray:
+        start, stop, _ = index.indices(len(self))
+        self._file.seek(start)
+        block: np.ndarray = self._file.read(stop - start, dtype='float32', always_2d=True)
+        return block
+
+
+# Source frames: memory-mapped WAV data or a file decoded on demand
+Frames = Union[np.ndarray, SoundFileFrames]
+
+
+@contextlib.contextmanager
+def open_frames(path: Path) -> Iterator[Tuple[Frames, float, int]]:
+    """Open frames of an audio file, memory-mapped when it is a plain WAV.
+
+    Yields:
+        Frames, their scale to float and the sample rate.
+    """
+    info = probe_audio(path)
+    mapped = map_wav_frames(path) if info is not None else None
+    if info is not None and mapped is not None:
+        yield mapped[0], mapped[1], info.sample_rate
+        return
+    with soundfile.SoundFile(str(path)) as f:
+        yield SoundFileFrames(f), 1.0, f.samplerate
+
+
+def _design_filter(up: int, down: int) -> np.ndarray:
+    """Kaiser-windowed sinc lowpass for resampling by up/down, gain up."""
+    max_rate = max(up, down)
+    half = FILTER_HALF_LENGTH * max_rate
+    window = np.kaiser(2 * half + 1, KAISER_BETA)
+    taps: np.ndarray = np.sinc(np.arange(-half, half + 1) / max_rate) * window
+    taps *= up / taps.sum()
+    return taps
+
+
+def iter_blocks(frames: Frames, scale: float) -> Iterator[np.ndarray]:
+    """Yield frames as float32 blocks of at most RESAMPLE_BLOCK frames."""
+    for start in range(0, len(frames), RESAMPLE_BLOCK):
+        yield _to_float(frames[start:start + RESAMPLE_BLOCK], scale)
+
+
+def iter_resampled(
+    frames: Frames, scale: float, source_rate: int, target_rate: int
+) -> Iterator[np.ndarray]:
+    """Polyphase resampling, reading the input and yielding output a block at a time.
+
+    Output frame m is the upsampled, filtered input at m * down; only
+    the taps of one polyphase branch touch non-zero samples, so each output
+    frame is a short dot product with the input around m * down / up.
+    Memory stays bounded by the block size whatever the file length.
+    """
+    divisor = gcd(source_rate, target_rate)
+    up, down = target_rate // divisor, source_rate // divisor
+    taps = _design_filter(up, down)
+    half = len(taps) // 2
+    branch_taps = -(-len(taps) // up)
+    padded = np.zeros(branch_taps * up)
+    padded[:len(taps)] = taps
+    branches = padded.reshape(branch_taps, up).T  # branches[p, q] = taps[p + q * up]
+
+    n_in = len(frames)
+    n_out = -(-n_in * up // down)
+    channels = frames.shape[1]
+    offsets = np.arange(branch_taps)
+    for start in range(0, n_out, RESAMPLE_BLOCK):
+        t = np.arange(start, min(start + RESAMPLE_BLOCK, n_out)) * down + half
+        indices = (t // up)[:, np.newaxis] - offsets
+        lo = max(int(indices.min()), 0)
+        hi = min(int(indices.max()) + 1, n_in)
+        if lo >= hi:
+            yield np.zeros((len(t), channels), dtype=np.float32)
+            continue
+
+        block = _to_float(frames[lo:hi], scale)
+        weights = branches[t % up] * ((indices >= 0) & (indices < n_in))
+        gathered = block[np.clip(indices - lo, 0, hi - lo - 1)]
+        yield np.einsum('bt,btc->bc', weights, gathered).astype(np.float32)
+
+
+def transcode_audio(
+    source: Path, dest: Path, sample_rate: int, subtype: str, format: str = 'WAV'
+) -> Path:
+    """Convert a source file to a file with the given rate, subtype and format.
+
+    Frames are read, converted and written a block at a time.
+    """
+    dest.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = dest.with_suffix(f".{os.getpid()}.tmp")
+    with open_frames(source) as (frames, scale, source_rate):
+        if source_rate != sample_rate:
+            blocks = iter_resampled(frames, scale, source_rate, sample_rate)
+        else:
+            blocks = iter_blocks(frames, scale)
+        with soundfile.SoundFile(
+            str(tmp_path), 'w', sample_rate, frames.shape[1], subtype=subtype, format=format
+        ) as out:
+            for block in blocks:
+                if subtype.startswith('PCM'):
+                    np.clip(block, -1.0, 1.0, out=block)
+                out.write(block)
+    os.replace(tmp_path, dest)
+    return dest
+
+
+def get_transcode_path(
+    cache_dir: Path, source: Path, digest: str, target: TranscodeTarget
+) -> Path:
+    """Get cache path of a converted source, keyed by content hash and format."""
+    key = new_content_hash()
+    key.update(digest.encode())
+    key.update(repr(
+        (TRANSCODE_VERSION, target.sample_rate, target.subtype, target.format)
+    ).encode())
+    return cache_dir / f"{source.stem}-{key.hexdigest()[:16]}.{target.extension}"
+
+
+def transcode_cached(
+    source: Path, target: TranscodeTarget, cache_dir: Path, digest: Optional[str] = None
+) -> Tuple[Path, str, bool]:
+    """Convert a source into the transcode cache unless it is already there.
+
+    Runs in a worker, so sources whose hash is not known yet are read and
+    hashed off the main thread.
+
+    Returns:
+        Cache path, content hash of the source and whether it was cached.
+    """
+    digest = digest or hash_file(source)
+    dest = get_transcode_path(cache_dir, source, digest, target)
+    if dest.exists():
+        return dest, digest, True
+    transcode_audio(source, dest, target.sample_rate, target.subtype, target.format)
+    return dest, digest, False
+
+
+class AudioTranscoder:
+    """Converts sources to a target sample rate and bit depth in a process pool.
+
+    Only sources whose rate or bit depth differ from the target are
+    converted, to WAV; with flac, uncompressed 16 and 24-bit sources are
+    converted to FLAC as well. Converted files are cached on disk by source
+    content hash and target format. Workers hash the sources, check the
+    cache and convert in the background; call wait() before get_path()
+    and before the files are packaged.
+    """
+
+    def __init__(
+        self,
+        sample_rate: Optional[int] = None,
+        bit_depth: Optional[int] = None,
+        flac: bool = False,
+        jobs: Optional[int] = None,
+        cache_dir: Optional[Path] = None,
+        hash_lookup: Optional[HashLookup] = None
+    ):
+        if soundfile is None:
+            raise RuntimeError("Transcoding audio requires the soundfile package")
+        if bit_depth is not None and bit_depth not in BIT_DEPTH_SUBTYPES:
+            raise ValueError(
+                f"Unsupported bit depth {bit_depth}, use one of {sorted(BIT_DEPTH_SUBTYPES)}"
+            )
+        self.sample_rate = sample_rate
+        self.bit_depth = bit_depth
+        self.flac = flac
+        self.jobs = jobs or os.cpu_count() or 1
+        self.cache_dir = Path(cache_dir) if cache_dir else TRANSCODE_CACHE_DIR
+        self.hasher = SourceHasher(hash_lookup)
+        self.logger = logging.getLogger(__name__)
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._pending: Dict[Tuple[Path, TranscodeTarget], Future] = {}
+        self._paths: Dict[Tuple[Path, TranscodeTarget], Path] = {}
+        self._formats: Dict[Path, Optional[TranscodeTarget]] = {}
+        self.cache_hits = 0
+
+    def get_format(self, source: Optional[Path]) -> Optional[TranscodeTarget]:
+        """Get the format a source is converted to, None if it is kept as is."""
+        if not source:
+            return None
+        if source not in self._formats:
+            self._formats[source] = self._get_format(source)
+        return self._formats[source]
+
+    def _get_format(self, source: Path) -> Optional[TranscodeTarget]:
+        info = probe_audio(source)
+        if info is None:
+            return None
+
+        sample_rate = self.sample_rate or info.sample_rate
+        if self.bit_depth:
+            subtype = BIT_DEPTH_SUBTYPES[self.bit_depth]
+        else:
+            subtype = info.subtype if info.subtype in WAV_SUBTYPES else DEFAULT_SUBTYPE
+        format = 'FLAC' if self.flac and subtype in FLAC_SUBTYPES else 'WAV'
+        if (
+            sample_rate == info.sample_rate
+            and (not self.bit_depth or subtype == info.subtype)
+            and (format != 'FLAC' or info.format not in FLAC_SOURCE_FORMATS)
+        ):
+            return None
+        return TranscodeTarget(sample_rate, info.channels, subtype, format)
+
+    def submit(self, source: Path, target: TranscodeTarget) -> None:
+        """Schedule conversion of a source to target unless it is cached."""
+        key = (source, target)
+        if key in self._pending or key in self._paths:
+            return
+
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.jobs)
+        self.logger.debug(
+            f"Scheduling {source.name} for {target.format} {target.sample_rate} Hz {target.subtype}"
+        )
+        self._pending[key] = self._executor.submit(
+            transcode_cached, source, target, self.cache_dir, self.hasher.get_known_hash(source)
+        )
+
+    def get_path(self, source: Path, target: TranscodeTarget) -> Optional[Path]:
+        """Get the converted file of a source once wait() returned, None if it failed."""
+        return self._paths.get((source, target))
+
+    def wait(self) -> int:
+        """Wait for scheduled conversions and return how many failed."""
+        failed = cached_count = 0
+        for (source, target), future in self._pending.items():
+            try:
+                dest, digest, cached = future.result()
+            except Exception as e:
+                failed += 1
+                self.logger.error(f"Failed to transcode {source.name}: {e}")
+                continue
+            self.hasher.add(source, digest)
+            self._paths[(source, target)] = dest
+            if cached:
+                cached_count += 1
+                self.logger.debug(f"Using cached transcode {dest.name}")
+        self.cache_hits += cached_count
+        self.logger.debug(
+            f"Transcoded {len(self._pending) - failed}/{len(self._pending)} sources, "
+            f"{cached_count} cached"
+        )
+        self._pending.clear()
+        return failed
+
+    def close(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+    def __enter__(self) -> 'AudioTranscoder':
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
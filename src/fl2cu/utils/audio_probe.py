@@ -0,0 +1,62 @@
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, NamedTuple, Optional, Union
+import contextlib
+import logging
+import wave
+
+try:
+    import soundfile
+except ImportError:  # Only WAV files can be probed without it
+    soundfile = None
+
+# soundfile subtypes of the PCM sample widths the wave module can read
+WAVE_SUBTYPES: Dict[int, str] = {1: 'PCM_U8', 2: 'PCM_16', 3: 'PCM_24', 4: 'PCM_32'}
+
+
+class AudioInfo(NamedTuple):
+    """Length and layout of an audio file, read from its header."""
+    frames: int
+    sample_rate: int
+    channels: int
+    subtype: Optional[str] = None  # soundfile subtype, e.g. PCM_24
+    format: Optional[str] = None   # soundfile container format, e.g. WAV
+
+    @property
+    def duration(self) -> float:
+        """Length in seconds."""
+        return self.frames / self.sample_rate if self.sample_rate else 0.0
+
+
+@lru_cache(maxsize=4096)
+def probe_audio(path: Union[str, Path]) -> Optional[AudioInfo]:
+    """Read audio file length and layout without decoding samples.
+
+    Uses soundfile when installed and falls back to the wave module.
+
+    Returns:
+        AudioInfo, or None if the file is missing or unreadable.
+    """
+    logger = logging.getLogger(__name__)
+    path = Path(path)
+    if not path.is_file():
+        return None
+
+    if soundfile is not None:
+        try:
+            info = soundfile.info(str(path))
+            return AudioInfo(
+                info.frames, info.samplerate, info.channels, info.subtype, info.format
+            )
+        except Exception as e:
+            logger.debug(f"soundfile could not probe {path}: {e}")
+
+    try:
+        with contextlib.closing(wave.open(str(path), 'rb')) as f:
+            return AudioInfo(
+                f.getnframes(), f.getframerate(), f.getnchannels(),
+                WAVE_SUBTYPES.get(f.getsampwidth()), 'WAV'
+            )
+    except Exception as e:
+        logger.debug(f"Could not probe audio file {path}: {e}")
+        return None
@@ -0,0 +1,83 @@
+from io import BufferedIOBase
+from pathlib import Path
+from typing import IO, Callable, Dict, Optional, Tuple, Union
+import hashlib
+
+HASH_CHUNK_SIZE = 1024 * 1024  # Reads stay at page-multiple file offsets; buffer is not aligned
+HASH_DIGEST_SIZE = 32
+HASH_NAME = f"blake2b-{HASH_DIGEST_SIZE * 8}"
+
+# Gets a known content hash of a file, None if it has to be hashed
+HashLookup = Callable[[Path], Optional[str]]
+
+
+def new_content_hash() -> hashlib.blake2b:
+    """Create the hash object used for audio content hashes."""
+    return hashlib.blake2b(digest_size=HASH_DIGEST_SIZE)
+
+
+def hash_stream(
+    source: BufferedIOBase,
+    dest: Optional[IO[bytes]] = None,
+    chunk_size: int = HASH_CHUNK_SIZE
+) -> Tuple[str, int]:
+    """Hash a binary stream, copying it to dest in the same pass if given.
+
+    Chunks are read into a single reused buffer instead of allocating a
+    new bytes object per read.
+
+    Returns:
+        Hex content hash and number of bytes read.
+    """
+    digest = new_content_hash()
+    buffer = bytearray(chunk_size)
+    view = memoryview(buffer)
+    size = 0
+    while True:
+        count = source.readinto(buffer)
+        if not count:
+            break
+        chunk = view[:count]
+        digest.update(chunk)
+        if dest is not None:
+            dest.write(chunk)
+        size += count
+    return digest.hexdigest(), size
+
+
+def hash_file(path: Union[str, Path], chunk_size: int = HASH_CHUNK_SIZE) -> str:
+    """Get content hash of a file, reading it in chunks."""
+    with open(path, 'rb') as f:
+        return hash_stream(f, chunk_size=chunk_size)[0]
+
+
+class SourceHasher:
+    """Content hashes of source files, each hashed at most once.
+
+    A lookup, such as SampleCatalog.get_hash, is asked first so files
+    hashed by an earlier run are not read again.
+    """
+
+    def __init__(self, lookup: Optional[HashLookup] = None):
+        self.lookup = lookup
+        self._hashes: Dict[Path, str] = {}
+
+    def get_known_hash(self, path: Path) -> Optional[str]:
+        """Get hash of a file if it is cached or looked up, without reading the file."""
+        digest = self._hashes.get(path)
+        if digest is None and self.lookup is not None:
+            digest = self.lookup(path)
+            if digest is not None:
+                self._hashes[path] = digest
+        return digest
+
+    def add(self, path: Path, digest: str) -> None:
+        """Record a hash computed elsewhere, e.g. in a worker process."""
+        self._hashes[path] = digest
+
+    def get_hash(self, path: Path) -> str:
+        """Get hash of a file, reading it only if it is not known yet."""
+        digest = self.get_known_hash(path)
+        if digest is None:
+            digest = self._hashes[path] = hash_file(path)
+        return digest
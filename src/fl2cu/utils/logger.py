@@ -42,4 +42,12 @@ def log_error(error: Exception, context: Optional[str] = None) -> None:
     error_message = f"{error.__class__.__name__}: {str(error)}"
     if context:
         error_message = f"{context} - {error_message}"
-    logger.error(error_message, exc_info=True)
\ No newline at end of file
+    logger.error(error_message, exc_info=True)
+
+def log_cache_stats(
+    logger: logging.Logger, name: str, entries: str, hits: int, misses: int
+) -> None:
+    """Log size and hit rate of a parse cache, e.g. entries="12 channels"."""
+    lookups = hits + misses
+    hit_rate = (hits / lookups * 100) if lookups else 0.0
+    logger.debug(f"{name}: {entries}, {hits}/{lookups} hits ({hit_rate:.1f}% hit rate)")
@@ -0,0 +1,230 @@
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from pathlib import Path
+from typing import Any, Callable, Deque, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+import collections
+import io
+import logging
+import os
+import queue
+import threading
+
+DEFAULT_PREFETCH_FILES = 8
+DEFAULT_PREFETCH_BUDGET = 256 * 1024 * 1024
+DEFAULT_READ_TIMEOUT = 60.0  # Seconds to wait for one file before retrying it
+DEFAULT_READ_RETRIES = 2
+RETRY_WORKERS = 2  # Retries get their own threads so they never queue behind read-ahead
+
+# Stat, contents (None when streamed) and budget bytes held by a loaded file
+LoadResult = Tuple[os.stat_result, Optional[bytes], int]
+# Future to complete, function and its arguments
+PoolTask = Tuple[Future, Callable[..., Any], Tuple[Any, ...]]
+
+
+class PrefetchedFile(NamedTuple):
+    """Contents of a source file read ahead of the consumer."""
+    path: Path
+    stat: os.stat_result
+    data: Optional[bytes]  # None when the file exceeds the budget and is streamed instead
+
+    def open(self) -> io.BufferedIOBase:
+        return io.BytesIO(self.data) if self.data is not None else open(self.path, 'rb')
+
+
+class DaemonThreadPool:
+    """Fixed pool of daemon threads running submitted calls.
+
+    ThreadPoolExecutor joins its threads at interpreter exit, so a read
+    stuck on an unresponsive network share would keep the process alive
+    after the conversion gave up on it. Daemon threads are abandoned
+    instead.
+    """
+
+    def __init__(self, workers: int, name: str):
+        self._tasks: 'queue.SimpleQueue[Optional[PoolTask]]' = queue.SimpleQueue()
+        self._threads = [
+            threading.Thread(target=self._run, name=f"{name}_{index}", daemon=True)
+            for index in range(workers)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def submit(self, fn: Callable[..., Any], *args: Any) -> Future:
+        future: Future = Future()
+        self._tasks.put((future, fn, args))
+        return future
+
+    def _run(self) -> None:
+        while True:
+            task = self._tasks.get()
+            if task is None:
+                return
+            future, fn, args = task
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                future.set_result(fn(*args))
+            except BaseException as e:
+                future.set_exception(e)
+
+    def shutdown(self) -> None:
+        """Let idle threads exit; threads stuck in a call are left behind."""
+        for _ in self._threads:
+            self._tasks.put(None)
+
+
+class SourcePrefetcher:
+    """Reads files ahead of an in-order consumer in a bounded thread pool.
+
+    On network storage every open and read pays a round trip, so reading
+    files one after another is latency bound. Here up to `files` files are
+    stat'ed and read in parallel while the consumer works through them in
+    order. Memory is bounded by `budget` bytes held at once; it is handed
+    out in file order so later files can never starve the one the consumer
+    waits on, and files larger than the budget are streamed by the consumer
+    instead. A file that takes longer than `timeout` or fails to read is
+    retried, then reported and skipped instead of stalling the conversion;
+    reads run on daemon threads, so one that never returns does not keep
+    the process from exiting.
+    """
+
+    def __init__(
+        self,
+        files: int = DEFAULT_PREFETCH_FILES,
+        budget: int = DEFAULT_PREFETCH_BUDGET,
+        timeout: Optional[float] = DEFAULT_READ_TIMEOUT,
+        retries: int = DEFAULT_READ_RETRIES
+    ):
+        self.files = max(1, files)
+        self.budget = budget
+        self.timeout = timeout
+        self.retries = retries
+        self.logger = logging.getLogger(__name__)
+        self.failed: List[Path] = []
+
+        self._executor = DaemonThreadPool(self.files, "prefetch")
+        self._retry_executor: Optional[DaemonThreadPool] = None
+        self._condition = threading.Condition()
+        self._turn = 0       # Index of the next file allowed to reserve budget
+        self._in_flight = 0  # Bytes reserved by read but unconsumed files
+        self._closed = False
+
+    def iter_files(self, paths: Sequence[Path]) -> Iterator[Tuple[Path, Optional[PrefetchedFile]]]:
+        """Yield each path with its contents in order, None if it could not be read."""
+        pending: 'Deque[Future[LoadResult]]' = collections.deque()
+        submitted = 0
+        try:
+            for index, path in enumerate(paths):
+                while submitted < len(paths) and submitted < index + self.files:
+                    pending.append(
+                        self._executor.submit(self._load, submitted, paths[submitted], True)
+                    )
+                    submitted += 1
+
+                loaded = self._wait(index, path, pending.popleft())
+                if loaded is None:
+                    yield path, None
+                    continue
+                stat, data, reserved = loaded
+                try:
+                    yield path, PrefetchedFile(path, stat, data)
+                finally:
+                    self._release(reserved)
+        finally:
+            # Drop read-ahead the consumer will not get to
+            for future in pending:
+                future.cancel()
+
+    def _wait(self, index: int, path: Path, future: 'Future[LoadResult]') -> Optional[LoadResult]:
+        """Wait for a file, retrying stragglers and failures; None if it never loads."""
+        for attempt in range(self.retries + 1):
+            try:
+                return future.result(timeout=self.timeout)
+            except FutureTimeoutError:
+                # Whatever the stuck read reserved is returned when it finishes
+                future.add_done_callback(self._release_abandoned)
+                self.logger.warning(f"Reading {path} timed out after {self.timeout}s")
+            except Exception as e:
+                self.logger.warning(f"Reading {path} failed: {e}")
+
+            # Let later files reserve budget while this one is retried outside it
+            self._pass_turn(index)
+            if attempt < self.retries:
+                self.logger.debug(f"Retrying {path} ({attempt + 1}/{self.retries})")
+                if self._retry_executor is None:
+                    self._retry_executor = DaemonThreadPool(RETRY_WORKERS, "prefetch-retry")
+                future = self._retry_executor.submit(self._load, index, path, False)
+
+        self.logger.error(f"Giving up on {path} after {self.retries + 1} attempts")
+        self.failed.append(path)
+        return None
+
+    def _load(self, index: int, path: Path, budgeted: bool) -> LoadResult:
+        """Stat and read a file, reserving budget in file order when budgeted."""
+        try:
+            stat = os.stat(path)
+        except BaseException:
+            if budgeted:
+                self._reserve(index, 0)
+            raise
+
+        streamed = stat.st_size > self.budget
+        reserved = self._reserve(index, 0 if streamed else stat.st_size) if budgeted else 0
+        if streamed:
+            return stat, None, reserved
+        try:
+            with open(path, 'rb') as f:
+                return stat, f.read(), reserved
+        except BaseException:
+            self._release(reserved)
+            raise
+
+    def _reserve(self, index: int, size: int) -> int:
+        """Wait for this file's turn and room in the budget, then hold size bytes."""
+        with self._condition:
+            self._condition.wait_for(lambda: (
+                self._closed or index < self._turn or (
+                    index == self._turn
+                    and (self._in_flight == 0 or self._in_flight + size <= self.budget)
+                )
+            ))
+            if self._closed:
+                raise RuntimeError("Prefetcher closed")
+            if index < self._turn:
+                # The consumer gave up waiting and moved past this file
+                return 0
+            self._turn += 1
+            self._in_flight += size
+            self._condition.notify_all()
+            return size
+
+    def _release(self, size: int) -> None:
+        if not size:
+            return
+        with self._condition:
+            self._in_flight -= size
+            self._condition.notify_all()
+
+    def _release_abandoned(self, future: Future) -> None:
+        if not future.cancelled() and future.exception() is None:
+            self._release(future.result()[2])
+
+    def _pass_turn(self, index: int) -> None:
+        with self._condition:
+            if self._turn <= index:
+                self._turn = index + 1
+                self._condition.notify_all()
+
+    def close(self) -> None:
+        """Stop reading ahead; reads already running are abandoned to their threads."""
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+        for executor in (self._executor, self._retry_executor):
+            if executor is not None:
+                executor.shutdown()
+
+    def __enter__(self) -> 'SourcePrefetcher':
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
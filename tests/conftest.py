@@ -0,0 +1,55 @@
+from pathlib import Path
+import sys
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "src"))
+
+SAMPLE_PROJECT = ROOT / "examples" / "sample_project" / "sample_project.flp"
+
+
+@pytest.fixture
+def sample_project() -> Path:
+    if not SAMPLE_PROJECT.exists():
+        pytest.skip("Sample project not available")
+    return SAMPLE_PROJECT
+
+
+def build_arrangement(
+    track_count: int = 12, clips_per_track: int = 16, source_dir: Path = Path("/samples")
+):
+    """Arrangement of synthetic audio clips covering plain, warped, muted and escaped names."""
+    from fl2cu.models.arrangement import Arrangement
+    from fl2cu.models.clip import Clip
+    from fl2cu.models.project import Project
+    from fl2cu.models.timing import ProjectTiming
+    from fl2cu.models.track import Track
+
+    project = Project("P", ProjectTiming(
+        tempo=120.0, time_signature_numerator=4, time_signature_denominator=4, ppq=96
+    ))
+    arrangement = Arrangement("Arrangement")
+    arrangement.project = project
+    for track_index in range(track_count):
+        track_name = f"Track {track_index} <&\"'>"
+        clips = [
+            Clip(
+                name=f"clip {track_index}-{index} & \"quoted\" <{index % 3}>",
+                position=index * 4.25,
+                duration=3.0 + (index % 5) * 0.125,
+                source_path=source_dir / f"source_{index % 7}.wav",
+                track_name=track_name,
+                format="wav",
+                start_offset=(index % 4) * 0.1,
+                end_offset=(index % 4) * 0.1 + 2.0,
+                muted=index % 6 == 0,
+                volume=0.5 + (index % 3) * 0.25,
+                source_duration=4.0,
+                warp_beats=8.0 if index % 4 == 1 else 0.0,
+                warp_algorithm="repitch" if index % 8 == 1 else "stretch",
+            )
+            for index in range(clips_per_track)
+        ]
+        arrangement.add_track(Track(track_name, f"track-{track_index}", clips))
+    return arrangement
@@ -0,0 +1,48 @@
+import logging
+import zipfile
+
+import pytest
+
+from fl2cu.generator.dawproject_generator import DAWProjectGenerator
+from fl2cu.manifest import verify_archive
+from fl2cu.parser.project_parser import FLProjectParser
+
+
+@pytest.fixture
+def arrangements(sample_project):
+    project = next(FLProjectParser(str(sample_project)).iter_projects())
+    return project.arrangements
+
+
+def test_no_temp_files_left(arrangements, tmp_path):
+    output_path = tmp_path / "out.dawproject"
+    assert DAWProjectGenerator(arrangements).generate_dawproject(str(output_path))
+    assert [path.name for path in tmp_path.iterdir()] == [output_path.name]
+    assert not verify_archive(output_path)
+
+
+def test_interrupted_archive_resumes(arrangements, tmp_path, monkeypatch, caplog):
+    output_path = tmp_path / "out.dawproject"
+    add_member = DAWProjectGenerator._add_member
+    added = []
+
+    def interrupt_second(zf, path, name, source=None):
+        if added:
+            raise KeyboardInterrupt
+        added.append(name)
+        return add_member(zf, path, name, source)
+
+    monkeypatch.setattr(DAWProjectGenerator, "_add_member", staticmethod(interrupt_second))
+    with pytest.raises(KeyboardInterrupt):
+        DAWProjectGenerator(arrangements).generate_dawproject(str(output_path))
+    assert not output_path.exists()
+    assert not [path for path in tmp_path.iterdir() if path.is_dir()]
+
+    monkeypatch.setattr(DAWProjectGenerator, "_add_member", staticmethod(add_member))
+    with caplog.at_level(logging.INFO):
+        assert DAWProjectGenerator(arrangements).generate_dawproject(str(output_path))
+    assert "after 1 committed members" in caplog.text
+    assert [path.name for path in tmp_path.iterdir()] == [output_path.name]
+    assert not verify_archive(output_path)
+    with zipfile.ZipFile(output_path) as zf:
+        assert set(zf.namelist()) >= {"project.xml", "metadata.xml"}
@@ -0,0 +1,41 @@
+import numpy as np
+import pytest
+
+from conftest import build_arrangement
+from fl2cu.models.arrangement import Arrangement
+from fl2cu.models.automation import AutomationLane
+from fl2cu.models.track import Track
+
+
+def test_automation_only_arrangement_has_tracks():
+    arrangement = Arrangement("Automation only")
+    assert not arrangement.has_tracks()
+
+    lane = AutomationLane("Volume", "volume", np.array([0.0, 4.0]), np.array([0.2, 0.8]))
+    arrangement.add_track(Track("Track 1", "track-1", [], automation=[lane]))
+    assert arrangement.has_tracks()
+
+
+def test_duplicate_track_id_is_rejected():
+    arrangement = build_arrangement(track_count=2, clips_per_track=4)
+    duplicate = Track("Other", "track-1", [])
+    with pytest.raises(ValueError, match="Track track-1 already exists"):
+        arrangement.add_track(duplicate)
+    assert arrangement.track_count == 2
+    assert arrangement.get_track("track-1") is not duplicate
+
+
+def test_aggregates_match_tracks():
+    arrangement = build_arrangement(track_count=3, clips_per_track=5)
+    tracks = arrangement.get_tracks()
+    assert arrangement.clip_count == sum(track.clip_count for track in tracks) == 15
+    assert arrangement.end_time == max(track.end_time for track in tracks)
+    assert set(arrangement.source_paths) == {
+        row.source_path for track in tracks for row in track.clips
+    }
+
+    # Clips are fixed once a track is built, so the aggregates cannot go stale
+    with pytest.raises(AttributeError):
+        tracks[0].clips = []
+    with pytest.raises(AttributeError):
+        tracks[0].pattern_clips = []
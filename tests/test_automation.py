@@ -0,0 +1,93 @@
+from types import SimpleNamespace
+
+import numpy as np
+from pyflp.arrangement import ChannelPLItem
+from pyflp.channel import Automation
+
+from fl2cu.models.automation import decimate_points
+from fl2cu.parser import automation_parser
+from fl2cu.parser.automation_parser import FLAutomationParser
+from fl2cu.parser.timing_parser import FL_TEMPO_MAX, FL_TEMPO_MIN, FLTimingParser
+
+PPQ = 96
+
+
+def smooth_curve(count=10000):
+    times = np.linspace(0.0, 64.0, count)
+    return times, 0.5 + 0.4 * np.sin(times / 3) * np.cos(times / 11)
+
+
+def tempo_parser(monkeypatch, ticks, bpms):
+    automation = FLAutomationParser(PPQ)
+    values = (np.asarray(bpms, dtype=float) - FL_TEMPO_MIN) / (FL_TEMPO_MAX - FL_TEMPO_MIN)
+    monkeypatch.setattr(automation, "get_item_points", lambda item: (np.asarray(ticks), values))
+    parser = FLTimingParser(SimpleNamespace(ppq=PPQ), automation)
+    monkeypatch.setattr(parser, "is_tempo_automation", lambda channel: True)
+    return parser
+
+
+def playlist_item(position=0, length=16 * PPQ, start_offset=-1.0, channel=None):
+    fields = {
+        "position": position, "length": length, "start_offset": start_offset, "end_offset": -1.0
+    }
+    return ChannelPLItem(fields, 0, None, channel=channel)
+
+
+def test_tempo_ramp_keeps_every_point(monkeypatch):
+    # 100 -> 200 BPM over 16 beats, drawn as a point every eighth of a beat
+    beats = np.arange(0, 16.125, 0.125)
+    parser = tempo_parser(monkeypatch, beats * PPQ, 100 + beats * 100 / 16)
+    tempo_map = parser.parse_tempo_map([playlist_item()], 120.0)
+
+    assert len(tempo_map) == len(beats)
+    # Integral of 60 / tempo over the ramp; thinning it to its ends gives 9.6s
+    expected = 60 * 16 / 100 * np.log(2)
+    assert abs(tempo_map.beats_to_seconds(16.0) - expected) < 0.05
+
+
+def automation_item(monkeypatch, ticks, values, **fields):
+    points = (np.asarray(ticks, dtype=float), np.asarray(values, dtype=float))
+    monkeypatch.setattr(automation_parser, "decode_automation_points", lambda channel: points)
+    return playlist_item(channel=Automation.__new__(Automation), **fields)
+
+
+def test_item_points_follow_the_trimmed_start(monkeypatch):
+    item = automation_item(
+        monkeypatch, [0, 96, 192, 288], [0.0, 1.0, 0.0, 1.0],
+        position=960, length=192, start_offset=48.0
+    )
+    ticks, values = FLAutomationParser(PPQ).get_item_points(item)
+
+    assert ticks.tolist() == [960, 1008, 1104, 1152]
+    # Values at both cuts are interpolated between the points around them
+    assert values.tolist() == [0.5, 1.0, 0.0, 0.5]
+
+
+def test_uncut_item_keeps_its_last_point(monkeypatch):
+    item = automation_item(monkeypatch, [0, 96, 192], [0.2, 0.4, 0.8], position=96, length=192)
+    ticks, values = FLAutomationParser(PPQ).get_item_points(item)
+
+    assert ticks.tolist() == [96, 192, 288]
+    assert values.tolist() == [0.2, 0.4, 0.8]
+
+
+def test_decimation_stays_within_tolerance():
+    times, values = smooth_curve()
+    for tolerance in (0.05, 0.01, 0.001):
+        keep = decimate_points(times, values, tolerance)
+        restored = np.interp(times, times[keep], values[keep])
+        assert np.max(np.abs(restored - values)) <= tolerance
+        assert keep[0] and keep[-1]
+
+
+def test_zero_tolerance_keeps_every_point():
+    times, values = smooth_curve(500)
+    assert decimate_points(times, values, 0.0).all()
+
+
+def test_decimation_reduces_smooth_curves():
+    times, values = smooth_curve()
+    assert decimate_points(times, values, 0.001).sum() < len(times) // 20
+
+    line = np.linspace(0.0, 1.0, len(times))
+    assert decimate_points(times, line, 0.001).sum() == 2
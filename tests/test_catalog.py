@@ -0,0 +1,56 @@
+import shutil
+
+import pytest
+
+from fl2cu.catalog import SampleCatalog
+from fl2cu.utils import hashing
+from fl2cu.utils.hashing import SourceHasher, hash_file
+
+
+@pytest.fixture
+def catalog(tmp_path):
+    with SampleCatalog(tmp_path / "catalog.sqlite") as catalog:
+        yield catalog
+
+
+def test_deleted_projects_are_pruned(catalog, sample_project, tmp_path):
+    projects = [tmp_path / "a.flp", tmp_path / "b.flp"]
+    for path in projects:
+        shutil.copy(sample_project, path)
+    assert catalog.update(projects) == (2, 0, 0)
+
+    projects[0].unlink()
+    assert catalog.update(projects[1:]) == (0, 1, 1)
+    assert {row["project"] for row in catalog.usages()} <= {str(projects[1])}
+    rows = catalog.connection.execute("SELECT path FROM projects").fetchall()
+    assert [row[0] for row in rows] == [str(projects[1])]
+    orphans = catalog.connection.execute(
+        "SELECT COUNT(*) FROM usages WHERE project_id NOT IN (SELECT id FROM projects)"
+    ).fetchone()[0]
+    assert orphans == 0
+
+
+def test_catalog_hashes_are_looked_up(catalog, tmp_path, monkeypatch):
+    sample = tmp_path / "kick.wav"
+    sample.write_bytes(b"RIFF" + bytes(1000))
+    catalog._record_sample(str(sample), True, sample.stat().st_size)
+    catalog.hash_samples()
+    expected = hash_file(sample)
+
+    def fail(path):
+        raise AssertionError(f"{path} was rehashed")
+
+    monkeypatch.setattr(hashing, "hash_file", fail)
+    hasher = SourceHasher(catalog.get_hash)
+    assert hasher.get_hash(sample) == expected
+
+
+def test_changed_sample_is_rehashed(catalog, tmp_path):
+    sample = tmp_path / "kick.wav"
+    sample.write_bytes(b"RIFF" + bytes(1000))
+    catalog._record_sample(str(sample), True, sample.stat().st_size)
+    catalog.hash_samples()
+
+    sample.write_bytes(b"RIFF" + bytes(2000))
+    assert catalog.get_hash(sample) is None
+    assert SourceHasher(catalog.get_hash).get_hash(sample) == hash_file(sample)
@@ -0,0 +1,99 @@
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from fl2cu.models.clip import Clip
+from fl2cu.models.clip_table import ClipTable
+
+
+def make_clips():
+    return [
+        Clip(name="kick", position=0.0, duration=4.0, source_path=Path("audio/kick.wav"),
+             track_name="Drums", format="wav", track_id="track-1"),
+        Clip(name="pad", position=2.5, duration=8.0, source_path=Path("audio/pad.flac"),
+             track_name="Keys", format="flac", start_offset=0.25, end_offset=3.0,
+             color="#ff0000", volume=0.5, muted=True, arrangement_name="Intro",
+             metadata={"pitch": 2}, source_duration=6.0, warp_beats=12.0,
+             warp_algorithm="repitch"),
+        Clip(name="kick", position=16.0, duration=4.0, source_path=Path("audio/kick.wav"),
+             track_name="Drums", format="wav", track_id="track-1"),
+    ]
+
+
+def test_round_trip_through_clips():
+    clips = make_clips()
+    table = ClipTable.from_clips(clips)
+
+    assert len(table) == len(clips)
+    assert [row.to_clip() for row in table] == clips
+    # Repeated names and sources are stored once
+    assert table.source_paths == [Path("audio/kick.wav"), Path("audio/pad.flac")]
+    assert table[1].position_ticks == 240
+    assert table[1].end_ticks == 1008
+
+
+def test_round_trip_keeps_positions_at_other_ppq():
+    clips = make_clips()
+    table = ClipTable.from_clips(clips, ppq=960)
+    assert table.column('position').tolist() == [0, 2400, 15360]
+    assert [row.to_clip() for row in table] == clips
+
+
+@pytest.mark.parametrize("fields, message", [
+    ({"name": ""}, "Clip name cannot be empty"),
+    ({"position_ticks": -1}, "Position cannot be negative"),
+    ({"duration_ticks": 0}, "Duration must be positive"),
+    ({"track_name": ""}, "Track name cannot be empty"),
+])
+def test_validate_reports_first_invalid_row(fields, message):
+    table = ClipTable.from_clips(make_clips())
+    row = {
+        "name": "bad", "position_ticks": 0, "duration_ticks": 96,
+        "source_path": "audio/bad.wav", "track_name": "Drums", "format": "wav",
+    }
+    row.update(fields)
+    table.append(**row)
+    table.append(**row)
+
+    with pytest.raises(ValueError, match=rf"^{message} \(row 3, 2 rows total\)$"):
+        table.validate()
+    # The same rows are rejected when materialized one by one
+    with pytest.raises(ValueError, match=message):
+        table[3].to_clip()
+
+
+def test_validate_accepts_valid_and_empty_tables():
+    ClipTable().validate()
+    ClipTable.from_clips(make_clips()).validate()
+
+
+def test_set_warps():
+    table = ClipTable.from_clips(make_clips())
+    table.set_warps(np.array([0, 2]), np.array([6.0, 7.5]))
+    assert table.column('warp_beats').tolist() == [6.0, 12.0, 7.5]
+
+    # The column can still grow after the bulk update
+    table.extend(make_clips()[:1])
+    assert table[-1].warp_beats == 0.0
+
+
+def test_negative_and_slice_indexing():
+    table = ClipTable.from_clips(make_clips())
+
+    assert table[-1] == table[2]
+    assert table[-3].name == "kick"
+    assert [row.index for row in table[1:]] == [1, 2]
+    assert [row.index for row in table[::-1]] == [2, 1, 0]
+    assert table[5:] == []
+    for index in (3, -4):
+        with pytest.raises(IndexError):
+            table[index]
+
+
+def test_columns_are_read_only():
+    table = ClipTable.from_clips(make_clips())
+    with pytest.raises(ValueError):
+        table.column('position')[0] = 1
+    with pytest.raises(KeyError):
+        table.column('names')
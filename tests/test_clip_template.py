@@ -0,0 +1,30 @@
+import io
+from xml.etree import ElementTree as ET
+
+import pytest
+
+from conftest import build_arrangement
+from fl2cu.generator.xml.clip import ClipGenerator
+from fl2cu.generator.xml_utils import XMLWriter
+
+
+@pytest.fixture(scope="module")
+def clips():
+    return list(build_arrangement(track_count=1).get_tracks()[0].clips)
+
+
+@pytest.mark.parametrize("level", [4, 6])
+def test_write_clip_matches_element(clips, level):
+    generator = ClipGenerator()
+    assert any(clip.warp_beats > 0 for clip in clips)
+    assert any(clip.muted for clip in clips)
+    assert any(not clip.muted and clip.warp_beats == 0 for clip in clips)
+    assert all("&" in clip.name and "<" in clip.name for clip in clips)
+
+    for clip in clips:
+        stream = io.StringIO()
+        generator.write_clip(clip, stream, level)
+
+        element = generator.create_clip(clip)
+        XMLWriter.format_xml(element, level)
+        assert stream.getvalue() == ET.tostring(element, encoding="unicode"), clip.name
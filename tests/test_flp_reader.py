@@ -0,0 +1,34 @@
+from collections import Counter
+
+from fl2cu.parser.flp_reader import UNINSPECTED_EVENT_IDS, DeferredDataEvent, FLPReader
+
+
+def test_deferred_payloads_are_not_copied(sample_project):
+    with FLPReader(sample_project) as reader:
+        events = list(reader.parse_project().events)
+        copied = reader.bytes_copied
+        deferred = [event for event in events if isinstance(event, DeferredDataEvent)]
+        assert deferred
+        assert all(event._value is None for event in deferred)
+
+        # Reading a deferred payload copies it out of the mapping once
+        payload_size = len(deferred[0]._view)
+        assert len(deferred[0].value) == payload_size
+        assert reader.bytes_copied == copied + payload_size
+
+
+def test_defer_ids_keep_listed_events_in_the_mapping(sample_project):
+    with FLPReader(sample_project) as reader:
+        events = list(reader.parse_project().events)
+        copied = reader.bytes_copied
+    decoded = Counter(
+        event.id for event in events if not isinstance(event, DeferredDataEvent)
+    )
+    event_id = decoded.most_common(1)[0][0]
+
+    with FLPReader(sample_project) as reader:
+        size = sum(len(payload) for raw_id, payload in reader.iter_events() if raw_id == event_id)
+        assert size
+        events = list(reader.parse_project(UNINSPECTED_EVENT_IDS | {event_id}).events)
+        assert all(isinstance(event, DeferredDataEvent) for event in events if event.id == event_id)
+        assert reader.bytes_copied == copied - size
@@ -0,0 +1,59 @@
+import numpy as np
+import pytest
+
+from fl2cu.models.interval_index import IntervalIndex, pack_lanes
+
+
+@pytest.fixture
+def intervals():
+    rng = np.random.default_rng(7)
+    starts = rng.integers(0, 2000, 300)
+    ends = starts + rng.integers(1, 200, 300)
+    return starts, ends
+
+
+def test_lanes_are_minimal_and_never_overlap(intervals):
+    starts, ends = intervals
+    lanes, lane_count = pack_lanes(starts, ends)
+
+    # No layout can use fewer lanes than the deepest overlap
+    depth = max(int(np.sum((starts <= start) & (ends > start))) for start in starts)
+    assert lane_count == depth
+    assert set(lanes.tolist()) == set(range(lane_count))
+    for lane in range(lane_count):
+        members = np.flatnonzero(lanes == lane)
+        order = members[np.argsort(starts[members])]
+        assert np.all(ends[order][:-1] <= starts[order][1:])
+
+
+def test_touching_intervals_share_a_lane():
+    lanes, lane_count = pack_lanes(np.array([0, 96, 192]), np.array([96, 192, 288]))
+    assert lane_count == 1
+    assert lanes.tolist() == [0, 0, 0]
+
+
+def test_queries_match_brute_force(intervals):
+    starts, ends = intervals
+    index = IntervalIndex(starts, ends)
+    order = np.argsort(starts, kind='stable')
+    assert len(index) == len(starts)
+
+    for time in list(range(-10, 2300, 37)) + starts.tolist()[:20] + ends.tolist()[:20]:
+        expected = [i for i in order if starts[i] <= time < ends[i]]
+        assert index.at(time).tolist() == expected
+
+    for start, end in [(-50, 0), (0, 1), (100, 400), (1500, 1501), (1990, 2500), (700, 700)]:
+        expected = [i for i in order if starts[i] < end and ends[i] > start]
+        assert index.overlapping(start, end).tolist() == expected
+
+
+def test_empty_input():
+    empty = np.array([], dtype=np.int64)
+    lanes, lane_count = pack_lanes(empty, empty)
+    assert lane_count == 0
+    assert len(lanes) == 0
+
+    index = IntervalIndex(empty, empty)
+    assert len(index) == 0
+    assert index.at(10).tolist() == []
+    assert index.overlapping(0, 100).tolist() == []
@@ -0,0 +1,108 @@
+import csv
+import io
+import json
+import struct
+
+import pytest
+
+from fl2cu.inventory import CSV_COLUMNS, inspect_projects, write_csv, write_json
+
+PATTERN_BASE = 20480
+PLAYLIST_ITEM = struct.Struct("<IHHIHH2sH4sff")
+
+
+def event(event_id, payload):
+    # Word and dword events carry their payload as is, text and data events
+    # are prefixed with a 7-bit varint size
+    if event_id < 192:
+        return bytes([event_id]) + payload
+    size, prefix = len(payload), bytearray()
+    while True:
+        byte, size = size & 0x7F, size >> 7
+        prefix.append(byte | (0x80 if size else 0))
+        if not size:
+            break
+    return bytes([event_id]) + bytes(prefix) + payload
+
+
+def text(value):
+    return (value + "\0").encode("utf-16-le")
+
+
+def playlist(*items):
+    # (position, item index, track index); tracks are stored reversed from 499
+    return b"".join(
+        PLAYLIST_ITEM.pack(
+            position, PATTERN_BASE, item_index, 96, 499 - track, 0, b"\x78\x00", 64,
+            b"\x40\x64\x80\x80", -1.0, -1.0
+        )
+        for position, item_index, track in items
+    )
+
+
+def write_project(path, samples, arrangements):
+    events = [event(199, b"21.0.3.3517\0")]
+    for iid, sample in enumerate(samples):
+        events.append(event(64, iid.to_bytes(2, "little")))
+        if sample:
+            events.append(event(196, text(str(sample))))
+    for index, (name, items) in enumerate(arrangements):
+        events.append(event(99, index.to_bytes(2, "little")))
+        events.append(event(241, text(name)))
+        events.append(event(233, playlist(*items)))
+    data = b"".join(events)
+    header = struct.pack("<4sIh2H", b"FLhd", 6, 0, len(samples), 96)
+    path.write_bytes(header + b"FLdt" + len(data).to_bytes(4, "little") + data)
+    return path
+
+
+@pytest.fixture
+def project(tmp_path):
+    kick = tmp_path / "kick.wav"
+    kick.write_bytes(b"\0" * 64)
+    samples = [kick, tmp_path / "missing.wav", None]
+    return write_project(tmp_path / "song.flp", samples, [
+        # Two kicks, a missing sample, a channel without sample and a pattern
+        ("Main", [(0, 0, 0), (384, 0, 0), (0, 1, 1), (0, 2, 2), (0, PATTERN_BASE + 1, 3)]),
+        ("Alt", [(0, 0, 4)]),
+    ])
+
+
+def test_inventory_counts(project):
+    inventory, = inspect_projects([project], jobs=1)
+
+    assert inventory.error is None
+    assert (inventory.version, inventory.ppq) == ("21.0.3.3517", 96)
+    assert [arr.to_dict() for arr in inventory.arrangements] == [
+        {'name': "Main", 'track_count': 2, 'clip_count': 3, 'sample_count': 2},
+        {'name': "Alt", 'track_count': 1, 'clip_count': 1, 'sample_count': 1},
+    ]
+    samples = {sample.status: sample for sample in inventory.samples}
+    assert (samples["resolved"].use_count, samples["resolved"].size) == (3, 64)
+    assert (samples["missing"].use_count, samples["missing"].size) == (1, 0)
+    assert inventory.missing_count == 1
+    assert inventory.total_audio_bytes == 64
+
+
+def test_json_and_csv_rows(project, tmp_path):
+    broken = tmp_path / "broken.flp"
+    broken.write_bytes(b"not a project")
+    inventories = list(inspect_projects([project, broken], jobs=1))
+
+    stream = io.StringIO()
+    write_json(inventories, stream)
+    song, failed = json.loads(stream.getvalue())
+    assert (song['clip_count'], song['sample_count'], song['missing_count']) == (4, 2, 1)
+    assert [sample['status'] for sample in song['samples']] == ["resolved", "missing"]
+    assert failed['error'] and failed['samples'] == []
+
+    stream = io.StringIO()
+    write_csv(inventories, stream)
+    reader = csv.DictReader(io.StringIO(stream.getvalue()))
+    assert reader.fieldnames == CSV_COLUMNS
+    rows = list(reader)
+    # One row per sample, then a single row for the project that failed
+    assert [row['status'] for row in rows] == ["resolved", "missing", ""]
+    assert {row['clip_count'] for row in rows[:2]} == {"4"}
+    assert [row['use_count'] for row in rows[:2]] == ["3", "1"]
+    assert rows[2]['error'] and rows[2]['source_path'] == str(broken)
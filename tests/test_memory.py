@@ -0,0 +1,46 @@
+import gc
+import tracemalloc
+import weakref
+
+import pytest
+
+from fl2cu.generator import dawproject_generator
+from fl2cu.generator.dawproject_generator import DAWProjectGenerator
+from fl2cu.parser.project_parser import FLProjectParser
+
+
+@pytest.fixture
+def traced_memory():
+    tracemalloc.start()
+    try:
+        yield
+    finally:
+        tracemalloc.stop()
+
+
+def test_parse_tree_released_before_archive(sample_project, tmp_path, monkeypatch, traced_memory):
+    """The pyflp tree must be collected before archives are written."""
+    gc.collect()
+    baseline = tracemalloc.get_traced_memory()[0]
+    parser = FLProjectParser(str(sample_project))
+    fl_project = weakref.ref(parser.fl_project)
+    tree_size = tracemalloc.get_traced_memory()[0] - baseline
+
+    snapshots = []
+    create_archive = dawproject_generator.DAWProjectGenerator._create_archive
+
+    def measure(self, *args, **kwargs):
+        gc.collect()
+        snapshots.append((fl_project() is None, tracemalloc.get_traced_memory()[0] - baseline))
+        return create_archive(self, *args, **kwargs)
+
+    monkeypatch.setattr(DAWProjectGenerator, "_create_archive", measure)
+
+    for project in parser.iter_projects():
+        generator = DAWProjectGenerator(project.arrangements)
+        generator.generate_dawproject(str(tmp_path / f"{project.name}.dawproject"))
+
+    assert snapshots
+    for released, in_use in snapshots:
+        assert released
+        assert in_use < tree_size / 2
@@ -0,0 +1,28 @@
+import io
+
+from conftest import build_arrangement
+from fl2cu.generator.xml.generator import DAWProjectXMLGenerator
+from fl2cu.parser.project_parser import FLProjectParser
+
+
+def render(arrangements, jobs):
+    generator = DAWProjectXMLGenerator(arrangements, None, jobs=jobs)
+    stream = io.StringIO()
+    generator.write_xml(stream)
+    return stream.getvalue(), generator.referenced_clips
+
+
+def test_synthetic_arrangement_is_identical_across_jobs():
+    arrangements = [build_arrangement()]
+    serial, serial_clips = render(arrangements, jobs=1)
+    parallel, parallel_clips = render(arrangements, jobs=4)
+    assert serial.count("<Audio ") == 12 * 16
+    assert parallel == serial
+    assert list(parallel_clips) == list(serial_clips)
+
+
+def test_sample_project_is_identical_across_jobs(sample_project):
+    project = next(FLProjectParser(str(sample_project)).iter_projects())
+    serial, _ = render(project.arrangements, jobs=1)
+    parallel, _ = render(project.arrangements, jobs=4)
+    assert parallel.encode() == serial.encode()
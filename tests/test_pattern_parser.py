@@ -0,0 +1,80 @@
+import struct
+from types import SimpleNamespace
+
+import numpy as np
+from pyflp._events import EventTree, IndexedEvent, U16Event
+from pyflp.arrangement import PatternPLItem
+from pyflp.pattern import NotesEvent, Pattern, PatternID
+
+from fl2cu.parser.flp_reader import DeferredDataEvent
+from fl2cu.parser.pattern_parser import (
+    NOTE_DTYPE, NOTE_FIELDS, FLPatternParser, decode_pattern_notes
+)
+
+NOTE_FORMAT = "<IHHIHHBBBBBBBB"
+
+
+def note_data(count=8):
+    return b"".join(
+        struct.pack(
+            NOTE_FORMAT, 96 * i, 0x4000 if i % 2 else 0, i % 3, 48 + i, 60 + i, i % 2,
+            120 - i, 0, 64 + i, i % 16, 64 - i, 100 - i, 128, 128 - i
+        )
+        for i in range(count)
+    )
+
+
+def make_pattern(*events):
+    return Pattern(EventTree(init=[IndexedEvent(i, event) for i, event in enumerate(events)]))
+
+
+def placement(pattern, position):
+    fields = {
+        "position": position, "length": 384, "start_offset": -1.0, "end_offset": -1.0,
+        "muted": False
+    }
+    return PatternPLItem(fields, 0, None, pattern=pattern)
+
+
+def test_bulk_decoding_matches_pyflp_notes():
+    data = note_data()
+    assert NOTE_DTYPE.itemsize == struct.calcsize(NOTE_FORMAT)
+    expected = list(make_pattern(NotesEvent(PatternID.Notes, data)).notes)
+
+    reader = SimpleNamespace(copy=bytes)
+    notes = decode_pattern_notes(make_pattern(
+        DeferredDataEvent(PatternID.Notes, memoryview(data), reader)
+    ))
+
+    assert len(notes) == len(expected)
+    for field in NOTE_DTYPE.names:
+        assert notes[field].tolist() == [int(note[field]) for note in expected], field
+
+
+def test_notes_decoded_by_pyflp_keep_their_fields():
+    data = note_data()
+    bulk = np.frombuffer(data, dtype=NOTE_DTYPE)
+    notes = decode_pattern_notes(make_pattern(NotesEvent(PatternID.Notes, data)))
+    for field in NOTE_FIELDS:
+        assert notes[field].tolist() == bulk[field].tolist(), field
+
+
+def test_repeated_placements_hit_the_notes_cache_across_arrangements():
+    patterns = [
+        make_pattern(
+            U16Event(PatternID.New, struct.pack("<H", iid)),
+            NotesEvent(PatternID.Notes, note_data(iid + 2))
+        )
+        for iid in (1, 2)
+    ]
+    parser = FLPatternParser(SimpleNamespace(ppq=96))
+    arrangements = [
+        [placement(patterns[i % 2], i * 384) for i in range(6)],
+        [placement(patterns[0], 0), placement(patterns[1], 384)],
+    ]
+    clips = [clip for items in arrangements for clip in parser.create_clips(items)]
+
+    # Each pattern is decoded once; every other placement reuses its notes
+    assert (parser.template_misses, parser.template_hits) == (2, 6)
+    assert {id(clip.notes) for clip in clips} == {id(clips[0].notes), id(clips[1].notes)}
+    assert [len(clip.notes.keys) for clip in clips[-2:]] == [3, 4]
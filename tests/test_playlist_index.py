@@ -0,0 +1,37 @@
+import pyflp
+import pytest
+
+from fl2cu.parser.playlist_index import PlaylistIndex, get_item_sources
+
+
+def item_key(item):
+    source = getattr(item, 'channel', None) or getattr(item, 'pattern', None)
+    return type(item).__name__, item.position, item.length, source.iid
+
+
+def test_occupied_tracks_match_pyflp(sample_project):
+    fl_project = pyflp.parse(sample_project)
+    arrangements = fl_project.arrangements
+    checked = 0
+    for fl_arr in arrangements:
+        expected = {
+            track_idx: [item_key(item) for item in track]
+            for track_idx, track in enumerate(fl_arr.tracks)
+            if len(track)
+        }
+        playlist = PlaylistIndex(fl_arr, arrangements.max_tracks)
+        occupied = {
+            track_idx: [item_key(item) for item in track]
+            for track_idx, track in playlist.iter_tracks()
+        }
+
+        assert occupied == expected
+        assert playlist.occupied_count == len(expected)
+        assert playlist.item_count == sum(len(items) for items in expected.values())
+        checked += len(expected)
+    assert checked
+
+
+def test_item_sources_require_pyflp_keywords():
+    with pytest.raises(ValueError, match="Unsupported pyflp version"):
+        get_item_sources(object())
@@ -0,0 +1,87 @@
+import logging
+import os
+import threading
+import zipfile
+
+import pytest
+
+from conftest import build_arrangement
+from fl2cu.generator.dawproject_generator import DAWProjectGenerator
+from fl2cu.manifest import verify_archive
+from fl2cu.utils.prefetch import SourcePrefetcher
+
+
+@pytest.fixture
+def files(tmp_path):
+    paths = []
+    for index in range(6):
+        path = tmp_path / f"f{index}.bin"
+        path.write_bytes(os.urandom(1000 + index))
+        paths.append(path)
+    return paths
+
+
+def test_files_are_yielded_in_order(files):
+    with SourcePrefetcher(files=3, budget=2500) as prefetcher:
+        loaded = [(path, source.open().read()) for path, source in prefetcher.iter_files(files)]
+    assert [path for path, _ in loaded] == files
+    assert all(data == path.read_bytes() for path, data in loaded)
+
+
+def test_hung_read_is_abandoned_on_a_daemon_thread(files, monkeypatch):
+    release = threading.Event()
+    load = SourcePrefetcher._load
+
+    def hang_on_second(self, index, path, budgeted):
+        if path == files[1]:
+            release.wait(30)
+            raise OSError("share went away")
+        return load(self, index, path, budgeted)
+
+    monkeypatch.setattr(SourcePrefetcher, "_load", hang_on_second)
+    try:
+        with SourcePrefetcher(files=2, timeout=0.1, retries=1) as prefetcher:
+            loaded = [path for path, source in prefetcher.iter_files(files) if source is not None]
+        assert loaded == files[:1] + files[2:]
+        assert prefetcher.failed == [files[1]]
+
+        hung = [thread for thread in threading.enumerate() if thread.name.startswith("prefetch")]
+        assert hung and all(thread.daemon for thread in hung)
+    finally:
+        release.set()
+
+
+def test_missing_audio_leaves_a_resumable_archive(tmp_path, monkeypatch, caplog):
+    source_dir = tmp_path / "samples"
+    source_dir.mkdir()
+    for index in range(7):
+        (source_dir / f"source_{index}.wav").write_bytes(os.urandom(2000))
+    arrangement = build_arrangement(track_count=2, clips_per_track=8, source_dir=source_dir)
+
+    unreadable = source_dir / "source_3.wav"
+    load = SourcePrefetcher._load
+
+    def fail_one(self, index, path, budgeted):
+        if path == unreadable:
+            raise OSError("permission denied")
+        return load(self, index, path, budgeted)
+
+    monkeypatch.setattr(SourcePrefetcher, "_load", fail_one)
+    output_path = tmp_path / "out.dawproject"
+    generator = DAWProjectGenerator([arrangement], read_timeout=5)
+    assert not generator.generate_dawproject(str(output_path))
+    assert not output_path.exists()
+    assert sorted(path.name for path in tmp_path.iterdir()) == [
+        "out.dawproject.partial", "out.dawproject.partial.journal", "samples"
+    ]
+
+    # Once the source reads again, the rerun only adds what was missing
+    monkeypatch.setattr(SourcePrefetcher, "_load", load)
+    generator = DAWProjectGenerator([arrangement], read_timeout=5)
+    with caplog.at_level(logging.INFO):
+        assert generator.generate_dawproject(str(output_path))
+    # Both XML members and the six audio files that could be read
+    assert "after 8 committed members" in caplog.text
+    assert not verify_archive(output_path)
+    with zipfile.ZipFile(output_path) as zf:
+        assert len([name for name in zf.namelist() if name.startswith("audio/")]) == 7
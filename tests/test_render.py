@@ -0,0 +1,58 @@
+from pathlib import Path
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+soundfile = pytest.importorskip("soundfile")
+
+from fl2cu.parser.clip_parser import FLClipParser
+from fl2cu.render import EffectRenderer, SamplerEffects
+from fl2cu.utils import hashing
+
+REVERSED = SamplerEffects(reverse=True)
+PITCHED = SamplerEffects(pitch_cents=200, fade_in=0.1)
+
+
+@pytest.fixture
+def source(tmp_path):
+    path = tmp_path / "Kick Drum.aif"
+    samples = np.zeros((4410, 2), dtype=np.float32)
+    soundfile.write(str(path), samples, 44100, subtype="PCM_24", format="AIFF")
+    return path
+
+
+@pytest.fixture
+def renderer(tmp_path, monkeypatch):
+    def fail(path, *args, **kwargs):
+        raise AssertionError(f"{path} was hashed on the submitting thread")
+
+    monkeypatch.setattr(hashing, "hash_file", fail)
+    with EffectRenderer(jobs=1, cache_dir=tmp_path / "renders") as renderer:
+        yield renderer
+
+
+def test_render_keeps_source_format(renderer, source):
+    dest = renderer.submit(source, REVERSED)
+    assert renderer.wait() == 0
+    assert dest.suffix == ".aif"
+    info = soundfile.info(str(dest))
+    assert (info.format, info.subtype) == ("AIFF", "PCM_24")
+
+
+def test_renders_differ_per_effects(renderer, source):
+    assert renderer.submit(source, REVERSED) != renderer.submit(source, PITCHED)
+    assert renderer.submit(source, REVERSED) == renderer.submit(source, REVERSED)
+    assert renderer.wait() == 0
+
+
+def test_rendered_clip_is_named_after_source(renderer, source, monkeypatch):
+    parser = FLClipParser(None, lambda raw_path: Path(raw_path), renderer)
+    monkeypatch.setattr(parser, "_get_effects", lambda channel: PITCHED)
+    template = parser._create_template(SimpleNamespace(sample_path=str(source)), "Drums")
+    assert renderer.wait() == 0
+
+    assert template.name == "kick_drum_pitch200_fade0.1-0"
+    assert template.format == "aif"
+    assert template.source_path.parent == renderer.cache_dir
+    assert template.source_duration == pytest.approx(0.1 / PITCHED.pitch_ratio)
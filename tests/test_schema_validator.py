@@ -0,0 +1,73 @@
+import os
+import pickle
+
+import pytest
+
+xmlschema = pytest.importorskip("xmlschema")
+
+from fl2cu.generator import schema_validator
+from fl2cu.generator.dawproject_generator import DAWProjectGenerator
+from fl2cu.generator.schema_validator import SchemaValidator
+from fl2cu.parser.project_parser import FLProjectParser
+
+
+@pytest.fixture(autouse=True)
+def fresh_schemas(monkeypatch):
+    monkeypatch.setattr(schema_validator, "_compiled", {})
+
+
+def generate(sample_project, output_dir, validate=True):
+    results = []
+    for project in FLProjectParser(str(sample_project)).iter_projects():
+        generator = DAWProjectGenerator(project.arrangements, validate=validate)
+        output_path = output_dir / f"{project.name}.dawproject"
+        results.append((output_path, generator.generate_dawproject(str(output_path))))
+    return results
+
+
+def test_sample_output_is_valid(sample_project, tmp_path, monkeypatch):
+    monkeypatch.setattr(schema_validator, "CACHE_DIR", tmp_path / "cache")
+    for output_path, valid in generate(sample_project, tmp_path):
+        assert valid
+        assert output_path.exists()
+
+
+def test_invalid_archive_is_not_published(sample_project, tmp_path, monkeypatch):
+    monkeypatch.setattr(schema_validator, "CACHE_DIR", tmp_path / "cache")
+    monkeypatch.setattr(SchemaValidator, "validate_project", lambda self, *paths: ["bad"])
+    for output_path, valid in generate(sample_project, tmp_path):
+        assert not valid
+        assert not output_path.exists()
+    assert not list(tmp_path.glob("*.partial*"))
+
+
+def test_invalid_document_reports_errors(tmp_path):
+    document = tmp_path / "project.xml"
+    document.write_text('<Project version="1.0"><Bogus/></Project>', encoding="utf-8")
+    validator = SchemaValidator(cache_dir=tmp_path / "cache")
+    assert validator.validate(document, "Project.xsd")
+
+
+def test_untrusted_cache_is_not_unpickled(tmp_path, monkeypatch):
+    cache_dir = tmp_path / "cache"
+    SchemaValidator(cache_dir=cache_dir).get_schema("MetaData.xsd")
+    cache_path, = cache_dir.glob("MetaData-*.pickle")
+
+    loads = []
+    monkeypatch.setattr(pickle, "loads", lambda data: loads.append(data))
+    monkeypatch.setattr(schema_validator, "_compiled", {})
+    SchemaValidator(cache_dir=cache_dir).get_schema("MetaData.xsd")
+    assert len(loads) == 1
+    loads.clear()
+
+    # Payload no longer matches the hash in its header
+    monkeypatch.setattr(schema_validator, "_compiled", {})
+    cache_path.write_bytes(cache_path.read_bytes() + b"tampered")
+    assert SchemaValidator(cache_dir=cache_dir).get_schema("MetaData.xsd") is not None
+    assert not loads
+
+    if hasattr(os, "getuid"):
+        monkeypatch.setattr(schema_validator, "_compiled", {})
+        os.chmod(cache_path, 0o666)
+        assert SchemaValidator(cache_dir=cache_dir).get_schema("MetaData.xsd") is not None
+        assert not loads
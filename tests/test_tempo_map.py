@@ -0,0 +1,65 @@
+import numpy as np
+import pytest
+
+from fl2cu.models.tempo_map import TempoMap
+
+
+@pytest.fixture
+def tempo_map():
+    # 120 BPM for 4 beats, 60 BPM for 4 beats, then 240 BPM
+    return TempoMap([(8.0, 240.0), (0.0, 120.0), (4.0, 60.0)])
+
+
+def test_constant_map():
+    tempo_map = TempoMap.constant(90.0)
+    assert tempo_map.is_constant
+    assert tempo_map.beats_to_seconds(3.0) == pytest.approx(2.0)
+    assert tempo_map.seconds_to_beats(2.0) == pytest.approx(3.0)
+    assert tempo_map.seconds_to_beat_length(7.0, 2.0) == pytest.approx(3.0)
+
+
+def test_multi_segment_conversions(tempo_map):
+    assert len(tempo_map) == 3
+    assert list(tempo_map) == [(0.0, 120.0), (4.0, 60.0), (8.0, 240.0)]
+    assert [tempo_map.tempo_at(beat) for beat in (0.0, 3.99, 4.0, 8.0, 100.0)] == [
+        120.0, 120.0, 60.0, 240.0, 240.0
+    ]
+    assert tempo_map.beats_to_seconds(4.0) == pytest.approx(2.0)
+    assert tempo_map.beats_to_seconds(8.0) == pytest.approx(6.0)
+    assert tempo_map.beats_to_seconds(10.0) == pytest.approx(6.5)
+    assert tempo_map.seconds_to_beats(4.0) == pytest.approx(6.0)
+    # One second from beat 3 spans the 120 and 60 BPM segments
+    assert tempo_map.seconds_to_beat_length(3.0, 1.0) == pytest.approx(1.5)
+
+
+def test_changes_are_deduplicated():
+    tempo_map = TempoMap([(2.0, 100.0), (0.0, 100.0), (4.0, 150.0), (4.0, 140.0), (6.0, 140.0)])
+    # Repeated tempos are not changes and the last change at a beat wins
+    assert list(tempo_map) == [(0.0, 100.0), (4.0, 140.0)]
+
+
+def test_first_tempo_extends_to_beat_zero():
+    tempo_map = TempoMap([(4.0, 60.0), (8.0, 120.0)])
+    assert list(tempo_map) == [(0.0, 60.0), (8.0, 120.0)]
+    assert tempo_map.beats_to_seconds(8.0) == pytest.approx(8.0)
+
+
+def test_bulk_conversions_match_scalar(tempo_map):
+    beats = np.linspace(0.0, 20.0, 81)
+    seconds = tempo_map.beats_to_seconds_many(beats)
+    assert seconds == pytest.approx([tempo_map.beats_to_seconds(beat) for beat in beats])
+    assert tempo_map.seconds_to_beats_many(seconds) == pytest.approx(
+        [tempo_map.seconds_to_beats(second) for second in seconds]
+    )
+
+
+def test_round_trip(tempo_map):
+    beats = np.random.default_rng(1).uniform(0.0, 32.0, 200)
+    seconds = tempo_map.beats_to_seconds_many(beats)
+    assert tempo_map.seconds_to_beats_many(seconds) == pytest.approx(beats)
+
+
+@pytest.mark.parametrize("changes", [[], [(0.0, 0.0)], [(0.0, 120.0), (4.0, -1.0)]])
+def test_invalid_changes_raise(changes):
+    with pytest.raises(ValueError):
+        TempoMap(changes)
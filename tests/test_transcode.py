@@ -0,0 +1,89 @@
+import tracemalloc
+
+import numpy as np
+import pytest
+
+soundfile = pytest.importorskip("soundfile")
+
+from fl2cu.transcode import AudioTranscoder, transcode_audio
+from fl2cu.utils import hashing
+from fl2cu.utils.audio_probe import probe_audio
+from fl2cu.utils.hashing import hash_file
+
+SOURCE_RATE = 44100
+
+
+def write_tone(path, seconds, format="WAV", subtype="FLOAT"):
+    t = np.arange(int(SOURCE_RATE * seconds)) / SOURCE_RATE
+    tone = (0.5 * np.sin(2 * np.pi * 1000 * t)).astype(np.float32)
+    samples = np.stack([tone, tone], axis=1)
+    soundfile.write(str(path), samples, SOURCE_RATE, subtype=subtype, format=format)
+    return path
+
+
+def peak_transcode_memory(source, dest):
+    tracemalloc.start()
+    try:
+        transcode_audio(source, dest, 48000, "PCM_24")
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+@pytest.mark.parametrize("format,subtype", [("WAV", "FLOAT"), ("AIFF", "PCM_24")])
+def test_transcode_memory_does_not_grow_with_length(tmp_path, format, subtype):
+    extension = format.lower()
+    short = write_tone(tmp_path / f"short.{extension}", 5, format, subtype)
+    long = write_tone(tmp_path / f"long.{extension}", 60, format, subtype)
+
+    short_peak = peak_transcode_memory(short, tmp_path / "short_48k.wav")
+    long_peak = peak_transcode_memory(long, tmp_path / "long_48k.wav")
+    assert long_peak < short_peak * 1.5
+
+    info = probe_audio(tmp_path / "long_48k.wav")
+    assert info.sample_rate == 48000
+    assert info.frames == -(-SOURCE_RATE * 60 * 160 // 147)
+    data, _ = soundfile.read(str(tmp_path / "long_48k.wav"), start=24000, frames=4800)
+    spectrum = np.abs(np.fft.rfft(data[:, 0]))
+    assert np.argmax(spectrum) * 48000 / len(data) == pytest.approx(1000, abs=10)
+
+
+def test_format_is_resolved_once_per_source(tmp_path, monkeypatch):
+    long_source = write_tone(tmp_path / "source.wav", 1)
+    transcoder = AudioTranscoder(sample_rate=48000, cache_dir=tmp_path / "cache")
+    probed = []
+    monkeypatch.setattr(
+        "fl2cu.transcode.probe_audio", lambda path: probed.append(path) or probe_audio(path)
+    )
+
+    target = transcoder.get_format(long_source)
+    assert target is not None and target.sample_rate == 48000
+    assert transcoder.get_format(long_source) is target
+    with transcoder:
+        transcoder.submit(long_source, target)
+        assert transcoder.wait() == 0
+    dest = transcoder.get_path(long_source, target)
+    assert dest is not None and dest.exists()
+    assert probed == [long_source]
+
+
+def test_sources_are_hashed_in_workers(tmp_path, monkeypatch):
+    source = write_tone(tmp_path / "source.wav", 1)
+    expected = hash_file(source)
+
+    def fail(path):
+        raise AssertionError(f"{path} was hashed on the main thread")
+
+    monkeypatch.setattr(hashing, "hash_file", fail)
+    paths = []
+    for _ in range(2):
+        with AudioTranscoder(sample_rate=48000, cache_dir=tmp_path / "cache") as transcoder:
+            target = transcoder.get_format(source)
+            transcoder.submit(source, target)
+            assert transcoder.wait() == 0
+        assert transcoder.hasher.get_known_hash(source) == expected
+        paths.append(transcoder.get_path(source, target))
+
+    # The second run finds the first run's file by content hash
+    assert transcoder.cache_hits == 1
+    assert paths[0] == paths[1] and paths[0].exists()